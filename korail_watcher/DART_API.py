@@ -1,124 +1,650 @@
-import os, re, sys, time, zipfile, io, gzip, xml.etree.ElementTree as ET
+import os, re, sys, time, zipfile, io, gzip, codecs, argparse, tempfile, shutil, atexit, threading
+import abc, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
 import requests
-from bs4 import BeautifulSoup
 from pathlib import Path
 
+from dart_corpcode import load_corp_index
+from dart_cache import DartCache
+from dart_filings import get_filing_index, fiscal_year_for
+from dart_keywords import get_profile
+from dart_profile import PROFILER, Profiler, stage, count, run_profiler
+from dart_frames import FrameCollector, UnitTracker, rank_candidates
+
 API_KEY = os.getenv("DART_API_KEY", "0f50640c8260194ec3ee604bacbaba2bc8ca5e2a")
 TARGET_CORP = "한국맥널티"     # 회사명으로 corp_code 조회
 YEAR = "2025"                 # 필요 연도
 REPORT_CODE = "11011"         # 11011=사업보고서
 
-def get_corp_code(api_key, target_corp):
-    url = "https://opendart.fss.or.kr/api/corpCode.xml"
-    z = zipfile.ZipFile(io.BytesIO(requests.get(url, params={"crtfc_key": api_key}).content))
-    xml_bytes = z.read(z.namelist()[0])
-    root = ET.fromstring(xml_bytes.decode("utf-8"))
-    for el in root.iter("list"):
-        if el.findtext("corp_name") == target_corp:
-            return el.findtext("corp_code")
-    raise ValueError("corp_code not found")
-
-def get_rcp_no(api_key, corp_code, year, report_code):
+def get_corp_code(api_key, target_corp, session=None):
+    # corpCode.xml은 로컬 캐시(TTL) + 메모리 인덱스로 조회. 회사명/종목코드/corp_code 모두 허용
+    with stage("corp_code"):
+        code = load_corp_index(api_key, session=session).corp_code(target_corp)
+    if not code:
+        raise ValueError("corp_code not found")
+    return code
+
+def get_rcp_no(api_key, corp_code, year, report_code, session=None, index=None):
     """
-    접수일 기준 기간을 넓게 잡아 조회한다: [year-1-01-01, year+1-12-31]
-    우선 정기공시(A)로 조회하고, 필요 시 세부유형(A001, 사업보고서)로 재시도한다.
-    반환은 reprt_code 일치(예: 11011) 우선, 없으면 보고서명에 '사업보고서' 포함 항목.
+    (corp_code, reprt_code, 사업연도) 인덱스에서 최신 rcept_no를 찾는다.
+    사업연도는 year 기준: 사업보고서(11011)는 year-1(예: 2025 → "(2024.12)"), 반기/분기는 year.
+    인덱스는 dart_filings가 list.json을 모든 페이지까지 증분 수집해 만든다(새 공시만 요청).
+    session: requests.Session / DartClient / DartCache. 없으면 requests.
     """
-    url = "https://opendart.fss.or.kr/api/list.json"
-    yr = int(year)
-    bgn_de = f"{yr-1}0101"
-    end_de = f"{yr+1}1231"
-
-    def _call(pblntf_ty: str = "A", pblntf_detail_ty: str = ""):
-        params = {
-            "crtfc_key": api_key,
-            "corp_code": corp_code,
-            "bgn_de": bgn_de,
-            "end_de": end_de,
-            "pblntf_ty": pblntf_ty,
-            "pblntf_detail_ty": pblntf_detail_ty,
-            "page_no": 1,
-            "page_count": 1000,
-        }
-        return requests.get(url, params=params).json()
-
-    data = _call(pblntf_ty="A", pblntf_detail_ty="")
-    if data.get("status") != "000" or not data.get("list"):
-        # 세부유형 A001(사업보고서)로 재시도
-        data = _call(pblntf_ty="A", pblntf_detail_ty="A001")
-    if data.get("status") != "000":
-        raise RuntimeError(data.get("message"))
-
-    items = data.get("list", [])
-    # 최신 접수일 우선 정렬
-    def _rcp_dt(it):
-        return it.get("rcp_dt") or ""
-    items_sorted = sorted(items, key=_rcp_dt, reverse=True)
-
-    # 기대 연도(사업연도): YEAR-1의 12월 표기(예: (2024.12)) 우선
-    report_year = int(year) - 1
-    tag = f"({report_year}.12)"
-
-    # 1차: reprt_code 일치 + 보고서명에 '사업보고서' 및 연도 태그 포함 + rcept_no 존재
-    cand = [
-        it for it in items_sorted
-        if it.get("reprt_code") == report_code
-        and (it.get("report_nm") or it.get("rpt_nm") or "").find("사업보고서") >= 0
-        and (it.get("report_nm") or it.get("rpt_nm") or "").find(tag) >= 0
-        and it.get("rcept_no")
-    ]
-    if cand:
-        return cand[0]["rcept_no"]
-
-    # 2차: reprt_code 일치 + rcept_no 존재
-    cand = [it for it in items_sorted if it.get("reprt_code") == report_code and it.get("rcept_no")]
-    if cand:
-        return cand[0]["rcept_no"]
-
-    # 3차: 보고서명에 '사업보고서' 포함 + rcept_no 존재
-    cand = []
-    for it in items_sorted:
-        name = it.get("report_nm") or it.get("rpt_nm") or ""
-        if "사업보고서" in name and it.get("rcept_no"):
-            cand.append(it)
-    if cand:
-        return cand[0]["rcept_no"]
-
-    raise ValueError(f"사업보고서 rcp_no not found (searched: {bgn_de}~{end_de})")
-
-def fetch_document_response(api_key, rcp_no):
+    index = index or get_filing_index()
+    fy = fiscal_year_for(year, report_code)
+    with stage("rcp_no"):
+        return _lookup_rcp_no(api_key, corp_code, report_code, fy, session, index)
+
+
+def _lookup_rcp_no(api_key, corp_code, report_code, fy, session, index):
+    try:
+        index.crawl(api_key, corp_code, session=session)
+    except Exception:
+        # 오프라인/요청 한도 등으로 갱신 실패: 이미 인덱스에 있으면 그대로 쓴다
+        rcp_no = index.lookup(corp_code, report_code, fy)
+        if rcp_no:
+            return rcp_no
+        raise
+    rcp_no = index.lookup(corp_code, report_code, fy)
+    if rcp_no is None:
+        # 방금 수집한 뒤가 아니면(재수집 간격 안) 한 번 더 강제로 확인
+        if index.crawl(api_key, corp_code, session=session, force=True):
+            rcp_no = index.lookup(corp_code, report_code, fy)
+    if rcp_no is None:
+        raise ValueError(f"rcp_no not found (corp_code={corp_code}, reprt_code={report_code}, 사업연도={fy})")
+    return rcp_no
+
+def fetch_document_response(api_key, rcp_no, session=None):
     url = "https://opendart.fss.or.kr/api/document.xml"
-    res = requests.get(url, params={"crtfc_key": api_key, "rcept_no": rcp_no}, timeout=30)
+    res = (session or requests).get(url, params={"crtfc_key": api_key, "rcept_no": rcp_no}, timeout=30)
     return res
 
-def extract_sales_section(document_xml_text):
-    # document.xml은 HTML 본문이 CDATA로 들어있음
-    try:
-        prepared = _prepare_xml_text(document_xml_text)
-        if not prepared.startswith("<"):
-            return None
-        root = ET.fromstring(prepared)
-    except ET.ParseError:
+# ====== 스트리밍 문서 파서 ======
+# document.xml을 한 번만 훑으면서 섹션/문단/표 이벤트를 흘려보낸다.
+# 실제 DART 문서는 본문에 '&', '<당기>' 같은 문자가 그대로 들어 있어 XML 파서로는 깨지므로
+# 관대한 html.parser를 SAX처럼 쓰고, 청크 단위로 feed해 읽은 부분은 바로 버린다.
+# (DART4 스키마의 SECTION-n/TABLE/TR/TD/TE/TU/P 와 예전 <content> CDATA HTML 모두 처리)
+# 예전 HTML에는 SECTION이 없으므로 <h1>~<h6> 제목을 한 단계 아래 섹션의 시작(+ "title")으로 바꿔 보낸다.
+# (같거나 높은 수준의 다음 제목, 바깥 섹션의 끝, 문서 끝에서 닫힌다)
+#
+# 이벤트: ("section_start", depth) / ("section_end", depth) / ("title", text)
+#         ("paragraph", text) / ("table", Dart4Table) / ("content", html)
+_SECTION_TAG = re.compile(r"^section-\d+$")
+_CELL_TAGS = {"td", "th", "te", "tu"}
+_TEXT_BLOCK_TAGS = {"p", "title", "cover-title", "div", "li", "br", "h1", "h2", "h3", "h4", "h5", "h6", "pgbrk"}
+_TITLE_TAGS = {"title", "cover-title"}
+_HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+STREAM_CHUNK = 256 * 1024
+
+
+def _squash(parts) -> str:
+    return " ".join("".join(parts).split())
+
+
+_NUM_CELL = re.compile(r"^[(△▲-]?\s*(\d[\d,]*(?:\.\d+)?)\s*\)?$")
+
+
+def parse_number(text):
+    """표 셀의 숫자 텍스트 → int/float. '(1,234)', '△1,234', '-1,234'는 음수. 숫자가 아니면 None."""
+    t = (text or "").strip()
+    m = _NUM_CELL.match(t)
+    if not m:
         return None
-    # 키워드 확장(표현 다양성 대응)
-    include_keys = [
-        "주요 제품", "주요제품", "주요 품목", "제품", "서비스",
-        "매출", "매출액", "매출 현황", "매출비중", "매출 구성",
-        "상품매출", "제품매출", "매출유형", "판매", "비중"
-    ]
-
-    def _extract_from_html(html: str):
-        soup = BeautifulSoup(html, "html.parser")
-        lines = [ln.strip() for ln in soup.get_text("\n").splitlines() if ln.strip()]
-        if not lines:
-            return None
-        # 키워드가 포함된 라인 인덱스 수집
-        hit_idx = []
-        for i, ln in enumerate(lines):
-            if any(k in ln for k in include_keys):
-                hit_idx.append(i)
+    digits = m.group(1).replace(",", "")
+    num = float(digits) if "." in digits else int(digits)
+    if t[0] in "(△▲-":
+        num = -num
+    return num
+
+
+def _span(v):
+    try:
+        return max(1, int(v))
+    except (TypeError, ValueError):
+        return 1
+
+
+class Cell:
+    """표 셀 하나. DART4 셀(TD/TH/TE/TU)의 ACODE/ACONTEXT/AUNIT 메타데이터를 함께 보관."""
+
+    # 문서 하나에 셀이 수천~수만 개라 속성을 고정
+    __slots__ = ("text", "tag", "rowspan", "colspan", "header",
+                 "acode", "acontext", "adecimal", "aunit", "aunitvalue")
+
+    def __init__(self, text, tag="td", attrs=None, header=False):
+        attrs = attrs or {}
+        self.text = text
+        self.tag = tag
+        self.rowspan = _span(attrs.get("rowspan"))
+        self.colspan = _span(attrs.get("colspan"))
+        self.header = header or tag == "th"
+        self.acode = attrs.get("acode")
+        self.acontext = attrs.get("acontext")
+        self.adecimal = attrs.get("adecimal")
+        self.aunit = attrs.get("aunit")
+        self.aunitvalue = attrs.get("aunitvalue")
+
+    @property
+    def value(self):
+        return parse_number(self.text)
+
+    def __repr__(self):
+        meta = f" {self.acode}" if self.acode else (f" {self.aunit}={self.aunitvalue}" if self.aunit else "")
+        return f"<{self.tag}{meta} {self.text!r}>"
+
+
+class Dart4Table:
+    """
+    TABLE 하나. rows는 원본 행(셀 리스트), grid()는 ROWSPAN/COLSPAN을 펼친 직사각형 격자.
+    펼쳐진 자리에는 같은 Cell 객체가 반복해 들어간다.
+    """
+
+    def __init__(self, attrs=None):
+        attrs = attrs or {}
+        self.aclass = attrs.get("aclass")
+        self.rows = []
+        self.head_rows = 0      # 앞쪽의 머리글 행 수(THEAD 또는 TH로만 된 행)
+        self._grid = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add_row(self, cells, head=False):
+        if not cells:
+            return
+        if (head or all(c.header for c in cells)) and self.head_rows == len(self.rows):
+            self.head_rows += 1
+        self.rows.append(cells)
+        self._grid = None
+
+    def grid(self):
+        if self._grid is not None:
+            return self._grid
+        grid = []
+        pending = {}    # (행, 열) → 위 행에서 내려온 셀
+        for r, row in enumerate(self.rows):
+            out = []
+            col = 0
+            for cell in row:
+                while (r, col) in pending:
+                    out.append(pending.pop((r, col)))
+                    col += 1
+                for dc in range(cell.colspan):
+                    out.append(cell)
+                    for dr in range(1, cell.rowspan):
+                        pending[(r + dr, col + dc)] = cell
+                col += cell.colspan
+            while (r, col) in pending:
+                out.append(pending.pop((r, col)))
+                col += 1
+            grid.append(out)
+        # 표 끝을 넘는 ROWSPAN은 잘라 내고, 짧은 행은 빈 셀로 채운다
+        width = max((len(r) for r in grid), default=0)
+        blank = Cell("")
+        for row in grid:
+            row.extend([blank] * (width - len(row)))
+        self._grid = grid
+        return grid
+
+    def columns(self):
+        """열별 머리글. 머리글 행이 여러 줄이면 ' / '로 잇는다."""
+        grid = self.grid()
+        if not grid:
+            return []
+        labels = []
+        for c in range(len(grid[0])):
+            parts = []
+            for r in range(self.head_rows):
+                t = grid[r][c].text
+                if t and t not in parts:
+                    parts.append(t)
+            labels.append(" / ".join(parts))
+        return labels
+
+    def text_rows(self):
+        return [[c.text for c in row] for row in self.rows]
+
+    def has_acode(self):
+        return any(c.acode for row in self.rows for c in row)
+
+    def acode_cells(self, acodes=None):
+        """ACODE가 붙은 (행 이름, 셀)을 yield. 행 이름은 그 행의 첫 번째 ACODE 없는 셀 텍스트."""
+        for row in self.rows:
+            label = None
+            for c in row:
+                if not c.acode:
+                    if label is None and c.text:
+                        label = c.text
+                    continue
+                if acodes is None or c.acode in acodes:
+                    yield label, c
+
+
+class DocumentStream(HTMLParser):
+    def __init__(self, sink=None, depth=0):
+        super().__init__(convert_charrefs=True)
+        self.events = sink if sink is not None else []
+        self._depth = depth
+        self._buf = []              # 표 밖 텍스트
+        self._in_title = False
+        self._headings = []         # 열려 있는 <hN> 제목 섹션의 수준(N)
+        self._tables = []           # 중첩 표 스택: [Dart4Table, row, cell, in_thead]
+                                    #   cell = (tag, attrs, 텍스트 조각)
+        self._content = None        # <content> 안의 원문 HTML
+        self.elements = 0           # 읽은 시작 태그 수(프로파일 카운터용)
+
+    # --- 내부 헬퍼 ---
+    def _emit(self, *ev):
+        self.events.append(ev)
+
+    def _flush_text(self):
+        if self._buf:
+            text = _squash(self._buf)
+            self._buf = []
+            if text:
+                self._emit("title" if self._in_title else "paragraph", text)
+
+    def _close_headings(self, level=1):
+        # level 이상인 제목 섹션을 닫는다
+        while self._headings and self._headings[-1] >= level:
+            self._headings.pop()
+            self._emit("section_end", self._depth)
+            self._depth -= 1
+
+    def _start_heading(self, tag):
+        self._flush_text()
+        level = int(tag[1])
+        self._close_headings(level)
+        self._depth += 1
+        self._headings.append(level)
+        self._emit("section_start", self._depth)
+        self._in_title = True
+
+    def _end_cell(self):
+        t = self._tables[-1]
+        if t[2] is not None:
+            if t[1] is None:
+                t[1] = []
+            tag, attrs, parts = t[2]
+            t[1].append(Cell(_squash(parts), tag, attrs, header=t[3]))
+            t[2] = None
+
+    def _end_row(self):
+        t = self._tables[-1]
+        self._end_cell()
+        if t[1] is not None:
+            t[0].add_row(t[1], head=t[3])
+            t[1] = None
+
+    def _end_table(self):
+        self._end_row()
+        table = self._tables.pop()[0]
+        if table.rows and any(c.text for row in table.rows for c in row):
+            self._emit("table", table)
+
+    # --- HTMLParser 콜백 ---
+    def handle_starttag(self, tag, attrs):
+        self.elements += 1
+        if self._content is not None:
+            return
+        if tag == "content":
+            self._flush_text()
+            self._content = []
+            return
+        if _SECTION_TAG.match(tag):
+            self._flush_text()
+            self._close_headings()
+            self._depth += 1
+            self._emit("section_start", self._depth)
+        elif tag == "table":
+            self._flush_text()
+            self._tables.append([Dart4Table(dict(attrs)), None, None, False])
+        elif self._tables:
+            t = self._tables[-1]
+            if tag == "tr":
+                self._end_row()
+                t[1] = []
+            elif tag in _CELL_TAGS:
+                self._end_cell()
+                t[2] = (tag, dict(attrs), [])
+            elif tag == "thead":
+                self._end_row()
+                t[3] = True
+            elif tag == "tbody":
+                self._end_row()
+                t[3] = False
+            elif tag in ("p", "br") and t[2] is not None:
+                t[2][2].append(" ")
+        elif tag in _HEADING_TAGS:
+            self._start_heading(tag)
+        elif tag in _TEXT_BLOCK_TAGS:
+            self._flush_text()
+            self._in_title = tag in _TITLE_TAGS
+
+    def handle_endtag(self, tag):
+        if self._content is not None:
+            if tag == "content":
+                self._end_content()
+            return
+        if _SECTION_TAG.match(tag):
+            self._flush_text()
+            self._close_headings()
+            if self._depth > 0:
+                self._emit("section_end", self._depth)
+                self._depth -= 1
+        elif tag == "table" and self._tables:
+            self._end_table()
+        elif self._tables:
+            if tag == "tr":
+                self._end_row()
+            elif tag in _CELL_TAGS:
+                self._end_cell()
+            elif tag == "thead":
+                self._end_row()
+                self._tables[-1][3] = False
+        elif tag in _TEXT_BLOCK_TAGS:
+            self._flush_text()
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._content is not None:
+            self._content.append(data)
+        elif self._tables:
+            cell = self._tables[-1][2]
+            if cell is not None:
+                cell[2].append(data)
+        else:
+            self._buf.append(data)
+
+    def unknown_decl(self, data):
+        # <![CDATA[...]]> : <content> 안의 HTML 본문
+        if data.startswith("CDATA["):
+            self.handle_data(data[6:])
+
+    def _end_content(self):
+        html = "".join(self._content)
+        self._content = None
+        if not html.strip():
+            return
+        self._emit("section_start", self._depth + 1)
+        self._emit("content", html)
+        # 본문 HTML은 같은 규칙으로 한 번 더 훑는다(이벤트는 같은 sink로)
+        child = DocumentStream(self.events, depth=self._depth + 1)
+        child.feed(html)
+        child.close()
+        self.elements += child.elements
+        self._emit("section_end", self._depth + 1)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        while self._tables:
+            self._end_table()
+        self._close_headings()
+
+
+_XML_DECL_ENC = re.compile(rb"^<\?xml[^>]*?encoding\s*=\s*[\"']([A-Za-z0-9._-]+)[\"']")
+# 선언이 euc-kr이어도 실제로는 확장 문자가 섞여 있는 경우가 많다
+_ENC_ALIASES = {"euc-kr": "cp949", "euc_kr": "cp949", "ks_c_5601-1987": "cp949"}
+
+
+def sniff_encoding(prefix: bytes) -> str:
+    """BOM → XML 선언의 encoding → 앞부분이 UTF-8로 읽히는지 순으로 인코딩을 정한다. 아니면 cp949."""
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if prefix[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+        return "utf-16"
+    m = _XML_DECL_ENC.match(prefix.lstrip(b"\r\n\t \x00")[:256])
+    if m:
+        enc = m.group(1).decode("ascii").lower()
+        enc = _ENC_ALIASES.get(enc, enc)
+        try:
+            codecs.lookup(enc)
+            return enc
+        except LookupError:
+            pass
+    try:
+        # 청크 끝에서 잘린 멀티바이트 문자는 오류로 보지 않도록 증분 디코더로
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp949"
+
+
+def _iter_text_chunks(source, chunk_size=STREAM_CHUNK):
+    if isinstance(source, str):
+        for i in range(0, len(source), chunk_size):
+            yield source[i:i + chunk_size]
+        return
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        # 통째로 디코딩하지 않고 청크 단위로(memoryview 조각은 복사 없이 잘린다)
+        view = memoryview(source)
+        decoder = codecs.getincrementaldecoder(sniff_encoding(bytes(view[:4096])))(errors="replace")
+        for i in range(0, len(view), chunk_size):
+            yield decoder.decode(view[i:i + chunk_size])
+        yield decoder.decode(b"", final=True)
+        return
+    # 파일 객체(바이너리/텍스트)
+    decoder = None
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, str):
+            yield chunk
+            continue
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(sniff_encoding(chunk[:4096]))(errors="replace")
+        yield decoder.decode(chunk)
+    if decoder is not None:
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def iter_document_events(source, chunk_size=STREAM_CHUNK):
+    """document.xml(str/bytes/파일 객체)을 청크 단위로 읽으며 이벤트를 yield."""
+    events = []
+    parser = DocumentStream(events)
+    first = True
+    chars = 0
+    for chunk in _iter_text_chunks(source, chunk_size):
+        chars += len(chunk)
+        if first:
+            chunk = _prepare_xml_text(chunk)
+            first = False
+        else:
+            chunk = chunk.replace("\x00", "")
+        parser.feed(chunk)
+        if events:
+            yield from events
+            events.clear()
+    parser.close()
+    yield from events
+    count("chars_parsed", chars)
+    count("elements", parser.elements)
+
+
+def table_lines(table):
+    """표 한 개(Dart4Table 또는 문자열 행 리스트)를 행 단위 텍스트 라인으로."""
+    rows = table.text_rows() if isinstance(table, Dart4Table) else table
+    return [" | ".join(c for c in row if c) for row in rows if any(row)]
+
+
+def iter_tables(source):
+    """문서의 표를 (직전 제목, Dart4Table)로 차례로 yield."""
+    title = None
+    for kind, *rest in iter_document_events(source):
+        if kind == "title":
+            title = rest[0]
+        elif kind == "table":
+            yield title, rest[0]
+
+
+# ====== ACODE(XBRL 계정) 조회 ======
+# DART4 재무제표 셀에는 ACODE="ifrs-full_Revenue", ACONTEXT="CFY2024dFY_..._ConsolidatedMember"가 붙어 있어
+# 키워드/정규식 대신 계정 코드로 바로 값을 찾을 수 있다.
+REVENUE_ACODES = ("ifrs-full_Revenue", "ifrs-full_RevenueFromContractsWithCustomers")
+
+_ACONTEXT_PAT = re.compile(r"^([A-Z]+?)(\d{4})([de])")
+_PERIOD_ORDER = {"CFY": 0, "PFY": 1, "BPFY": 2}
+
+
+def parse_acontext(ctx):
+    """
+    ACONTEXT → {"period": "CFY"/"PFY"/"BPFY"..., "year": 2024, "instant": bool, "consolidated": True/False/None}
+    (CFY=당기, PFY=전기, BPFY=전전기 / d=기간, e=시점 / ConsolidatedMember=연결, SeparateMember=별도)
+    """
+    ctx = ctx or ""
+    m = _ACONTEXT_PAT.match(ctx)
+    consolidated = None
+    if "ConsolidatedMember" in ctx:
+        consolidated = True
+    elif "SeparateMember" in ctx:
+        consolidated = False
+    return {
+        "period": m.group(1) if m else None,
+        "year": int(m.group(2)) if m else None,
+        "instant": bool(m) and m.group(3) == "e",
+        "consolidated": consolidated,
+    }
+
+
+def acode_rank(item):
+    """연결 → 구분 없음 → 별도, 당기 → 전기 → 전전기 순 정렬 키."""
+    cons = {True: 0, None: 1, False: 2}[item["consolidated"]]
+    return (cons, _PERIOD_ORDER.get(item["period"], 9), -(item["year"] or 0))
+
+
+class AcodeCollector:
+    """표 이벤트에서 ACODE가 붙은 숫자 셀을 모으는 소비자. acodes를 주면 그 코드만."""
+
+    def __init__(self, acodes=None):
+        self.acodes = set(acodes) if acodes else None
+        self.items = []
+        self.units = UnitTracker()
+        self._title = None
+
+    def on_event(self, kind, payload=None):
+        if kind == "title":
+            self._title = payload
+        unit = self.units.on_event(kind, payload)
+        if kind == "table":
+            unit_name, factor = unit or (None, None)
+            for label, cell in payload.acode_cells(self.acodes):
+                value = cell.value
+                if value is None:
+                    continue
+                item = {
+                    "acode": cell.acode,
+                    "value": value * factor if factor else value,   # 단위를 알면 원 단위
+                    "unit": unit_name,
+                    "text": cell.text,
+                    "label": label,
+                    "context": cell.acontext,
+                    "adecimal": cell.adecimal,
+                    "title": self._title,
+                }
+                item.update(parse_acontext(cell.acontext))
+                self.items.append(item)
+
+    def result(self):
+        return self.items
+
+
+def extract_acode_values(document_xml_text, acodes=None):
+    """문서에서 ACODE 값 목록을 뽑는다. acodes 예: ["ifrs-full_Revenue", "ifrs-full_ProfitLoss"]"""
+    if not _is_document_text(document_xml_text):
+        return []
+    return analyze_document(document_xml_text, [AcodeCollector(acodes)])[0]
+
+
+class BlockConsumer(abc.ABC):
+    """섹션 경계마다 그 섹션의 텍스트 라인을 on_block으로 넘기는 소비자 기반 클래스."""
+
+    def __init__(self):
+        self._lines = []
+        self.lines_scanned = 0
+
+    def on_event(self, kind, payload=None):
+        if kind in ("paragraph", "title"):
+            self._lines.append(payload)
+        elif kind == "table":
+            self._lines.extend(table_lines(payload))
+        elif kind in ("section_start", "section_end", "end"):
+            if self._lines:
+                lines, self._lines = self._lines, []
+                self.lines_scanned += len(lines)
+                self.on_block(lines)
+            if kind == "end":
+                count("lines_scanned", self.lines_scanned)
+
+    @abc.abstractmethod
+    def on_block(self, lines):
+        """섹션 하나의 텍스트 라인(list[str])을 받는다."""
+
+    @abc.abstractmethod
+    def result(self):
+        """analyze_document가 이 소비자의 결과로 돌려줄 값."""
+
+
+def analyze_document(source, consumers):
+    """
+    문서를 한 번만 파싱해 모든 소비자에게 이벤트를 나눠 준다.
+    반환: 소비자별 result() 리스트
+    """
+    tables = 0
+    for kind, *rest in iter_document_events(source):
+        payload = rest[0] if rest else None
+        tables += kind == "table"
+        for c in consumers:
+            c.on_event(kind, payload)
+    count("tables", tables)
+    for c in consumers:
+        c.on_event("end")
+    return [c.result() for c in consumers]
+
+
+def _is_document_text(document_xml_text) -> bool:
+    head = document_xml_text[:4096] if isinstance(document_xml_text, (str, bytes)) else None
+    if head is None:
+        return True
+    return _prepare_xml_text(head).startswith("<")
+
+
+class SalesSectionExtractor(BlockConsumer):
+    # 키워드는 dart_keywords 프로필의 "section" 그룹(보고서 종류별로 확장 가능)
+    # 제목이 "section_title" 그룹(주요 제품 및 서비스 / 매출 및 수주상황 …)에 걸리는 섹션(과 그 하위 섹션)만 본다
+
+    def __init__(self, report_code=None, profile=None):
+        super().__init__()
+        self.profile = profile or get_profile(report_code)
+        self.best = None
+        self._titles = []       # 섹션 깊이별 제목(없으면 None)
+
+    def on_event(self, kind, payload=None):
+        if kind == "title" and self._titles and self._titles[-1] is None:
+            self._titles[-1] = payload
+        super().on_event(kind, payload)
+        if kind == "section_start":
+            self._titles.append(None)
+        elif kind == "section_end" and self._titles:
+            self._titles.pop()
+
+    def _in_sales_section(self):
+        has = self.profile.has
+        return any(t and has(t, "section_title") for t in self._titles)
+
+    def on_block(self, lines):
+        if not self._in_sales_section():
+            return
+        # 키워드가 포함된 라인 인덱스 수집(줄마다 정규식 한 번, 결과는 다른 추출기와 공유)
+        has = self.profile.has
+        hit_idx = [i for i, ln in enumerate(lines) if has(ln, "section")]
         if not hit_idx:
-            return None
+            return
         # 주변 컨텍스트 포함한 스니펫 구성
         snippets = []
         for i in hit_idx:
@@ -129,7 +655,7 @@ def extract_sales_section(document_xml_text):
             if len(" ".join(snippet)) >= 40:
                 snippets.append(snippet)
         if not snippets:
-            return None
+            return
         # 가장 정보량이 큰 스니펫 선택
         best = max(snippets, key=lambda ss: len(" ".join(ss)))
         # 중복 제거 후 반환
@@ -139,67 +665,110 @@ def extract_sales_section(document_xml_text):
             if ln not in seen:
                 seen.add(ln)
                 uniq.append(ln)
-        return "\n".join(uniq[:200])
+        text = "\n".join(uniq[:200])
+        if self.best is None or len(text) > len(self.best):
+            self.best = text
 
-    # 모든 <content> 태그(네임스페이스 무시)에서 추출
-    def _local(tag: str) -> str:
-        return tag.rsplit('}', 1)[-1]
+    def result(self):
+        # 가장 긴 결과 반환
+        return self.best
 
-    candidates = []
-    for el in root.iter():
-        if _local(el.tag) == "content":
-            html = el.text or ""
-            if not html:
+
+class RevenueCandidateExtractor:
+    # 키워드는 dart_keywords 프로필의 "revenue" / "revenue_exclude" 그룹
+
+    def __init__(self, acodes=REVENUE_ACODES, report_code=None, profile=None):
+        self.profile = profile or get_profile(report_code)
+        # DART4 문서면 ACODE로 정확한 값을 바로 얻는다(같은 파싱 패스에서)
+        self.acode = AcodeCollector(acodes)
+        # 그 밖의 표는 단위를 맞춘 열 배열로 모아 두었다가 끝에서 한 번에 걸러 정렬
+        self.frames = FrameCollector()
+        self.text_candidates = []
+        self.paragraphs_scanned = 0
+
+    def on_event(self, kind, payload=None):
+        self.acode.on_event(kind, payload)
+        self.frames.on_event(kind, payload)
+        if kind == "paragraph" and not self.acode.items:
+            self.paragraphs_scanned += 1
+            self._scan_line(payload)
+        elif kind == "end":
+            count("paragraphs_scanned", self.paragraphs_scanned)
+
+    def _scan_line(self, ln):
+        # 표 밖 문장("매출액은 1,234억원...")은 그 줄 안에서만 숫자/단위를 본다
+        groups = self.profile.groups(ln)
+        if "revenue" not in groups or "revenue_exclude" in groups:
+            return
+        factor = _detect_unit_factor([ln], 0)
+        for m in NUM_PAT.finditer(ln):
+            num = int(m.group(1).replace(",", "")) * factor
+            if num < 10_000_000:  # 1천만원 미만 제외
                 continue
-            extracted = _extract_from_html(html)
-            if extracted:
-                candidates.append(extracted)
+            self.text_candidates.append((num, ln if len(ln) < 200 else ln[:200]))
 
-    if not candidates:
-        return None
-    # 가장 긴 결과 반환
-    return max(candidates, key=len)
+    def result(self):
+        if self.acode.items:
+            # ACODE 후보: 연결·당기 우선
+            uniq = {}
+            for it in sorted(self.acode.items, key=acode_rank):
+                if it["value"] not in uniq:
+                    kind = {True: "연결", False: "별도"}.get(it["consolidated"], "")
+                    uniq[it["value"]] = f"{it['label'] or it['acode']} [{it['acode']} {it['period']}{it['year']} {kind}]".strip()
+            count("acode_values", len(self.acode.items))
+            count("candidates", len(uniq))
+            return list(uniq.items())
+        # 중복 값 제거 후 큰 값 우선
+        uniq = {}
+        ranked = rank_candidates(self.frames.frames, self.profile.keyword_set("revenue"),
+                                 self.profile.keyword_set("revenue_exclude"))
+        for val, ctx in ranked + self.text_candidates:
+            if val not in uniq:
+                uniq[val] = ctx
+        count("frames", len(self.frames.frames))
+        count("candidates", len(uniq))
+        return sorted(uniq.items(), key=lambda x: x[0], reverse=True)
 
-def _decompress_if_needed(raw: bytes) -> bytes:
-    # gzip magic
-    if raw[:2] == b"\x1f\x8b":
-        try:
-            return gzip.decompress(raw)
-        except Exception:
-            return raw
-    return raw
 
-def _decode_text(raw: bytes) -> str:
-    for enc in ("utf-8", "cp949", "euc-kr", "latin-1"):
+def extract_financial_frames(document_xml_text):
+    """문서의 숫자 표를 단위(원)로 맞춘 TableFrame 목록으로. (pandas가 있으면 frame.to_pandas())"""
+    if not _is_document_text(document_xml_text):
+        return []
+    return analyze_document(document_xml_text, [FrameCollector()])[0]
+
+
+class ContentDumper(BlockConsumer):
+    """<content> HTML은 doc_NNN.html로, 섹션 텍스트는 doc_NNN.txt로 저장."""
+
+    def __init__(self, base: Path):
+        super().__init__()
+        self.base = base
+        self.idx = 0
+
+    def on_event(self, kind, payload=None):
+        if kind == "content":
+            try:
+                (self.base / f"doc_{self.idx + 1:03d}.html").write_text(payload, encoding="utf-8")
+            except Exception:
+                pass
+        super().on_event(kind, payload)
+
+    def on_block(self, lines):
+        self.idx += 1
         try:
-            return raw.decode(enc)
+            (self.base / f"doc_{self.idx:03d}.txt").write_text("\n".join(lines), encoding="utf-8")
         except Exception:
-            continue
-    return raw.decode(errors="ignore")
+            pass
 
-def _extract_xml_from_zip(raw: bytes):
-    """
-    ZIP 바이트에서 XML 파일을 추출해 (파일명, 바이트) 형태로 반환.
-    document.xml 또는 첫 번째 .xml을 우선 선택. 없으면 None 반환.
-    """
-    try:
-        with zipfile.ZipFile(io.BytesIO(raw)) as zf:
-            names = zf.namelist()
-            # document.xml 우선, 없으면 첫 .xml, 그래도 없으면 첫 파일
-            pick = None
-            for n in names:
-                if n.lower().endswith("document.xml"):
-                    pick = n
-                    break
-            if pick is None:
-                xmls = [n for n in names if n.lower().endswith(".xml")]
-                pick = (xmls[0] if xmls else (names[0] if names else None))
-            if not pick:
-                return None, None
-            data = zf.read(pick)
-            return pick, data
-    except Exception:
-        return None, None
+    def result(self):
+        return self.idx
+
+
+def extract_sales_section(document_xml_text):
+    # 예전 <content> CDATA HTML과 DART4 본문 모두 스트리밍 파서로 한 번에 처리
+    if not _is_document_text(document_xml_text):
+        return None
+    return analyze_document(document_xml_text, [SalesSectionExtractor()])[0]
 
 def _prepare_xml_text(s: str) -> str:
     """Strip BOM/null/leading whitespace and return cleaned text."""
@@ -212,71 +781,54 @@ def _prepare_xml_text(s: str) -> str:
     s = s.replace("\x00", "")
     return s
 
-def dump_document_response(res: requests.Response, out_dir: str = "dart_dump") -> str:
+def dump_document_response(res, out_dir: str = "dart_dump") -> str:
     """
-    document.xml의 각 <document>/<content>의 HTML을 파일로 저장하고,
+    document.xml 응답을 파일로 저장하고, 본문 멤버의 각 <document>/<content> HTML과
     텍스트 버전도 함께 저장한다. 저장된 디렉토리 경로를 반환.
+    res: requests.Response 또는 download_document()가 돌려준 파일 객체.
+    ZIP이면 멤버를 이름 그대로(본문 먼저) 풀고, 아니면 raw_document.<확장자>로 저장.
     """
     base = Path(out_dir)
     base.mkdir(parents=True, exist_ok=True)
-    # 원문 저장 (Content-Type에 따라 확장자 결정)
-    content_type = (res.headers.get("Content-Type") or "").lower()
-    raw = _decompress_if_needed(res.content)
-    # ZIP(document.xml.zip) 대응
-    if raw[:2] == b"PK":
-        fname, xml_bytes = _extract_xml_from_zip(raw)
+    headers = getattr(res, "headers", None) or {}
+    content_type = (headers.get("Content-Type") or "").lower()
+    fileobj = res if hasattr(res, "read") else io.BytesIO(res.content)
+    fileobj.seek(0)
+    archive = fileobj.read(2) in (b"PK", b"\x1f\x8b")
+    fileobj.seek(0)
+
+    paths = []
+    for name, stream in iter_document_members(fileobj):
+        path = base / (name.rsplit("/", 1)[-1] if archive else "raw_document.part")
         try:
-            (base / (fname or "document.xml")).write_bytes(xml_bytes or b"")
+            with open(path, "wb") as out:
+                shutil.copyfileobj(stream, out, STREAM_CHUNK)
+            paths.append(path)
         except Exception:
             pass
-        # 이후 xml_bytes로 content 처리하도록 교체
-        if xml_bytes:
-            raw = xml_bytes
-            content_type = "application/xml"
-
-    if raw.lstrip().startswith(b"<") or "xml" in content_type:
-        raw_name = "raw_document.xml"
-    elif "json" in content_type or raw[:1] == b"{" or raw[:1] == b"[":
-        raw_name = "raw_document.json"
-    elif "html" in content_type or b"<html" in raw[:200].lower():
-        raw_name = "raw_document.html"
-    else:
-        raw_name = "raw_document.txt"
-    try:
-        (base / raw_name).write_bytes(raw)
-    except Exception:
-        pass
-
-    # XML일 때만 파싱 및 내용 분할 저장
-    text = None
-    try:
-        if "xml" in content_type or raw.lstrip().startswith(b"<"):
-            text = _decode_text(raw)
-            root = ET.fromstring(text)
-        else:
-            return str(base.resolve())
-    except ET.ParseError:
+    if not paths:
         return str(base.resolve())
 
-    def _local(tag: str) -> str:
-        return tag.rsplit('}', 1)[-1]
+    main_path = paths[0]
+    with open(main_path, "rb") as f:
+        head = f.read(512)
+    is_xml = head.lstrip().startswith(b"<") or (not archive and "xml" in content_type)
+    if main_path.suffix == ".part":
+        # 원문 저장 (Content-Type/앞부분에 따라 확장자 결정)
+        if is_xml:
+            ext = "xml"
+        elif "json" in content_type or head[:1] in (b"{", b"["):
+            ext = "json"
+        elif "html" in content_type or b"<html" in head[:200].lower():
+            ext = "html"
+        else:
+            ext = "txt"
+        main_path = main_path.replace(base / f"raw_document.{ext}")
 
-    idx = 0
-    for el in root.iter():
-        if _local(el.tag) != "content":
-            continue
-        html = el.text or ""
-        if not html:
-            continue
-        idx += 1
-        html_path = base / f"doc_{idx:03d}.html"
-        txt_path = base / f"doc_{idx:03d}.txt"
-        try:
-            html_path.write_text(html, encoding="utf-8")
-            text = BeautifulSoup(html, "html.parser").get_text("\n")
-            txt_path.write_text(text, encoding="utf-8")
-        except Exception:
-            continue
+    # XML일 때만 내용 분할 저장(스트리밍 파서로 섹션/본문 단위)
+    if is_xml:
+        with open(main_path, "rb") as f:
+            analyze_document(f, [ContentDumper(base)])
     return str(base.resolve())
 
 # 숫자/단위 기반 매출 후보 추출
@@ -298,67 +850,246 @@ def _detect_unit_factor(lines, idx):
     return 1
 
 def extract_revenue_candidates(document_xml_text):
-    try:
-        prepared = _prepare_xml_text(document_xml_text)
-        if not prepared.startswith("<"):
-            return []
-        root = ET.fromstring(prepared)
-    except ET.ParseError:
+    if not _is_document_text(document_xml_text):
         return []
-    keywords = ["매출액", "매출", "영업수익", "매출총액", "매출 구성", "매출비중"]
-    candidates = []
-    def _local(tag: str) -> str:
-        return tag.rsplit('}', 1)[-1]
+    return analyze_document(document_xml_text, [RevenueCandidateExtractor()])[0]
 
-    for el in root.iter():
-        if _local(el.tag) != "content":
-            continue
-        html = el.text or ""
-        if not html:
-            continue
-        soup = BeautifulSoup(html, "html.parser")
-        lines = [ln.strip() for ln in soup.get_text("\n").splitlines() if ln.strip()]
-        for i, ln in enumerate(lines):
-            if not any(k in ln for k in keywords):
-                continue
-            factor = _detect_unit_factor(lines, i)
-            a = max(0, i - 2)
-            b = min(len(lines), i + 8)
-            ctx = lines[a:b]
-            ctx_text = " ".join(ctx)
-            for m in NUM_PAT.finditer(ctx_text):
+# ====== 스트리밍 다운로드 ======
+# 응답을 받는 대로 SpooledTemporaryFile에 쓰고(작으면 메모리, 크면 디스크),
+# gzip/ZIP은 파일 객체째로 열어 멤버를 스트림으로 읽어 파서에 바로 흘려보낸다.
+SPOOL_MAX = 8 * 1024 * 1024
+DOCUMENT_URL = "https://opendart.fss.or.kr/api/document.xml"
+
+
+def spool_response(res, chunk_size=STREAM_CHUNK):
+    """stream=True 응답 본문을 읽기 위치 0의 임시 파일로."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX)
+    for chunk in res.iter_content(chunk_size):
+        spool.write(chunk)
+    count("bytes_downloaded", spool.tell())
+    spool.seek(0)
+    return spool
+
+
+def download_document(api_key, rcp_no, session=None):
+    """
+    document.xml을 내려받아 파일 객체로 반환(응답 전체를 bytes로 만들지 않음).
+    session이 DartCache면 캐시에서 바로 연다.
+    """
+    params = {"crtfc_key": api_key, "rcept_no": rcp_no}
+    http = session or requests
+    with stage("download"):
+        if hasattr(http, "open_stream"):
+            return http.open_stream(DOCUMENT_URL, params=params)
+        res = http.get(DOCUMENT_URL, params=params, timeout=30, stream=True)
+        res.raise_for_status()
+        return spool_response(res)
+
+
+def _member_order(name):
+    # 본문(접수번호.xml)을 먼저, 감사보고서 등(_NNNNN.xml)은 그 뒤
+    stem = name.rsplit("/", 1)[-1].lower()
+    return (not stem.endswith(".xml"), "_" in stem, stem)
+
+
+def iter_document_members(fileobj):
+    """
+    document.xml 응답(파일 객체) → (멤버 이름, 바이너리 스트림)을 본문부터 차례로 yield.
+    gzip/ZIP은 압축을 풀면서 읽으므로 멤버를 메모리에 통째로 올리지 않는다.
+    스트림은 다음 멤버로 넘어가면 닫힌다.
+    """
+    head = fileobj.read(4)
+    fileobj.seek(0)
+    if head[:2] == b"\x1f\x8b":
+        # gzip 안쪽이 ZIP일 수도 있으므로 한 번 더 판별(ZipFile은 seek가 필요해 임시 파일로 풀어 둔다)
+        inner = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX)
+        with gzip.GzipFile(fileobj=fileobj) as gz:
+            while True:
+                chunk = gz.read(STREAM_CHUNK)
+                if not chunk:
+                    break
+                inner.write(chunk)
+        inner.seek(0)
+        yield from iter_document_members(inner)
+        return
+    if head[:2] == b"PK":
+        with zipfile.ZipFile(fileobj) as zf:
+            names = [n for n in zf.namelist() if not n.endswith("/")]
+            for name in sorted(names, key=_member_order):
+                with zf.open(name) as f:
+                    yield name, f
+        return
+    yield "document.xml", fileobj
+
+
+def analyze_file(fileobj, consumers=None):
+    """
+    본문 멤버 하나를 한 번의 파싱으로 분석. 반환: (멤버 이름, 소비자별 result()).
+    consumers를 주지 않으면 (섹션 요약, 매출 후보).
+    """
+    for name, stream in iter_document_members(fileobj):
+        consumers = consumers or [SalesSectionExtractor(), RevenueCandidateExtractor()]
+        return name, analyze_document(stream, consumers)
+    return None, [c.result() for c in (consumers or [])]
+
+
+# ====== 다중 멤버(본문 + 감사보고서) 병렬 분석 ======
+# 공시 ZIP의 모든 XML 멤버를 임시 디렉토리에 풀어 프로세스 풀에서 동시에 파싱하고(파싱은 CPU 작업이라 GIL 회피)
+# 결과를 공시 단위 레코드 하나로 합친다. 값마다 어느 멤버에서 나왔는지 남긴다.
+PARSE_PROCS = os.cpu_count() or 1
+PARALLEL_MIN_BYTES = 512 * 1024     # 멤버 합계가 이보다 작으면 프로세스를 쓰지 않는다
+PARSE_TIMEOUT = 300                 # 공시 하나의 멤버 파싱 대기 한도(초). 넘으면 TimeoutError
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_parse_pool(procs=None):
+    """
+    공시마다 프로세스를 새로 띄우지 않도록 풀 하나를 재사용(배치 스레드들이 공유).
+    spawn으로 띄우므로 다른 스레드가 잡고 있던 락(PROFILER, 캐시, SQLite)을 자식이 물려받지 않는다.
+    배치 모드는 작업 스레드를 만들기 전에 메인 스레드에서 먼저 불러 둔다.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=procs or PARSE_PROCS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_POOL.shutdown)
+        return _POOL
+
+
+def _member_kind(name):
+    return "attachment" if "_" in name.rsplit("/", 1)[-1] else "main"
+
+
+def analyze_member_path(name, path, report_code=None):
+    """
+    멤버 파일 하나를 분석(프로세스 풀 작업 단위). 반환: 멤버 결과 dict.
+    stats: 이 작업분의 단계 시간/카운터(다른 프로세스에서 돌았으면 호출한 쪽 PROFILER에 합친다)
+    """
+    t0 = time.perf_counter()
+    before = PROFILER.snapshot()
+    with stage("parse"), open(path, "rb") as f:
+        section, rev = analyze_document(
+            f, [SalesSectionExtractor(report_code), RevenueCandidateExtractor(report_code=report_code)]
+        )
+    return {
+        "stats": Profiler.delta(PROFILER.snapshot(), before),
+        "member": name,
+        "kind": _member_kind(name),
+        "section": section,
+        "revenue": rev,
+        "bytes": os.path.getsize(path),
+        "sec": time.perf_counter() - t0,
+    }
+
+
+def merge_members(members):
+    """
+    멤버별 결과 → 공시 레코드.
+    section: 본문 우선(없으면 가장 긴 것), revenue: [(값, 설명, 멤버)] 본문 순위 → 첨부 순(같은 값은 처음 것만)
+    """
+    members = sorted(members, key=lambda m: (m["kind"] != "main", m["member"]))
+    with_section = [m for m in members if m["section"]]
+    main = [m for m in with_section if m["kind"] == "main"]
+    pick = main[0] if main else max(with_section, key=lambda m: len(m["section"]), default=None)
+    section, section_from = (pick["section"], pick["member"]) if pick else (None, None)
+    revenue, seen = [], set()
+    for m in members:
+        for val, ctx in m["revenue"] or []:
+            if val not in seen:
+                seen.add(val)
+                revenue.append((val, ctx, m["member"]))
+    return {"members": members, "section": section, "section_member": section_from, "revenue": revenue}
+
+
+def analyze_filing(fileobj, procs=None, report_code=None):
+    """
+    공시 응답(파일 객체)의 모든 멤버를 분석해 merge_members() 레코드로 반환.
+    procs: 동시 프로세스 수(기본 PARSE_PROCS, 1이면 현재 프로세스에서 차례로).
+    report_code: 키워드 프로필 선택(dart_keywords).
+    """
+    procs = PARSE_PROCS if procs is None else procs
+    with tempfile.TemporaryDirectory(prefix="dart_members_") as tmp:
+        paths = []
+        with stage("unpack"):
+            for i, (name, stream) in enumerate(iter_document_members(fileobj)):
+                path = os.path.join(tmp, f"{i:03d}.xml")
+                with open(path, "wb") as out:
+                    shutil.copyfileobj(stream, out, STREAM_CHUNK)
+                paths.append((name, path))
+        total = sum(os.path.getsize(p) for _, p in paths)
+        count("members", len(paths))
+        count("bytes_unpacked", total)
+        if procs > 1 and len(paths) > 1 and total >= PARALLEL_MIN_BYTES:
+            pool = get_parse_pool(procs)
+            futures = [pool.submit(analyze_member_path, name, path, report_code) for name, path in paths]
+            with stage("parse_wait"):
+                deadline = time.monotonic() + PARSE_TIMEOUT
                 try:
-                    num = int(m.group(1).replace(",", "")) * factor
-                except Exception:
-                    continue
-                if num < 10_000_000:  # 1천만원 미만 제외
-                    continue
-                snippet = ln if len(ln) < 200 else ln[:200]
-                candidates.append((num, snippet))
-    # 중복 값 제거 후 큰 값 우선
-    uniq = {}
-    for val, ctx in candidates:
-        if val not in uniq:
-            uniq[val] = ctx
-    ranked = sorted(uniq.items(), key=lambda x: x[0], reverse=True)
-    return ranked
-
-def main():
-    corp_code = get_corp_code(API_KEY, TARGET_CORP)
-    rcp_no = get_rcp_no(API_KEY, corp_code, YEAR, REPORT_CODE)
-    res = fetch_document_response(API_KEY, rcp_no)
-    # 디코딩 보강 적용
-    raw = _decompress_if_needed(res.content)
-    # ZIP(document.xml.zip) 대응
-    if raw[:2] == b"PK":
-        _, xml_from_zip = _extract_xml_from_zip(raw)
-        if xml_from_zip:
-            raw = xml_from_zip
-    xml_bytes = raw
-    xml_text = _decode_text(xml_bytes)
-    section = extract_sales_section(xml_text)
+                    members = [f.result(timeout=max(0.0, deadline - time.monotonic())) for f in futures]
+                except TimeoutError:
+                    for f in futures:
+                        f.cancel()
+                    raise
+            for m in members:
+                PROFILER.merge(m["stats"])
+        else:
+            members = [analyze_member_path(name, path, report_code) for name, path in paths]
+    return merge_members(members)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DART 사업보고서에서 매출 섹션/매출액 추출")
+    parser.add_argument("--corp", type=str, default=TARGET_CORP, help="회사명/종목코드/corp_code")
+    parser.add_argument("--year", type=str, default=YEAR)
+    parser.add_argument("--report-code", type=str, default=REPORT_CODE)
+    parser.add_argument("--corps", type=str, default=None,
+                        help="배치 모드: 콤마 구분 회사 목록 또는 한 줄에 하나씩 적은 파일 경로")
+    parser.add_argument("--years", type=str, default=None, help="배치 모드 연도 목록(콤마 구분). 기본은 --year")
+    parser.add_argument("--workers", type=int, default=4, help="배치 동시 작업 수")
+    parser.add_argument("--out", type=str, default="dart_results.sqlite3", help="배치 결과 저장 SQLite 경로")
+    parser.add_argument("--force", action="store_true", help="배치: 이미 성공한 항목도 다시 수집")
+    parser.add_argument("--offline", action="store_true", help="네트워크 없이 dart_cache/http 캐시만 사용")
+    parser.add_argument("--no-cache", action="store_true", help="list.json/document.xml 응답 캐시를 쓰지 않음")
+    parser.add_argument("--procs", type=int, default=PARSE_PROCS, help="공시 ZIP 멤버 병렬 파싱 프로세스 수")
+    parser.add_argument("--report-json", type=str, default=None, help="단계별 시간/카운터를 JSON으로 저장할 경로")
+    parser.add_argument("--profile", choices=("cprofile", "pyinstrument"), default=None, help="함수 단위 프로파일러")
+    parser.add_argument("--profile-out", type=str, default=None, help="프로파일 결과 파일(.prof 또는 .html)")
+    args = parser.parse_args(argv)
+
+    PROFILER.reset()
+    try:
+        with run_profiler(args.profile, args.profile_out):
+            _run(args)
+    finally:
+        print("\n[profile] " + PROFILER.summary(), file=sys.stderr)
+        if args.report_json:
+            PROFILER.write_json(args.report_json)
+
+
+def _run(args):
+    if args.corps:
+        import dart_batch
+        corps = dart_batch.read_corp_list(args.corps)
+        years = [y.strip() for y in (args.years or args.year).split(",") if y.strip()]
+        dart_batch.run_batch(API_KEY, corps, years, args.report_code, workers=args.workers,
+                             out_path=args.out, force=args.force, cache=not args.no_cache, offline=args.offline,
+                             procs=args.procs)
+        return
+
+    http = None if args.no_cache else DartCache(offline=args.offline)
+    corp_code = get_corp_code(API_KEY, args.corp, session=http)
+    rcp_no = get_rcp_no(API_KEY, corp_code, args.year, args.report_code, session=http)
+    res = download_document(API_KEY, rcp_no, session=http)
+    # 본문과 감사보고서 등 모든 멤버를 병렬로 한 번씩 파싱해 섹션 요약과 매출 후보를 함께 추출
+    record = analyze_filing(res, procs=args.procs, report_code=args.report_code)
+    section, rev = record["section"], record["revenue"]
+    for m in record["members"]:
+        print(f"[{m['kind']}] {m['member']}: {m['bytes'] / 1e6:.1f}MB {m['sec']:.2f}s, 매출 후보 {len(m['revenue'] or [])}")
     if section:
-        print("=== 추출 결과(요약) ===")
+        print(f"=== 추출 결과(요약, {record['section_member']}) ===")
         print(section)
     else:
         print("섹션을 자동 추출하지 못했습니다. document.xml을 수동 확인하세요.")
@@ -367,11 +1098,11 @@ def main():
         if outdir:
             print("원문 덤프 디렉토리:", outdir)
     # 매출 후보 상위 5개 표시
-    rev = extract_revenue_candidates(xml_text)
     if rev:
         print("\n=== 매출 후보(상위 5, 원 단위) ===")
-        for val, ctx in rev[:5]:
-            print(f"{val:,} | {ctx}")
+        for val, ctx, member in rev[:5]:
+            print(f"{val:,} | {ctx} | {member}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,172 @@
+import collections
+
+# 종목별 가격 알림 규칙 엔진(mac_watcher 공용).
+#  - above/below: 임계값 도달 시 한 번 알리고, band만큼 반대로 물러나야 다시 알림(히스테리시스)
+#  - pct: 최근 window틱 전 대비 등락률이 pct% 이상이면 알림(절반 아래로 돌아오면 재무장)
+#  - ma: 단기(fast)/장기(slow) 이동평균 교차(골든/데드크로스)
+# 종목마다 고정 길이 링 버퍼(deque maxlen) 하나와 이동평균용 누적합만 들고 있어
+# 틱당 시간/메모리가 실행 시간과 무관하게 일정하다.
+#
+# 규칙 설정(watchlist 종목 항목의 "rules"):
+#   [{"type": "above", "level": 4000, "band": 50}, {"type": "below", "level": 3500},
+#    {"type": "pct", "pct": 3, "window": 30, "direction": "both"}, {"type": "ma", "fast": 5, "slow": 20}]
+
+PCT_REARM = 0.5     # pct 규칙: 변화율이 pct * PCT_REARM 아래로 내려오면 다시 알림 가능
+
+Alert = collections.namedtuple("Alert", "symbol rule value message")
+
+
+class PriceSeries:
+    """최근 maxlen개 값의 링 버퍼 + 지정한 창 길이들의 누적합(이동평균 O(1))."""
+
+    def __init__(self, maxlen, mean_windows=()):
+        self.buf = collections.deque(maxlen=max(1, maxlen))
+        self._sums = {n: 0.0 for n in mean_windows}
+
+    def push(self, value):
+        buf = self.buf
+        for n in self._sums:
+            self._sums[n] += value
+            if len(buf) >= n:
+                self._sums[n] -= buf[-n]     # 창에서 빠지는 값
+        buf.append(value)
+
+    def __len__(self):
+        return len(self.buf)
+
+    def ago(self, n):
+        """n틱 전 값(없으면 None)."""
+        return self.buf[-n - 1] if len(self.buf) > n else None
+
+    def mean(self, n):
+        """최근 n개 평균(아직 n개가 안 되면 None)."""
+        return self._sums[n] / n if len(self.buf) >= n else None
+
+
+class ThresholdRule:
+    window = 0
+    means = ()
+
+    def __init__(self, side, level, band=0):
+        if side not in ("above", "below"):
+            raise ValueError(f"알 수 없는 방향: {side}")
+        self.side = side
+        self.level = float(level)
+        self.band = abs(float(band or 0))
+        self.name = f"{side}{self.level:,.0f}"
+        self._fired = False
+
+    def check(self, series, value):
+        if self.side == "above":
+            hit, clear = value >= self.level, value < self.level - self.band
+        else:
+            hit, clear = value <= self.level, value > self.level + self.band
+        if hit and not self._fired:
+            self._fired = True
+            return f"{'이상' if self.side == 'above' else '이하'} {self.level:,.0f}"
+        if clear:
+            # 임계 반대편으로 band만큼 돌아오면 다시 알림 가능 상태로 리셋
+            self._fired = False
+        return None
+
+
+class PctChangeRule:
+    means = ()
+
+    def __init__(self, pct, window, direction="both"):
+        if direction not in ("up", "down", "both"):
+            raise ValueError(f"알 수 없는 방향: {direction}")
+        self.pct = abs(float(pct))
+        self.window = max(1, int(window))
+        self.direction = direction
+        self.name = f"pct{self.pct:g}/{self.window}"
+        self._fired = False
+
+    def check(self, series, value):
+        base = series.ago(self.window)
+        if not base:
+            return None
+        change = (value - base) / base * 100.0
+        hit = (change >= self.pct and self.direction != "down") or (change <= -self.pct and self.direction != "up")
+        if hit and not self._fired:
+            self._fired = True
+            return f"{self.window}틱 {change:+.2f}%"
+        if abs(change) < self.pct * PCT_REARM:
+            self._fired = False
+        return None
+
+
+class MACrossRule:
+    def __init__(self, fast, slow, band=0):
+        self.fast, self.slow = int(fast), int(slow)
+        if not 0 < self.fast < self.slow:
+            raise ValueError(f"ma 규칙은 0 < fast < slow 여야 합니다: {fast}, {slow}")
+        self.band = abs(float(band or 0))
+        self.window = self.slow
+        self.means = (self.fast, self.slow)
+        self.name = f"ma{self.fast}/{self.slow}"
+        self._sign = 0
+
+    def check(self, series, value):
+        slow = series.mean(self.slow)
+        if slow is None:
+            return None
+        diff = series.mean(self.fast) - slow
+        # band 안의 작은 흔들림은 교차로 보지 않는다
+        sign = 1 if diff > self.band else -1 if diff < -self.band else 0
+        if not sign:
+            return None
+        prev, self._sign = self._sign, sign
+        if prev and sign != prev:
+            return f"{'골든' if sign > 0 else '데드'}크로스 MA{self.fast}/{self.slow}"
+        return None
+
+
+def make_rule(spec):
+    """규칙 설정 dict → 규칙 객체."""
+    kind = spec.get("type")
+    if kind in ("above", "below"):
+        return ThresholdRule(kind, spec["level"], spec.get("band", 0))
+    if kind == "pct":
+        return PctChangeRule(spec["pct"], spec.get("window", 10), spec.get("direction", "both"))
+    if kind == "ma":
+        return MACrossRule(spec.get("fast", 5), spec.get("slow", 20), spec.get("band", 0))
+    raise ValueError(f"알 수 없는 규칙: {spec!r}")
+
+
+class AlertEngine:
+    """종목별 규칙 목록과 링 버퍼. update()는 틱 하나를 넣고 이번에 발생한 Alert 목록을 돌려준다."""
+
+    def __init__(self):
+        self._symbols = {}   # symbol → (PriceSeries, [rule, ...])
+
+    def add(self, symbol, rules):
+        rules = list(rules)
+        maxlen = max([r.window for r in rules] + [0]) + 1
+        means = sorted({n for r in rules for n in r.means})
+        self._symbols[symbol] = (PriceSeries(maxlen, means), rules)
+
+    def rules(self, symbol):
+        entry = self._symbols.get(symbol)
+        return list(entry[1]) if entry else []
+
+    def update(self, symbol, value):
+        entry = self._symbols.get(symbol)
+        if entry is None:
+            return []
+        series, rules = entry
+        series.push(value)
+        alerts = []
+        for rule in rules:
+            msg = rule.check(series, value)
+            if msg:
+                alerts.append(Alert(symbol, rule.name, value, msg))
+        return alerts
+
+    def update_many(self, values):
+        """values: {symbol: 값}. 값이 None이면 그 종목은 건너뛴다."""
+        alerts = []
+        for symbol, value in values.items():
+            if value is not None:
+                alerts.extend(self.update(symbol, value))
+        return alerts
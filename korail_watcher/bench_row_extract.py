@@ -0,0 +1,70 @@
+import os, sys, time, glob, argparse, statistics
+
+from playwright.sync_api import sync_playwright
+
+import korail_watcher as kw
+from fixture_replay import FIXTURE_DIR
+
+# 저장된 결과 페이지(korail_page_*.html)에서 행 추출 두 방식을 비교한다.
+# 페이지를 주지 않았고 현재 디렉토리에도 없으면 tests/fixtures의 합성 페이지(8행)로 돈다.
+# 합성 페이지는 행 수가 적어 실제 결과 페이지보다 차이가 작게 나온다.
+#   handles: 행마다 query_selector (예전 방식, 행당 CDP 왕복 ~5회)
+#   batched: eval_on_selector_all 한 번
+
+
+def _time_it(fn, scope, repeat):
+    samples = []
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(scope)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return out, samples
+
+
+def bench_file(page, path, repeat):
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    page.set_content(html, wait_until="domcontentloaded")
+    rows_h, ms_h = _time_it(kw.extract_rows_handles, page, repeat)
+    rows_b, ms_b = _time_it(kw.extract_rows_batched, page, repeat)
+    same = rows_h == rows_b
+    med_h = statistics.median(ms_h)
+    med_b = statistics.median(ms_b)
+    print(
+        f"{path}: rows={len(rows_b)} handles={med_h:.1f}ms batched={med_b:.1f}ms "
+        f"x{(med_h / med_b) if med_b else float('inf'):.1f} {'일치' if same else '불일치!'}"
+    )
+    return same
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="결과 행 추출 벤치마크(handles vs batched)")
+    parser.add_argument("pages", nargs="*", help="저장된 결과 페이지 HTML. 비우면 korail_page_*.html(없으면 tests/fixtures의 합성 페이지)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    paths = (
+        args.pages
+        or sorted(glob.glob("korail_page_*.html"))
+        or sorted(glob.glob(os.path.join(FIXTURE_DIR, "korail_page_*.html")))
+    )
+    if not paths:
+        raise SystemExit("벤치마크할 HTML이 없습니다. scrape_once가 남긴 korail_page_*.html 경로를 지정하세요.")
+
+    ok = True
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        # 저장된 페이지의 외부 리소스는 모두 차단(오프라인 측정)
+        page.route("**/*", lambda route: route.abort())
+        try:
+            for path in paths:
+                ok = bench_file(page, path, max(1, args.repeat)) and ok
+        finally:
+            browser.close()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
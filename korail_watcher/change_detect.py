@@ -0,0 +1,97 @@
+import hashlib, threading, collections
+
+# 폴링 결과 변경 감지(가격 감시/코레일 감시 공용).
+#  - 서버가 ETag/Last-Modified를 주면 다음 요청에 If-None-Match/If-Modified-Since를 붙이고 304면 이전 값을 그대로 쓴다
+#  - 그렇지 않으면 본문(또는 관심 있는 조각)의 해시를 비교해, 같으면 파싱/화면 갱신/알림을 건너뛴다
+# 키는 요청 단위(URL+종목 묶음, watch 이름 등)로 호출하는 쪽이 정한다.
+
+
+class Unchanged(Exception):
+    """이전 폴링과 결과가 같음(304 또는 해시 동일). 호출한 쪽은 후속 처리를 건너뛴다."""
+
+
+def digest(data) -> bytes:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    elif not isinstance(data, (bytes, bytearray, memoryview)):
+        data = repr(data).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _header(headers, name):
+    if not headers:
+        return None
+    return headers.get(name) or headers.get(name.lower())
+
+
+class ChangeDetector:
+    def __init__(self):
+        self._entries = {}      # key → {"digest", "value", "etag", "last_modified"}
+        self.counts = collections.Counter()   # not_modified / unchanged / changed
+        self._lock = threading.Lock()
+
+    def request_headers(self, key) -> dict:
+        """이전 응답의 검증자로 만든 조건부 요청 헤더(없으면 빈 dict)."""
+        with self._lock:
+            e = self._entries.get(key)
+        if not e:
+            return {}
+        out = {}
+        if e.get("etag"):
+            out["If-None-Match"] = e["etag"]
+        if e.get("last_modified"):
+            out["If-Modified-Since"] = e["last_modified"]
+        return out
+
+    def not_modified(self, key, status) -> bool:
+        """304이고 이전 값이 있으면 True."""
+        if status != 304:
+            return False
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self.counts["not_modified"] += 1
+        return True
+
+    def same(self, key, data) -> bool:
+        """data의 해시가 이전과 같으면 True(저장된 값은 그대로)."""
+        d = digest(data)
+        with self._lock:
+            e = self._entries.get(key)
+            if e is not None and e.get("digest") == d:
+                self.counts["unchanged"] += 1
+                return True
+        return False
+
+    def update(self, key, data, value=None, headers=None):
+        """파싱까지 끝난 뒤 새 해시/값/검증자를 저장."""
+        entry = {
+            "digest": digest(data),
+            "value": value,
+            "etag": _header(headers, "ETag"),
+            "last_modified": _header(headers, "Last-Modified"),
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self.counts["changed"] += 1
+
+    def changed(self, key, data) -> bool:
+        """조각 자체가 값인 경우: 바뀌었으면 저장하고 True."""
+        if self.same(key, data):
+            return False
+        self.update(key, data, data)
+        return True
+
+    def value(self, key, default=None):
+        with self._lock:
+            e = self._entries.get(key)
+        return e["value"] if e else default
+
+    def forget(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def summary(self):
+        with self._lock:
+            c = dict(self.counts)
+        return " ".join(f"{k}={v}" for k, v in sorted(c.items())) or "-"
@@ -0,0 +1,166 @@
+import os, time, json, sqlite3, logging, threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError, as_completed
+
+import DART_API
+from dart_corpcode import load_corp_index
+from dart_fetch import DartClient, DailyLimitExceeded
+from dart_cache import DartCache
+
+# 여러 회사 × 여러 연도의 사업보고서를 한꺼번에 수집한다.
+#  - corp_code 조회 → list.json → document.xml → 분석을 스레드 풀에서 동시에
+#  - HTTP는 DartClient 하나(keep-alive 연결 풀 + 초당/일일 한도)를 모든 작업이 공유
+#    그 앞에 DartCache를 두어 이미 받은 list.json/document.xml은 다시 요청하지 않음
+#  - 결과는 SQLite(filings 테이블)에 (corp_code, year, reprt_code)별로 저장, 다시 돌리면 성공한 건은 건너뜀
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS filings (
+    corp_code    TEXT NOT NULL,
+    year         TEXT NOT NULL,
+    reprt_code   TEXT NOT NULL,
+    corp_name    TEXT,
+    rcept_no     TEXT,
+    status       TEXT NOT NULL,
+    revenue      INTEGER,
+    revenue_desc TEXT,
+    candidates   TEXT,
+    section      TEXT,
+    error        TEXT,
+    elapsed      REAL,
+    updated      REAL NOT NULL,
+    PRIMARY KEY (corp_code, year, reprt_code)
+) WITHOUT ROWID;
+"""
+
+
+class ResultStore:
+    def __init__(self, path="dart_results.sqlite3"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def done(self, corp_code, year, reprt_code):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status FROM filings WHERE corp_code=? AND year=? AND reprt_code=?",
+                (corp_code, year, reprt_code),
+            ).fetchone()
+        return bool(row) and row[0] == "ok"
+
+    def save(self, rec):
+        cands = rec.get("candidates") or []
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO filings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    rec["corp_code"], rec["year"], rec["reprt_code"], rec.get("corp_name"),
+                    rec.get("rcept_no"), rec["status"],
+                    cands[0][0] if cands else None, (f"{cands[0][1]} ({cands[0][2]})" if cands else None),
+                    json.dumps(cands, ensure_ascii=False), rec.get("section"), rec.get("error"),
+                    rec.get("elapsed"), time.time(),
+                ),
+            )
+
+    def rows(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT corp_code, corp_name, year, reprt_code, rcept_no, status, revenue, error "
+                "FROM filings ORDER BY corp_name, year"
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def read_corp_list(spec):
+    """콤마 구분 문자열 또는 파일(한 줄에 하나, #은 주석) → 회사 목록."""
+    if os.path.exists(spec):
+        with open(spec, "r", encoding="utf-8") as f:
+            items = [ln.split("#", 1)[0].strip() for ln in f]
+    else:
+        items = [x.strip() for x in spec.split(",")]
+    return [x for x in items if x]
+
+
+def collect_one(api_key, http, corp, year, report_code, procs=None):
+    """회사/연도 하나를 수집해 레코드(dict)로 반환. 예외는 호출한 쪽에서 기록."""
+    t0 = time.perf_counter()
+    rcp_no = DART_API.get_rcp_no(api_key, corp.corp_code, year, report_code, session=http)
+    with DART_API.download_document(api_key, rcp_no, session=http) as doc:
+        record = DART_API.analyze_filing(doc, procs=procs, report_code=report_code)
+    return {
+        "rcept_no": rcp_no,
+        "status": "ok",
+        "section": record["section"],
+        # [값, 설명, 멤버 파일명]
+        "candidates": [[int(v), c, m] for v, c, m in record["revenue"][:5]],
+        "elapsed": time.perf_counter() - t0,
+    }
+
+
+def run_batch(api_key, corps, years, report_code="11011", workers=4, out_path="dart_results.sqlite3",
+              force=False, client=None, cache=True, offline=False, procs=None):
+    """
+    corps × years를 동시에 수집해 out_path(SQLite)에 저장. 저장소(ResultStore)를 반환.
+    일일 한도에 닿으면 남은 작업은 취소하고 지금까지의 결과만 남긴다.
+    cache/offline: DartCache 사용 여부 / 캐시에서만 응답.
+    procs: 공시 ZIP 멤버 병렬 파싱 프로세스 수(모든 작업 스레드가 프로세스 풀 하나를 공유).
+    """
+    client = client or DartClient(pool_size=max(4, workers * 2))
+    http = DartCache(client, offline=offline) if (cache or offline) else client
+    store = ResultStore(out_path)
+    index = load_corp_index(api_key, session=http)
+
+    jobs = []
+    for name in corps:
+        corp = index.get(name)
+        if corp is None:
+            similar = ", ".join(c.corp_name for c in index.fuzzy(name))
+            logging.warning(f"corp_code 없음: {name}" + (f" (유사: {similar})" if similar else ""))
+            continue
+        for year in years:
+            if not force and store.done(corp.corp_code, year, report_code):
+                continue
+            jobs.append((corp, year))
+    print(f"[batch] 작업 {len(jobs)}건 (회사 {len(corps)} × 연도 {len(years)}, 동시 {workers})", flush=True)
+
+    if jobs and (procs is None or procs > 1):
+        # 프로세스 풀은 작업 스레드가 생기기 전에 메인 스레드에서 만든다
+        DART_API.get_parse_pool(procs)
+
+    t0 = time.perf_counter()
+    ok = failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(collect_one, api_key, http, corp, year, report_code, procs): (corp, year)
+                   for corp, year in jobs}
+        for fut in as_completed(futures):
+            corp, year = futures[fut]
+            base = {"corp_code": corp.corp_code, "corp_name": corp.corp_name, "year": year, "reprt_code": report_code}
+            try:
+                rec = fut.result()
+                ok += 1
+            except CancelledError:
+                continue
+            except DailyLimitExceeded as e:
+                logging.error(str(e))
+                for f in futures:
+                    f.cancel()
+                continue
+            except Exception as e:
+                rec = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+                failed += 1
+            base.update(rec)
+            store.save(base)
+            rev = base.get("candidates")
+            print(f"  [{base['status']}] {corp.corp_name} {year}"
+                  + (f" 매출 {rev[0][0]:,}" if rev else "")
+                  + (f" ({base['error']})" if base.get("error") else ""), flush=True)
+
+    took = time.perf_counter() - t0
+    cached = f", 캐시 {http.hits}/{http.hits + http.misses}" if isinstance(http, DartCache) else ""
+    print(f"[batch] 완료 {ok}, 실패 {failed}, {took:.1f}s, 요청 {client.calls}회 "
+          f"{client.bytes / 1e6:.1f}MB{cached} → {out_path}", flush=True)
+    return store
@@ -0,0 +1,210 @@
+import os, json, gzip, time, shutil, hashlib, tempfile, threading
+from urllib.parse import urlsplit
+import requests
+
+from dart_profile import count
+
+# OpenDART 응답 디스크 캐시.
+#  - 키: 엔드포인트 + 파라미터(인증키 제외)의 sha256 → dart_cache/http/<엔드포인트>/<ab>/<해시>.gz
+#  - document.xml은 rcept_no별로 내용이 바뀌지 않으므로 만료 없이 dart_cache/http/documents/<rcept_no>.gz
+#    (오류(013/020/800 등)는 HTTP 200 XML 본문으로 오므로 ZIP 본문만 저장)
+#  - list.json은 새 공시가 올라오므로 짧은 TTL
+#  - offline=True면 네트워크 없이 캐시에서만(만료된 항목도) 응답, 없으면 OfflineMiss
+# get(url, params=...)이 응답 객체를 돌려주므로 DART_API 함수들의 session 인자로 넘긴다.
+# (corpCode.xml 등 그 밖의 엔드포인트는 캐시하지 않고 그대로 전달)
+
+CACHE_DIR = os.path.join("dart_cache", "http")
+ENDPOINT_TTL = {
+    "list.json": 3600,       # 초
+    "document.xml": None,    # 만료 없음
+}
+OFFLINE = os.getenv("DART_OFFLINE", "") not in ("", "0")
+
+
+class OfflineMiss(RuntimeError):
+    pass
+
+
+class CachedResponse:
+    """캐시에서 꺼낸 응답. requests.Response에서 DART_API가 쓰는 부분만 흉내 낸다."""
+
+    from_cache = True
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"status={self.status_code} url={self.url}")
+
+
+def _endpoint(url):
+    return urlsplit(url).path.rsplit("/", 1)[-1]
+
+
+def _cacheable(endpoint, res):
+    if res.status_code != 200:
+        return False
+    body = res.content
+    if endpoint == "document.xml":
+        # 오류는 JSON/XML 메시지(HTTP 200)로 오므로 ZIP만 저장
+        return body[:2] == b"PK"
+    try:
+        return json.loads(body).get("status") in ("000", "013")   # 013 = 조회된 데이터 없음
+    except ValueError:
+        return False
+
+
+class DartCache:
+    def __init__(self, session=None, root=None, ttl=None, offline=None):
+        self.session = session
+        self.root = root or CACHE_DIR
+        self.ttl = dict(ENDPOINT_TTL, **(ttl or {}))
+        self.offline = OFFLINE if offline is None else offline
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url, params=None):
+        items = sorted((k, str(v)) for k, v in (params or {}).items() if k != "crtfc_key")
+        raw = json.dumps([_endpoint(url), items], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path(self, url, params=None):
+        ep = _endpoint(url)
+        rcept_no = (params or {}).get("rcept_no")
+        if ep == "document.xml" and rcept_no:
+            return os.path.join(self.root, "documents", f"{rcept_no}.gz")
+        h = self.key(url, params)
+        return os.path.join(self.root, ep, h[:2], f"{h}.gz")
+
+    def _read(self, path):
+        try:
+            with gzip.open(path, "rb") as f:
+                meta = json.loads(f.readline())
+                return meta, f.read()
+        except (OSError, ValueError, EOFError):
+            return None, None
+
+    def _write(self, path, url, res):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        meta = {
+            "url": url,
+            "fetched_at": time.time(),
+            "status_code": res.status_code,
+            "content_type": res.headers.get("Content-Type"),
+        }
+        # ZIP 본문은 이미 압축돼 있으므로 gzip은 가장 빠른 수준으로
+        level = 1 if res.content[:2] == b"PK" else 6
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wb", compresslevel=level) as f:
+            f.write(json.dumps(meta).encode("utf-8") + b"\n")
+            f.write(res.content)
+        os.replace(tmp, path)
+
+    def get(self, url, params=None, headers=None, timeout=30, refresh=False, **kwargs):
+        """refresh=True면 TTL이 남아 있어도 캐시를 건너뛰고 새로 받아 덮어쓴다(오프라인이면 캐시 그대로)."""
+        ep = _endpoint(url)
+        http = self.session or requests
+        if ep not in self.ttl:
+            if self.offline:
+                raise OfflineMiss(f"오프라인 모드: {ep}는 캐시 대상이 아닙니다")
+            return http.get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+
+        path = self.path(url, params)
+        meta, body = (None, None) if refresh and not self.offline else self._read(path)
+        if meta is not None:
+            ttl = self.ttl[ep]
+            if self.offline or ttl is None or time.time() - meta.get("fetched_at", 0) < ttl:
+                with self._lock:
+                    self.hits += 1
+                count("cache_hits")
+                return CachedResponse(meta.get("url") or url, meta.get("status_code", 200),
+                                      {"Content-Type": meta.get("content_type") or ""}, body)
+        if self.offline:
+            raise OfflineMiss(f"오프라인 모드: 캐시에 없음 ({ep} {params and params.get('rcept_no') or ''})")
+
+        with self._lock:
+            self.misses += 1
+        res = http.get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+        if _cacheable(ep, res):
+            try:
+                self._write(path, url, res)
+            except OSError:
+                pass
+        return res
+
+    def open_stream(self, url, params=None, spool_max=8 * 1024 * 1024):
+        """
+        본문을 읽기 위치 0의 파일 객체로 반환(DART_API.download_document용).
+        캐시에 있으면 압축을 풀며 임시 파일로 옮기고, 없으면 stream=True로 받으면서 임시 파일에 쓴 뒤 캐시에도 저장.
+        """
+        ep = _endpoint(url)
+        path = self.path(url, params)
+        spool = tempfile.SpooledTemporaryFile(max_size=spool_max)
+        if ep in self.ttl:
+            try:
+                with gzip.open(path, "rb") as f:
+                    meta = json.loads(f.readline())
+                    ttl = self.ttl[ep]
+                    if self.offline or ttl is None or time.time() - meta.get("fetched_at", 0) < ttl:
+                        shutil.copyfileobj(f, spool, 256 * 1024)
+                        count("cache_hits")
+                        count("bytes_cached", spool.tell())
+                        spool.seek(0)
+                        with self._lock:
+                            self.hits += 1
+                        return spool
+            except (OSError, ValueError, EOFError):
+                spool.seek(0)
+                spool.truncate()
+        if self.offline:
+            spool.close()
+            raise OfflineMiss(f"오프라인 모드: 캐시에 없음 ({ep} {params and params.get('rcept_no') or ''})")
+
+        with self._lock:
+            self.misses += 1
+        res = (self.session or requests).get(url, params=params, timeout=30, stream=True)
+        res.raise_for_status()
+        for chunk in res.iter_content(256 * 1024):
+            spool.write(chunk)
+        count("bytes_downloaded", spool.tell())
+        spool.seek(0)
+        head = spool.read(2)
+        spool.seek(0)
+        if ep in self.ttl and head == b"PK":
+            try:
+                self._write_stream(path, url, res, spool)
+            except OSError:
+                pass
+            spool.seek(0)
+        return spool
+
+    def _write_stream(self, path, url, res, fileobj):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        meta = {
+            "url": url,
+            "fetched_at": time.time(),
+            "status_code": res.status_code,
+            "content_type": res.headers.get("Content-Type"),
+        }
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wb", compresslevel=1) as f:
+            f.write(json.dumps(meta).encode("utf-8") + b"\n")
+            shutil.copyfileobj(fileobj, f, 256 * 1024)
+        os.replace(tmp, path)
+
+    def close(self):
+        if self.session is not None and hasattr(self.session, "close"):
+            self.session.close()
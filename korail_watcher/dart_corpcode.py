@@ -0,0 +1,177 @@
+import os, io, re, gzip, json, time, bisect, difflib, zipfile, threading, collections
+import xml.etree.ElementTree as ET
+import requests
+
+# corpCode.xml(전체 회사 목록 ZIP)을 로컬에 캐시하고 메모리 인덱스로 조회한다.
+#  - 캐시: JSON(gzip) + 메타(받은 시각, ETag/Last-Modified). TTL이 지나면 조건부 요청으로 갱신
+#  - 인덱스: 회사명 / 종목코드 / corp_code, 접두어·유사 이름 검색
+# 갱신에 실패하면 오래된 캐시라도 그대로 쓴다.
+
+CORP_CODE_URL = "https://opendart.fss.or.kr/api/corpCode.xml"
+CACHE_PATH = os.path.join("dart_cache", "corp_codes.json.gz")
+CACHE_TTL_SEC = 24 * 3600
+
+Corp = collections.namedtuple("Corp", "corp_code corp_name stock_code modify_date")
+
+_NAME_NOISE = re.compile(r"\(주\)|㈜|주식회사|\s+")
+
+
+def normalize_name(name: str) -> str:
+    return _NAME_NOISE.sub("", name or "").lower()
+
+
+def download_corp_codes(api_key, headers=None, session=None):
+    """
+    corpCode.xml ZIP을 받아 (corps, 응답 헤더)를 반환. 304면 (None, 헤더).
+    ZIP이 아니면 본문 일부를 담아 RuntimeError.
+    """
+    http = session or requests
+    res = http.get(CORP_CODE_URL, params={"crtfc_key": api_key}, headers=headers or {}, timeout=60)
+    if res.status_code == 304:
+        return None, res.headers
+    res.raise_for_status()
+    content_type = (res.headers.get("Content-Type") or "").lower()
+    raw = res.content
+    # ZIP 응답 여부 확인 (Content-Type 또는 시그니처 PK)
+    if not (("zip" in content_type) or (raw[:2] == b"PK")):
+        # 오류 응답 본문을 그대로 보여주어 원인 파악
+        raise RuntimeError(
+            f"corpCode 응답이 ZIP이 아닙니다. status={res.status_code} content-type={content_type}\n"
+            f"응답 본문(일부):\n{res.text[:800]}\n"
+            "- 인증키 오류/요청 제한/서비스 점검 가능성 확인 필요"
+        )
+    return parse_corp_codes(raw), res.headers
+
+
+def parse_corp_codes(zip_bytes):
+    corps = []
+    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as z:
+        with z.open(z.namelist()[0]) as f:
+            # 목록이 크므로 요소를 읽는 즉시 비운다
+            for _, el in ET.iterparse(f):
+                if el.tag != "list":
+                    continue
+                corps.append(Corp(
+                    (el.findtext("corp_code") or "").strip(),
+                    (el.findtext("corp_name") or "").strip(),
+                    (el.findtext("stock_code") or "").strip(),
+                    (el.findtext("modify_date") or "").strip(),
+                ))
+                el.clear()
+    return corps
+
+
+def _read_cache(path):
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("meta") or {}, [Corp(*row) for row in data.get("corps") or []]
+    except (OSError, ValueError, TypeError):
+        return {}, []
+
+
+def _write_cache(path, meta, corps):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"   # 동시 저장끼리 임시 파일이 겹치지 않게
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump({"meta": meta, "corps": [list(c) for c in corps]}, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+class CorpIndex:
+    def __init__(self, corps):
+        self.corps = corps
+        self.by_code = {}
+        self.by_stock = {}
+        self.by_name = collections.defaultdict(list)
+        self.by_norm = collections.defaultdict(list)
+        for c in corps:
+            self.by_code[c.corp_code] = c
+            if c.stock_code:
+                self.by_stock[c.stock_code] = c
+            self.by_name[c.corp_name].append(c)
+            self.by_norm[normalize_name(c.corp_name)].append(c)
+        self._norm_keys = sorted(self.by_norm)
+
+    def __len__(self):
+        return len(self.corps)
+
+    @staticmethod
+    def _best(cands):
+        # 같은 이름이 여럿이면 상장사(종목코드 있음) → 최근 수정 순
+        return max(cands, key=lambda c: (bool(c.stock_code), c.modify_date))
+
+    def get(self, key):
+        """corp_code(8자리) / 종목코드(6자리) / 회사명(정확히 또는 (주)·공백 무시)으로 조회. 없으면 None."""
+        key = (key or "").strip()
+        if key.isdigit():
+            if len(key) == 8 and key in self.by_code:
+                return self.by_code[key]
+            if len(key) == 6 and key in self.by_stock:
+                return self.by_stock[key]
+        if key in self.by_name:
+            return self._best(self.by_name[key])
+        norm = normalize_name(key)
+        if norm in self.by_norm:
+            return self._best(self.by_norm[norm])
+        return None
+
+    def prefix(self, text, limit=20):
+        norm = normalize_name(text)
+        i = bisect.bisect_left(self._norm_keys, norm)
+        out = []
+        while i < len(self._norm_keys) and self._norm_keys[i].startswith(norm) and len(out) < limit:
+            out.extend(self.by_norm[self._norm_keys[i]])
+            i += 1
+        return out[:limit]
+
+    def fuzzy(self, text, limit=5, cutoff=0.6):
+        norm = normalize_name(text)
+        keys = difflib.get_close_matches(norm, self._norm_keys, n=limit, cutoff=cutoff)
+        return [self._best(self.by_norm[k]) for k in keys]
+
+    def corp_code(self, key):
+        c = self.get(key)
+        return c.corp_code if c else None
+
+
+_INDEX = {}     # 캐시 경로 → (만든 시각, CorpIndex)
+
+
+def load_corp_index(api_key, path=None, ttl=None, refresh=False, session=None):
+    """
+    캐시에서 인덱스를 만든다. 캐시가 없거나 TTL이 지났으면(또는 refresh) 조건부로 다시 받는다.
+    같은 프로세스 안에서는 한 번 만든 인덱스를 재사용한다.
+    """
+    path = os.path.abspath(path or CACHE_PATH)
+    ttl = CACHE_TTL_SEC if ttl is None else ttl
+    cached = _INDEX.get(path)
+    if cached is not None and not refresh and time.time() - cached[0] < ttl:
+        return cached[1]
+
+    meta, corps = _read_cache(path)
+    fresh = corps and time.time() - float(meta.get("fetched_at", 0)) < ttl
+    if refresh or not fresh:
+        headers = {}
+        if corps and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if corps and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        try:
+            new_corps, res_headers = download_corp_codes(api_key, headers, session)
+            if new_corps is not None:
+                corps = new_corps
+            meta = {
+                "fetched_at": time.time(),
+                "etag": res_headers.get("ETag") or meta.get("etag"),
+                "last_modified": res_headers.get("Last-Modified") or meta.get("last_modified"),
+            }
+            _write_cache(path, meta, corps)
+        except Exception:
+            if not corps:
+                raise
+            # 갱신 실패: 오래된 캐시로 계속
+    index = CorpIndex(corps)
+    # 갱신에 실패했더라도 TTL 동안은 다시 시도하지 않는다(대량 조회 시 매번 다운로드 방지)
+    _INDEX[path] = (time.time(), index)
+    return index
@@ -0,0 +1,109 @@
+import re, time, logging, threading
+import requests
+from requests.adapters import HTTPAdapter
+
+from poll_scheduler import TokenBucket
+from dart_profile import count
+
+# OpenDART 공용 HTTP 클라이언트.
+#  - requests.Session 하나를 모든 스레드가 공유(keep-alive 연결 풀)
+#  - 초당 요청 수는 토큰 버킷으로, 하루 요청 수는 카운터로 제한
+#  - status "020"(요청 제한 초과, JSON 또는 document.xml의 XML 본문)은 잠시 쉬었다 재시도
+# get(url, params=..., timeout=...)이 requests.Response를 돌려주므로
+# DART_API / dart_corpcode의 session 인자로 그대로 넘길 수 있다.
+
+DART_RATE = 5.0          # 초당 요청 수(공식 한도보다 보수적으로)
+DART_BURST = 5
+DART_DAILY_LIMIT = 20000  # 인증키당 일일 한도
+POOL_SIZE = 16
+XML_ERROR_MAX = 64 * 1024   # 이보다 큰 XML 응답은 오류 본문이 아니다
+XML_STATUS_PAT = re.compile(rb"<status>\s*(\d+)\s*</status>")
+
+
+class DailyLimitExceeded(RuntimeError):
+    pass
+
+
+class DartClient:
+    def __init__(self, rate=DART_RATE, burst=DART_BURST, daily_limit=DART_DAILY_LIMIT,
+                 pool_size=POOL_SIZE, retries=3, backoff=2.0):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.bucket = TokenBucket(rate, burst)
+        self.daily_limit = daily_limit
+        self.retries = retries
+        self.backoff = backoff
+        self.calls = 0
+        self.bytes = 0
+        self._day = time.strftime("%Y%m%d")
+        self._lock = threading.Lock()
+
+    def _count(self):
+        with self._lock:
+            today = time.strftime("%Y%m%d")
+            if today != self._day:
+                self._day, self.calls = today, 0
+            if self.daily_limit and self.calls >= self.daily_limit:
+                raise DailyLimitExceeded(f"OpenDART 일일 요청 한도({self.daily_limit}) 도달")
+            self.calls += 1
+
+    def get(self, url, params=None, headers=None, timeout=30, **kwargs):
+        last = None
+        for attempt in range(self.retries + 1):
+            self._count()
+            self.bucket.acquire()
+            try:
+                res = self.session.get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                last = e
+                logging.debug(f"DART 요청 실패({attempt + 1}회): {e}")
+            else:
+                if not self._rate_limited(res) and res.status_code < 500:
+                    # stream=True면 본문을 여기서 읽지 않는다(Content-Length로만 집계)
+                    size = int(res.headers.get("Content-Length") or 0) if kwargs.get("stream") else len(res.content)
+                    with self._lock:
+                        self.bytes += size
+                    count("http_requests")
+                    if not kwargs.get("stream"):
+                        count("bytes_downloaded", size)
+                    return res
+                last = RuntimeError(f"status={res.status_code}")
+            if attempt < self.retries:
+                time.sleep(self.backoff * (2 ** attempt))
+        raise last
+
+    @staticmethod
+    def _rate_limited(res):
+        if res.status_code == 429:
+            return True
+        content_type = (res.headers.get("Content-Type") or "").lower()
+        if "xml" in content_type:
+            # document.xml 오류 본문(작다). stream=True여도 .content로 읽은 뒤 iter_content가 그대로 이어진다
+            if int(res.headers.get("Content-Length") or 0) > XML_ERROR_MAX:
+                return False
+            m = XML_STATUS_PAT.search(res.content[:4096])
+            return bool(m) and m.group(1) == b"020"
+        if "json" not in content_type:
+            return False
+        try:
+            return res.json().get("status") == "020"
+        except ValueError:
+            return False
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """프로세스 공용 DartClient(한도는 인증키 단위이므로 하나를 나눠 쓴다)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = DartClient()
+        return _client
@@ -0,0 +1,201 @@
+import os, re, time, sqlite3, threading
+from datetime import date, timedelta
+import requests
+
+from dart_cache import DartCache
+
+# 회사별 정기공시 목록(list.json)을 증분 수집해 SQLite에 쌓고
+# (corp_code, reprt_code, 사업연도) → 최신 rcept_no 인덱스로 조회한다.
+#  - total_page까지 모든 페이지를 따라간다(page_count 최대 100)
+#  - 회사별로 마지막으로 본 rcept_dt(high-water)를 기억해 다음에는 그 날짜부터만 요청
+#  - list.json에는 reprt_code가 없으므로 보고서명 "사업보고서 (2024.12)"에서 보고서 종류/연도를 읽는다
+#  - 같은 키에 정정공시가 여러 건이면 rcept_no가 가장 큰(나중에 접수된) 것
+
+LIST_URL = "https://opendart.fss.or.kr/api/list.json"
+DB_PATH = os.path.join("dart_cache", "filings.sqlite3")
+PAGE_COUNT = 100
+FIRST_CRAWL_YEARS = 10      # 처음 수집할 때 거슬러 올라갈 기간
+RECRAWL_SEC = 3600          # 이 시간 안에 수집한 회사는 다시 요청하지 않음
+
+_REPORT_KINDS = (
+    ("사업보고서", "11011"),
+    ("반기보고서", "11012"),
+)
+# 분기보고서는 기간 끝 월로 1분기/3분기를 가른다
+_QUARTER_CODES = {"03": "11013", "09": "11014"}
+_PERIOD_PAT = re.compile(r"\((\d{4})\.(\d{2})\)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS filings (
+    rcept_no    TEXT PRIMARY KEY,
+    corp_code   TEXT NOT NULL,
+    corp_name   TEXT,
+    report_nm   TEXT,
+    rcept_dt    TEXT,
+    reprt_code  TEXT,
+    fiscal_year INTEGER
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS filings_key ON filings(corp_code, reprt_code, fiscal_year, rcept_no);
+CREATE TABLE IF NOT EXISTS crawl_state (
+    corp_code  TEXT PRIMARY KEY,
+    high_water TEXT,
+    crawled_at REAL
+) WITHOUT ROWID;
+"""
+
+
+def classify_report(report_nm):
+    """보고서명 → (reprt_code, 사업연도). 정기보고서가 아니면 (None, None)."""
+    name = report_nm or ""
+    m = _PERIOD_PAT.search(name)
+    if not m:
+        return None, None
+    year, month = int(m.group(1)), m.group(2)
+    for key, code in _REPORT_KINDS:
+        if key in name:
+            return code, year
+    if "분기보고서" in name:
+        return _QUARTER_CODES.get(month), year
+    return None, None
+
+
+def fiscal_year_for(year, report_code):
+    """
+    get_rcp_no의 year(접수 연도) → 사업연도.
+    사업보고서는 다음 해에 제출되므로 year-1, 반기/분기보고서는 같은 해.
+    """
+    return int(year) - 1 if report_code == "11011" else int(year)
+
+
+class FilingIndex:
+    def __init__(self, path=None, recrawl_sec=RECRAWL_SEC):
+        self.path = path or DB_PATH
+        self.recrawl_sec = recrawl_sec
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._corp_locks = {}
+        self._db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        if self.path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def _state(self, corp_code):
+        with self._lock:
+            return self._db.execute(
+                "SELECT high_water, crawled_at FROM crawl_state WHERE corp_code=?", (corp_code,)
+            ).fetchone()
+
+    def _corp_lock(self, corp_code):
+        with self._lock:
+            return self._corp_locks.setdefault(corp_code, threading.Lock())
+
+    def crawl(self, api_key, corp_code, session=None, force=False, pblntf_ty="A"):
+        """
+        corp_code의 새 정기공시를 모두 받아 저장. 새로 저장한 건수를 반환.
+        high-water 날짜부터 다시 받는다(같은 날 늦게 올라온 공시를 놓치지 않도록 그 날 포함).
+        같은 회사를 여러 스레드가 동시에 요청하면 한 번만 수집한다.
+        """
+        with self._corp_lock(corp_code):
+            return self._crawl(api_key, corp_code, session, force, pblntf_ty)
+
+    def _crawl(self, api_key, corp_code, session, force, pblntf_ty):
+        state = self._state(corp_code)
+        if state and not force and time.time() - (state[1] or 0) < self.recrawl_sec:
+            return 0
+        high_water = state[0] if state else None
+        bgn_de = high_water or (date.today() - timedelta(days=365 * FIRST_CRAWL_YEARS)).strftime("%Y%m%d")
+        end_de = date.today().strftime("%Y%m%d")
+        http = session or requests
+        # 강제 수집은 DartCache의 list.json 캐시(TTL)를 건너뛰어야 새 공시가 보인다
+        extra = {"refresh": True} if force and isinstance(http, DartCache) else {}
+
+        added = 0
+        page_no, total_page = 1, 1
+        while page_no <= total_page:
+            params = {
+                "crtfc_key": api_key,
+                "corp_code": corp_code,
+                "bgn_de": bgn_de,
+                "end_de": end_de,
+                "pblntf_ty": pblntf_ty,
+                "page_no": page_no,
+                "page_count": PAGE_COUNT,
+            }
+            data = http.get(LIST_URL, params=params, timeout=30, **extra).json()
+            status = data.get("status")
+            if status == "013":     # 조회된 데이터 없음
+                break
+            if status != "000":
+                raise RuntimeError(f"list.json status={status} message={data.get('message')}")
+            items = data.get("list") or []
+            added += self._store(corp_code, items)
+            for it in items:
+                dt = it.get("rcept_dt") or ""
+                if dt > (high_water or ""):
+                    high_water = dt
+            total_page = int(data.get("total_page") or 1)
+            page_no += 1
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO crawl_state VALUES (?, ?, ?)",
+                (corp_code, high_water, time.time()),
+            )
+        return added
+
+    def _store(self, corp_code, items):
+        rows = []
+        for it in items:
+            rcept_no = it.get("rcept_no")
+            if not rcept_no:
+                continue
+            name = it.get("report_nm") or it.get("rpt_nm") or ""
+            reprt_code, fy = classify_report(name)
+            rows.append((rcept_no, it.get("corp_code") or corp_code, it.get("corp_name"), name,
+                         it.get("rcept_dt"), it.get("reprt_code") or reprt_code, fy))
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute("BEGIN")
+            self._db.executemany("INSERT OR IGNORE INTO filings VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.execute("COMMIT")
+            return self._db.total_changes - before
+
+    def lookup(self, corp_code, reprt_code, fiscal_year):
+        """(corp_code, reprt_code, 사업연도)의 최신 rcept_no. 없으면 None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT rcept_no FROM filings WHERE corp_code=? AND reprt_code=? AND fiscal_year=? "
+                "ORDER BY rcept_no DESC LIMIT 1",
+                (corp_code, reprt_code, int(fiscal_year)),
+            ).fetchone()
+        return row[0] if row else None
+
+    def filings(self, corp_code, reprt_code=None):
+        sql = "SELECT rcept_no, rcept_dt, reprt_code, fiscal_year, report_nm FROM filings WHERE corp_code=?"
+        args = [corp_code]
+        if reprt_code:
+            sql += " AND reprt_code=?"
+            args.append(reprt_code)
+        with self._lock:
+            return self._db.execute(sql + " ORDER BY rcept_no DESC", args).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_INDEX = {}      # DB 경로 → FilingIndex
+_INDEX_LOCK = threading.Lock()
+
+
+def get_filing_index(path=None):
+    """경로별 프로세스 공용 FilingIndex(배치 작업 스레드들이 함께 쓴다)."""
+    path = path or DB_PATH
+    if path != ":memory:":
+        path = os.path.abspath(path)
+    with _INDEX_LOCK:
+        index = _INDEX.get(path)
+        if index is None:
+            index = _INDEX[path] = FilingIndex(path)
+        return index
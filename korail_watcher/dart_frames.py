@@ -0,0 +1,243 @@
+import re
+
+try:
+    import numpy as np
+except Exception:  # numpy/pandas는 선택 사항(없으면 리스트로 같은 결과를 계산)
+    np = None
+try:
+    import pandas as pd
+except Exception:
+    pd = None
+
+# DART 재무 표를 열 단위 배열(TableFrame)로 바꾸고, 금액을 원 단위로 한 번에 맞춘다.
+#  - 단위는 표마다 한 번(UnitTracker): 표 머리글 또는 바로 앞 문단/표의 "(단위: 백만원)"에서
+#  - 행 이름(첫 번째 숫자 아닌 셀) + 숫자 열만 모은 2차원 값 배열
+#  - 매출 후보는 모든 표의 값을 한 배열로 모아 마스크 → 정렬 (줄마다 정규식을 돌리지 않음)
+# DART_API의 Dart4Table(grid()/head_rows, 셀의 text/value/acode)을 그대로 받는다.
+
+UNIT_FACTORS = {
+    "원": 1,
+    "천원": 10**3,
+    "백만원": 10**6,
+    "억원": 10**8,
+    "십억원": 10**9,
+    "조원": 10**12,
+}
+
+_UNIT_PAT = re.compile(r"단위\s*[:：]\s*([^),\n]+)")
+
+
+def parse_unit(text):
+    """'(단위 : 백만원)' → ('백만원', 1000000). 통화 단위가 아니면 (단위, None), 표기가 없으면 None."""
+    m = _UNIT_PAT.search(text or "")
+    if not m:
+        return None
+    unit = m.group(1).replace(" ", "")
+    return unit, UNIT_FACTORS.get(unit)
+
+
+class TableFrame:
+    """
+    숫자 표 하나의 열 단위 표현.
+    labels[i]: i행 이름, columns[j]: j열 머리글, values[i][j]: 원 단위로 맞춘 값(없으면 NaN)
+    numpy가 있으면 values는 float64 ndarray, 없으면 리스트의 리스트.
+    """
+
+    def __init__(self, labels, columns, values, acodes, unit=None, factor=None, title=None):
+        self.labels = labels
+        self.columns = columns
+        self.values = values
+        self.acodes = acodes
+        self.unit = unit
+        self.factor = factor
+        self.title = title
+
+    @property
+    def shape(self):
+        return (len(self.labels), len(self.columns))
+
+    def to_pandas(self):
+        if pd is None:
+            raise RuntimeError("pandas가 설치되어 있지 않습니다.")
+        df = pd.DataFrame(self.values, index=self.labels, columns=self.columns)
+        df.attrs.update(unit=self.unit, factor=self.factor, title=self.title)
+        return df
+
+
+def _rows_unit(rows):
+    for row in rows:
+        found = parse_unit(" ".join(c.text for c in row))
+        if found:
+            return found
+    return None
+
+
+def _has_numbers(table):
+    return any(c.value is not None for row in table.rows[table.head_rows:] for c in row)
+
+
+class UnitTracker:
+    """
+    표마다 적용할 단위를 정한다. 표 머리글(또는 첫 행)에 단위가 있으면 그것을,
+    없으면 바로 앞 문단이나 단위만 적힌 작은 표("(단위 : 원)")에서 본 단위를 쓴다. 섹션이 바뀌면 버린다.
+    """
+
+    def __init__(self):
+        self.pending = None
+
+    def on_event(self, kind, payload=None):
+        """table 이벤트면 그 표의 (단위, 배수)(없으면 None)를 반환."""
+        if kind == "paragraph":
+            found = parse_unit(payload)
+            if found:
+                self.pending = found
+        elif kind in ("section_start", "section_end"):
+            self.pending = None
+        elif kind == "table":
+            if not _has_numbers(payload):
+                found = _rows_unit(payload.rows)
+                if found:
+                    self.pending = found
+                return None
+            unit = _rows_unit(payload.rows[:max(1, payload.head_rows)]) or self.pending
+            self.pending = None
+            return unit
+        return None
+
+
+def table_frame(table, unit=None, title=None):
+    """
+    Dart4Table → TableFrame. 숫자 열이 없으면 None.
+    unit: UnitTracker가 정한 (단위, 배수). 값은 배수를 곱해 원 단위로 저장.
+    """
+    grid = table.grid()
+    if not grid:
+        return None
+    head = table.head_rows
+    body = grid[head:]
+    if not body:
+        return None
+    width = len(grid[0])
+    raw = [[c.value for c in row] for row in body]
+    num_cols = [j for j in range(width) if any(r[j] is not None for r in raw)]
+    if not num_cols:
+        return None
+
+    # 행 이름: 숫자로 읽히지 않는 첫 셀
+    labels, acodes = [], []
+    for row, vals in zip(body, raw):
+        label = ""
+        for c, v in zip(row, vals):
+            if v is None and c.text:
+                label = c.text
+                break
+        labels.append(label)
+        acodes.append(next((c.acode for c in row if c.acode), None))
+
+    heads = table.columns()
+    columns = [heads[j] if j < len(heads) and heads[j] else f"col{j}" for j in num_cols]
+    unit_name, factor = unit if unit else (None, None)
+    scale = factor or 1
+    if np is not None:
+        arr = np.array([[r[j] for j in num_cols] for r in raw], dtype=float)  # None → nan
+        values = arr * scale
+    else:
+        nan = float("nan")
+        values = [[(r[j] * scale if r[j] is not None else nan) for j in num_cols] for r in raw]
+    return TableFrame(labels, columns, values, acodes, unit_name, factor, title)
+
+
+class FrameCollector:
+    """analyze_document 소비자: 숫자 표를 TableFrame으로 모은다."""
+
+    def __init__(self, min_rows=1):
+        self.min_rows = min_rows
+        self.frames = []
+        self.units = UnitTracker()
+        self._title = None
+
+    def on_event(self, kind, payload=None):
+        if kind == "title":
+            self._title = payload
+        unit = self.units.on_event(kind, payload)
+        if kind != "table":
+            return
+        frame = table_frame(payload, unit, self._title)
+        if frame is not None and frame.shape[0] >= self.min_rows:
+            self.frames.append(frame)
+
+    def result(self):
+        return self.frames
+
+
+def _matcher(keywords):
+    if not keywords:
+        return None
+    if hasattr(keywords, "search"):
+        return keywords
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+def rank_candidates(frames, keywords, exclude=(), min_value=10_000_000, currency_only=True):
+    """
+    행 이름 또는 열 머리글에 keywords가 들어간 값을 모든 표에서 한 번에 골라 큰 값 순 [(값, 설명)]으로 반환(값 중복 제거).
+    행 이름이 걸리면 그 행의 모든 열, 아니면 머리글이 걸린 열("매출액" 열 아래 제품별 값 등)만 본다.
+    keywords/exclude: 키워드 리스트 또는 search()가 있는 객체(dart_keywords.KeywordSet).
+    currency_only: 통화 단위를 알 수 없는 표(주, %, 단위 미상)는 제외.
+    """
+    inc = _matcher(keywords)
+    exc = _matcher(exclude)
+    if inc is None:
+        return []
+
+    def hit(text):
+        return bool(text) and inc.search(text) is not None and not (exc and exc.search(text))
+
+    picked = []    # (frame, 행 인덱스, 열 인덱스 목록) — 이름 매칭만 파이썬으로, 값 필터/정렬은 배열로
+    for f in frames:
+        if currency_only and not f.factor:
+            continue
+        all_cols = list(range(len(f.columns)))
+        head_cols = [j for j, c in enumerate(f.columns) if hit(c)]
+        for i, label in enumerate(f.labels):
+            if hit(label):
+                picked.append((f, i, all_cols))
+            elif head_cols and not (label and exc and exc.search(label)):
+                picked.append((f, i, head_cols))
+    if not picked:
+        return []
+
+    if np is not None:
+        vals = np.concatenate([np.asarray(f.values[i], dtype=float)[cols] for f, i, cols in picked])
+        owner = np.concatenate([np.full(len(cols), k) for k, (_, _, cols) in enumerate(picked)])
+        col = np.concatenate([np.asarray(cols, dtype=int) for _, _, cols in picked])
+        ok = ~np.isnan(vals) & (vals >= min_value)
+        vals, owner, col = vals[ok], owner[ok], col[ok]
+        order = np.argsort(-vals, kind="stable")
+        vals, owner, col = vals[order], owner[order], col[order]
+        # 같은 값은 처음(가장 앞 표) 것만
+        _, first = np.unique(vals, return_index=True)
+        keep = np.sort(first)
+        rows = [(vals[k], owner[k], col[k]) for k in keep]
+    else:
+        flat = []
+        for k, (f, i, cols) in enumerate(picked):
+            for j in cols:
+                v = f.values[i][j]
+                if v == v and v >= min_value:
+                    flat.append((v, k, j))
+        flat.sort(key=lambda x: -x[0])
+        seen, rows = set(), []
+        for v, k, j in flat:
+            if v not in seen:
+                seen.add(v)
+                rows.append((v, k, j))
+
+    out = []
+    for v, k, j in rows:
+        f, i, _ = picked[int(k)]
+        desc = f"{f.labels[i]} | {f.columns[int(j)]} ({f.unit})"
+        if f.title:
+            desc = f"{f.title} > {desc}"
+        out.append((int(round(float(v))), desc[:200]))
+    return out
@@ -0,0 +1,137 @@
+import os, re, json, functools
+
+# DART 추출기들이 함께 쓰는 키워드 엔진.
+#  - 키워드 그룹(섹션/매출/제외 …)을 정규식 하나(긴 것 우선 alternation)로 묶어 한 줄을 한 번만 훑는다
+#  - 모든 시작 위치에서 가장 긴 키워드를 찾고, 그 키워드에 포함된 짧은 키워드("매출액" ⊃ "매출")의 ID도 함께 돌려준다
+#  - 최근 줄의 결과는 캐시해 같은 패스의 다른 추출기가 같은 줄을 다시 훑지 않는다
+#  - 보고서 종류(reprt_code)별 프로필, DART_KEYWORDS(JSON 파일)로 확장 가능
+#
+# JSON 형식: {"11011": {"revenue": ["매출액", ...], "operating_income": ["영업이익"]}, ...}
+#   (지정한 그룹만 기본 프로필 위에 덮어쓴다)
+
+DEFAULT_GROUPS = {
+    # 매출 구성/주요 제품 섹션 요약
+    "section": [
+        "주요 제품", "주요제품", "주요 품목", "제품", "서비스",
+        "매출", "매출액", "매출 현황", "매출비중", "매출 구성",
+        "상품매출", "제품매출", "매출유형", "판매", "비중",
+    ],
+    # 매출 섹션 제목(이 제목 아래에서만 "section" 요약을 뽑는다)
+    "section_title": [
+        "주요 제품 및 서비스", "주요 제품, 서비스 등", "주요제품 및 서비스",
+        "매출에 관한 사항", "매출 및 수주상황", "매출 및 수주 상황",
+    ],
+    # 매출액 후보
+    "revenue": ["매출액", "매출", "영업수익", "매출총액", "매출 구성", "매출비중"],
+    # '매출'이 들어가지만 매출액이 아닌 계정
+    "revenue_exclude": ["매출원가", "매출채권", "매출총이익", "매출총손실"],
+}
+
+# 반기/분기보고서는 누적/3개월 표기가 붙는다
+_INTERIM = {"revenue": DEFAULT_GROUPS["revenue"] + ["누적 매출액", "3개월 매출액"]}
+
+PROFILES = {
+    "default": {},
+    "11011": {},
+    "11012": _INTERIM,
+    "11013": _INTERIM,
+    "11014": _INTERIM,
+}
+
+
+class KeywordSet:
+    """
+    키워드 → ID 목록을 정규식 하나로 찾는다.
+    keywords: {id: [키워드, ...]} 또는 [키워드, ...](키워드 자체가 ID)
+    """
+
+    def __init__(self, keywords, cache_size=4096):
+        if not isinstance(keywords, dict):
+            keywords = {k: [k] for k in keywords}
+        self.ids_by_kw = {}
+        for kid, words in keywords.items():
+            for w in words:
+                if w:
+                    self.ids_by_kw.setdefault(w, set()).add(kid)
+        words = sorted(self.ids_by_kw, key=len, reverse=True)
+        # 매칭된(가장 긴) 키워드 안에 든 짧은 키워드의 ID까지: 겹침 표
+        self._covered = {
+            w: frozenset().union(*(self.ids_by_kw[o] for o in words if o in w))
+            for w in words
+        }
+        alt = "|".join(map(re.escape, words)) or r"(?!)"
+        self._search = re.compile(alt)
+        # 너비 0 lookahead로 모든 시작 위치를 본다(겹치는 키워드도 놓치지 않음)
+        self._scan = re.compile(f"(?=({alt}))")
+        self.find = functools.lru_cache(maxsize=cache_size)(self._find)
+
+    def __bool__(self):
+        return bool(self.ids_by_kw)
+
+    def search(self, text):
+        """키워드가 하나라도 있으면 첫 매치(없으면 None)."""
+        return self._search.search(text or "")
+
+    def finditer(self, text):
+        """(시작 위치, 가장 긴 키워드, 그 위치에서 걸린 ID 집합)을 yield."""
+        for m in self._scan.finditer(text or ""):
+            w = m.group(1)
+            yield m.start(), w, self._covered[w]
+
+    def _find(self, text):
+        ids = set()
+        for _, _, covered in self.finditer(text):
+            ids |= covered
+        return frozenset(ids)
+
+
+class KeywordProfile:
+    """그룹들을 KeywordSet 하나로 합친 프로필. groups(line)은 그 줄에 걸린 그룹 이름 집합."""
+
+    def __init__(self, groups):
+        self.words = {g: list(ws) for g, ws in groups.items()}
+        self.engine = KeywordSet({(g, w): [w] for g, ws in groups.items() for w in ws})
+        self._group_sets = {}
+
+    def hits(self, text):
+        """(그룹, 키워드) ID 집합."""
+        return self.engine.find(text)
+
+    def groups(self, text):
+        return {g for g, _ in self.engine.find(text)}
+
+    def has(self, text, group):
+        return any(g == group for g, _ in self.engine.find(text))
+
+    def keyword_set(self, group):
+        """그룹 하나만의 KeywordSet(표 행 이름 매칭 등에 사용)."""
+        ks = self._group_sets.get(group)
+        if ks is None:
+            ks = self._group_sets[group] = KeywordSet(self.words.get(group, []))
+        return ks
+
+
+def _load_overrides(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+_OVERRIDES = _load_overrides(os.environ["DART_KEYWORDS"]) if os.getenv("DART_KEYWORDS") else {}
+_PROFILE_CACHE = {}
+
+
+def get_profile(report_code=None):
+    """보고서 종류별 KeywordProfile(기본 그룹 + 종류별 그룹 + DART_KEYWORDS 파일). 같은 종류는 재사용."""
+    key = report_code if report_code in PROFILES or report_code in _OVERRIDES else "default"
+    prof = _PROFILE_CACHE.get(key)
+    if prof is None:
+        groups = dict(DEFAULT_GROUPS)
+        groups.update(PROFILES.get(key, {}))
+        groups.update(_OVERRIDES.get("default", {}))
+        if key != "default":
+            groups.update(_OVERRIDES.get(key, {}))
+        prof = _PROFILE_CACHE[key] = KeywordProfile(groups)
+    return prof
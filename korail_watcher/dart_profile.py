@@ -0,0 +1,130 @@
+import io, sys, json, time, threading, contextlib, collections
+
+# DART 파이프라인 단계별 시간/카운터 집계.
+#  - stage(이름): 구간 시간(누적 초, 호출 수). 배치에서는 스레드들의 합
+#  - count(이름, n): 받은 바이트, 파싱한 요소 수, 훑은 줄 수, 후보 수 등
+#  - report(): JSON으로 저장할 dict
+#  - run_profiler("cprofile"|"pyinstrument"): 함수 단위 프로파일(선택, pyinstrument는 설치된 경우만)
+# 파서 내부에서는 문서 하나를 다 읽은 뒤 한 번만 count()한다(요소마다 잠그지 않음).
+
+
+class Profiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.perf_counter()
+            self.stages = collections.defaultdict(lambda: [0, 0.0])   # 이름 → [호출 수, 누적 초]
+            self.counters = collections.Counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - t0)
+
+    def add_time(self, name, sec, calls=1):
+        with self._lock:
+            st = self.stages[name]
+            st[0] += calls
+            st[1] += sec
+
+    def count(self, name, n=1):
+        if n:
+            with self._lock:
+                self.counters[name] += n
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "stages": {k: list(v) for k, v in self.stages.items()},
+                "counters": dict(self.counters),
+            }
+
+    @staticmethod
+    def delta(after, before):
+        """두 snapshot의 차이(다른 프로세스에서 한 작업분만 떼어 낼 때)."""
+        stages = {}
+        for k, (calls, sec) in after["stages"].items():
+            c0, s0 = before["stages"].get(k, (0, 0.0))
+            if calls - c0:
+                stages[k] = [calls - c0, sec - s0]
+        counters = {k: v - before["counters"].get(k, 0) for k, v in after["counters"].items()}
+        return {"stages": stages, "counters": {k: v for k, v in counters.items() if v}}
+
+    def merge(self, snap):
+        with self._lock:
+            for k, (calls, sec) in (snap.get("stages") or {}).items():
+                st = self.stages[k]
+                st[0] += calls
+                st[1] += sec
+            self.counters.update(snap.get("counters") or {})
+
+    def report(self):
+        with self._lock:
+            return {
+                "wall_sec": round(time.perf_counter() - self.started, 4),
+                "stages": {k: {"calls": c, "sec": round(s, 4)} for k, (c, s) in self.stages.items()},
+                "counters": dict(self.counters),
+            }
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+    def summary(self):
+        rep = self.report()
+        parts = [f"{k} {v['sec']:.2f}s/{v['calls']}" for k, v in sorted(rep["stages"].items(), key=lambda x: -x[1]["sec"])]
+        cnts = " ".join(f"{k}={v:,}" for k, v in sorted(rep["counters"].items()))
+        return f"전체 {rep['wall_sec']:.2f}s | " + ", ".join(parts) + (f" | {cnts}" if cnts else "")
+
+
+PROFILER = Profiler()
+stage = PROFILER.stage
+count = PROFILER.count
+
+
+@contextlib.contextmanager
+def run_profiler(kind=None, out_path=None, top=25):
+    """
+    kind: None(끄기) / "cprofile" / "pyinstrument".
+    out_path: cprofile이면 pstats 파일, pyinstrument면 HTML. 없으면 요약만 stderr로.
+    """
+    if not kind:
+        yield
+        return
+    if kind == "cprofile":
+        import cProfile, pstats
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            if out_path:
+                prof.dump_stats(out_path)
+            buf = io.StringIO()
+            pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(top)
+            print(buf.getvalue(), file=sys.stderr)
+        return
+    if kind == "pyinstrument":
+        try:
+            from pyinstrument import Profiler as _Pyinstrument
+        except Exception:
+            raise SystemExit("pyinstrument가 설치되어 있지 않습니다. pip install pyinstrument")
+        prof = _Pyinstrument()
+        prof.start()
+        try:
+            yield
+        finally:
+            prof.stop()
+            if out_path:
+                with open(out_path, "w", encoding="utf-8") as f:
+                    f.write(prof.output_html())
+            print(prof.output_text(unicode=True), file=sys.stderr)
+        return
+    raise ValueError(f"알 수 없는 프로파일러: {kind}")
@@ -1,34 +1,22 @@
-import os, io, zipfile, argparse, json
-import xml.etree.ElementTree as ET
+import os, argparse, json
 import requests
 
+from dart_corpcode import load_corp_index
+from dart_cache import DartCache
 
-def fetch_corp_code(api_key: str, corp_name: str) -> str:
-    url = "https://opendart.fss.or.kr/api/corpCode.xml"
-    res = requests.get(url, params={"crtfc_key": api_key}, timeout=30)
-    res.raise_for_status()
-    content_type = (res.headers.get("Content-Type") or "").lower()
-    raw = res.content
-    # ZIP 응답 여부 확인 (Content-Type 또는 시그니처 PK)
-    is_zip = ("zip" in content_type) or (raw[:2] == b"PK")
-    if not is_zip:
-        # 오류 응답 본문을 그대로 보여주어 원인 파악
-        preview_text = res.text[:800]
-        raise RuntimeError(
-            f"corpCode 응답이 ZIP이 아닙니다. status={res.status_code} content-type={content_type}\n"
-            f"응답 본문(일부):\n{preview_text}\n"
-            "- 인증키 오류/요청 제한/서비스 점검 가능성 확인 필요"
-        )
-    z = zipfile.ZipFile(io.BytesIO(raw))
-    xml_bytes = z.read(z.namelist()[0])
-    root = ET.fromstring(xml_bytes.decode("utf-8"))
-    for el in root.iter("list"):
-        if el.findtext("corp_name") == corp_name:
-            return el.findtext("corp_code")
-    raise RuntimeError("corp_code not found for corp_name: " + corp_name)
-
-
-def call_list(api_key: str, corp_code: str, bgn_de: str, end_de: str, pblntf_ty: str = "", pblntf_detail_ty: str = ""):
+
+def fetch_corp_code(api_key: str, corp_name: str, refresh: bool = False, session=None) -> str:
+    # ZIP이 아닌 응답(인증키 오류 등)은 load_corp_index가 본문 일부와 함께 RuntimeError로 알려줌
+    index = load_corp_index(api_key, refresh=refresh, session=session)
+    code = index.corp_code(corp_name)
+    if code:
+        return code
+    similar = ", ".join(c.corp_name for c in index.fuzzy(corp_name))
+    raise RuntimeError("corp_code not found for corp_name: " + corp_name + (f" (유사: {similar})" if similar else ""))
+
+
+def call_list(api_key: str, corp_code: str, bgn_de: str, end_de: str, pblntf_ty: str = "", pblntf_detail_ty: str = "",
+              session=None):
     url = "https://opendart.fss.or.kr/api/list.json"
     params = {
         "crtfc_key": api_key,
@@ -40,7 +28,7 @@ def call_list(api_key: str, corp_code: str, bgn_de: str, end_de: str, pblntf_ty:
         "page_no": 1,
         "page_count": 1000,
     }
-    r = requests.get(url, params=params, timeout=30)
+    r = (session or requests).get(url, params=params, timeout=30)
     try:
         data = r.json()
     except Exception:
@@ -53,13 +41,17 @@ def main():
     parser.add_argument("--api-key", type=str, default=os.getenv("DART_API_KEY"), help="인증키. 미지정시 환경변수 DART_API_KEY 사용")
     parser.add_argument("--corp", type=str, default="한국맥널티")
     parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--refresh-corp", action="store_true", help="corpCode 캐시를 무시하고 다시 받기")
+    parser.add_argument("--offline", action="store_true", help="list.json을 캐시에서만 읽기")
+    parser.add_argument("--no-cache", action="store_true", help="list.json 응답 캐시를 쓰지 않음")
     args = parser.parse_args()
 
     if not args.api_key:
         raise SystemExit("API 키가 필요합니다. --api-key 또는 환경변수 DART_API_KEY 설정")
 
     print("[1] corp_code 조회…", flush=True)
-    corp_code = fetch_corp_code(args.api_key, args.corp)
+    http = None if args.no_cache else DartCache(offline=args.offline)
+    corp_code = fetch_corp_code(args.api_key, args.corp, refresh=args.refresh_corp, session=http)
     print("corp_code:", corp_code)
 
     yr = int(args.year)
@@ -72,11 +64,11 @@ def main():
     print("[2] list.json 점검…", flush=True)
     for bgn_de, end_de, label in ranges:
         if label == "no filter":
-            data, url = call_list(args.api_key, corp_code, bgn_de, end_de)
+            data, url = call_list(args.api_key, corp_code, bgn_de, end_de, session=http)
         elif "pblntf_ty=A" in label:
-            data, url = call_list(args.api_key, corp_code, bgn_de, end_de, pblntf_ty="A")
+            data, url = call_list(args.api_key, corp_code, bgn_de, end_de, pblntf_ty="A", session=http)
         else:
-            data, url = call_list(args.api_key, corp_code, bgn_de, end_de, pblntf_ty="A", pblntf_detail_ty="A001")
+            data, url = call_list(args.api_key, corp_code, bgn_de, end_de, pblntf_ty="A", pblntf_detail_ty="A001", session=http)
 
         status = data.get("status")
         message = data.get("message")
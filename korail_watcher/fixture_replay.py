@@ -0,0 +1,211 @@
+import os, sys, time, glob, json, argparse, statistics
+
+# 저장된 결과 페이지(korail_page_*.html 등)를 두 파서에 돌려 보고
+#   - 기대값(<페이지>.expected.json)과 hits가 같은지
+#   - 페이지별 지연(ms)과 전체 처리량(rows/sec)
+# 를 네트워크 없이 측정한다.
+#
+# 기대값 파일 형식:
+# {
+#   "watch": {"date": "2025-09-10", "window": "10:00,22:00", "train_types": ["KTX"]},
+#   "korail_watcher":  [["KTX 101", "10:05", "예약가능"], ...],
+#   "korail_watcher2": [["KTX", "07:23", "예약가능"], ...]
+# }
+
+PARSERS = ("korail_watcher", "korail_watcher2")
+# 저장소에 함께 넣어 둔 합성(synthetic) 결과 페이지(현재 디렉토리에 korail_page_*.html이 없을 때 사용).
+# 현재 SEL 셀렉터에 맞춰 손으로 쓴 HTML이라 실제 코레일 마크업이 바뀐 것은 잡지 못한다.
+# 셀렉터 변경을 확인하려면 scrape_once가 남긴 실제 korail_page_*.html로 돌릴 것
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "fixtures")
+
+
+class Kw2Parser:
+    """korail_watcher2.parse_and_find (BeautifulSoup)."""
+
+    name = "korail_watcher2"
+
+    def __init__(self):
+        import korail_watcher2
+        from bs4 import BeautifulSoup
+        self.mod = korail_watcher2
+        self._soup = BeautifulSoup
+
+    def load(self, html, watch_spec):
+        self.html = html
+        # 기대값 파일에 watch 조건이 있으면 그 조건으로, 없으면 모듈 기본 FILTER로
+        self.flt = None
+        if watch_spec and (watch_spec.get("window") or watch_spec.get("train_types") is not None):
+            from watch_filter import compile_filter
+            self.flt = compile_filter(
+                watch_spec.get("window") or self.mod.TARGET_WINDOW,
+                watch_spec.get("train_types", self.mod.TRAIN_TYPES),
+                watch_spec.get("exclude_types"),
+                watch_spec.get("exclude_windows"),
+            )
+
+    def count_rows(self):
+        return len(self._soup(self.html, "html.parser").select(self.mod.SEL["rows"]))
+
+    def run(self):
+        return self.mod.parse_and_find(self.html, self.flt)
+
+
+class KwParser:
+    """korail_watcher의 결과 행 추출 + 필터(Playwright, set_content로 오프라인 로드)."""
+
+    name = "korail_watcher"
+
+    def __init__(self):
+        import korail_watcher
+        from playwright.sync_api import sync_playwright
+        self.mod = korail_watcher
+        self._pw = sync_playwright().start()
+        self._browser = self._pw.chromium.launch(headless=True)
+        self.page = self._browser.new_page()
+        # 저장된 페이지가 참조하는 외부 리소스는 모두 차단
+        self.page.route("**/*", lambda route: route.abort())
+
+    def load(self, html, watch_spec):
+        self.page.set_content(html, wait_until="domcontentloaded")
+        spec = dict(watch_spec or {})
+        self.watch = self.mod.make_watch(
+            origin=spec.get("origin"),
+            dest=spec.get("dest"),
+            date=spec.get("date"),
+            window=spec.get("window"),
+            train_types=spec.get("train_types"),
+            exclude_types=spec.get("exclude_types"),
+            exclude_windows=spec.get("exclude_windows"),
+        )
+
+    def count_rows(self):
+        return len(self.mod.extract_rows(self.page))
+
+    def run(self):
+        rows = self.mod.find_result_rows(self.page, 2000)
+        return self.mod.rows_to_hits(rows, self.watch)
+
+    def close(self):
+        try:
+            self._browser.close()
+        finally:
+            self._pw.stop()
+
+
+def _make_parser(name):
+    return KwParser() if name == "korail_watcher" else Kw2Parser()
+
+
+def _expected_path(page_path):
+    return os.path.splitext(page_path)[0] + ".expected.json"
+
+
+def _load_expected(page_path):
+    path = _expected_path(page_path)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _as_lists(hits):
+    return [list(h) for h in hits]
+
+
+def replay(paths, parser_names=PARSERS, repeat=5, update=False):
+    """
+    각 페이지를 파서별로 repeat번 돌려 결과를 반환.
+    반환: {parser: {"pages": [...], "rows": n, "sec": t, "failed": k}}
+    """
+    report = {}
+    for pname in parser_names:
+        parser = _make_parser(pname)
+        pages = []
+        total_rows, total_sec, failed = 0, 0.0, 0
+        try:
+            for path in paths:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    html = f.read()
+                expected = _load_expected(path)
+                parser.load(html, expected.get("watch"))
+                n_rows = parser.count_rows()
+                samples = []
+                hits = []
+                for _ in range(max(1, repeat)):
+                    t0 = time.perf_counter()
+                    hits = parser.run()
+                    samples.append(time.perf_counter() - t0)
+                got = _as_lists(hits)
+                if update:
+                    expected[pname] = got
+                    with open(_expected_path(path), "w", encoding="utf-8") as f:
+                        json.dump(expected, f, ensure_ascii=False, indent=2)
+                want = expected.get(pname)
+                status = "-" if want is None else ("ok" if want == got else "FAIL")
+                if status == "FAIL":
+                    failed += 1
+                total_rows += n_rows * len(samples)
+                total_sec += sum(samples)
+                pages.append({
+                    "page": path,
+                    "rows": n_rows,
+                    "hits": len(got),
+                    "median_ms": statistics.median(samples) * 1000,
+                    "status": status,
+                    "got": got,
+                    "want": want,
+                })
+        finally:
+            if hasattr(parser, "close"):
+                parser.close()
+        report[pname] = {"pages": pages, "rows": total_rows, "sec": total_sec, "failed": failed}
+    return report
+
+
+def print_report(report):
+    for pname, r in report.items():
+        print(f"== {pname} ==")
+        for pg in r["pages"]:
+            print(f"  [{pg['status']:>4}] {pg['page']}: rows={pg['rows']} hits={pg['hits']} {pg['median_ms']:.2f}ms")
+            if pg["status"] == "FAIL":
+                print(f"         want={pg['want']}")
+                print(f"         got ={pg['got']}")
+        rps = r["rows"] / r["sec"] if r["sec"] else 0.0
+        print(f"  합계: {len(r['pages'])}페이지, {rps:,.0f} rows/sec, 실패 {r['failed']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="저장된 결과 페이지로 파서 정확도/속도 점검")
+    parser.add_argument("paths", nargs="*", help="HTML 파일 또는 디렉토리. 비우면 현재 디렉토리(없으면 tests/fixtures)의 korail_page_*.html")
+    parser.add_argument("--parsers", type=str, default=",".join(PARSERS), help="콤마 구분: korail_watcher,korail_watcher2")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--update", action="store_true", help="현재 결과를 기대값 파일로 저장")
+    parser.add_argument("--json", type=str, default=None, help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for p in (args.paths or ["."]):
+        if os.path.isdir(p):
+            paths.extend(sorted(glob.glob(os.path.join(p, "korail_page_*.html"))))
+        else:
+            paths.append(p)
+    if not paths and not args.paths:
+        paths = sorted(glob.glob(os.path.join(FIXTURE_DIR, "korail_page_*.html")))
+    if not paths:
+        raise SystemExit("재생할 HTML이 없습니다.")
+
+    names = [n.strip() for n in args.parsers.split(",") if n.strip()]
+    unknown = [n for n in names if n not in PARSERS]
+    if unknown:
+        raise SystemExit(f"알 수 없는 파서: {', '.join(unknown)}")
+
+    report = replay(paths, names, repeat=args.repeat, update=args.update)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if any(r["failed"] for r in report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import time, sqlite3, threading
+from datetime import date as _date
+
+# 재시작/다중 프로세스에서도 유지되는 알림 중복제거 저장소(SQLite).
+# (watch, 날짜, 열차, 출발시각)마다 현재 상태(예약가능/매진)를 기록하고
+#   매진 → 예약가능 으로 바뀔 때만 "새 hit"으로 본다.
+# 지난 날짜의 기록은 purge_expired()로 지운다. 메모리에 쌓아두는 것이 없어 장시간 실행해도 일정하다.
+
+AVAILABLE, SOLD_OUT = 1, 0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hits (
+    watch       TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    train       TEXT NOT NULL,
+    dep_time    TEXT NOT NULL,
+    state       INTEGER NOT NULL,
+    status      TEXT,
+    first_seen  REAL NOT NULL,
+    last_change REAL NOT NULL,
+    last_seen   REAL NOT NULL,
+    PRIMARY KEY (watch, date, train, dep_time)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS hits_date ON hits(date);
+"""
+
+
+class HitStore:
+    def __init__(self, path=":memory:", purge_every=3600):
+        self.path = path
+        self.purge_every = purge_every
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        if path != ":memory:":
+            # 여러 프로세스가 같은 파일을 써도 읽기/쓰기가 서로 막히지 않도록
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._last_purge = 0.0
+        self.purge_expired()
+
+    def purge_expired(self, today=None):
+        """날짜가 지난 기록을 삭제. 삭제 건수 반환."""
+        today = today or _date.today().isoformat()
+        with self._lock:
+            cur = self._db.execute("DELETE FROM hits WHERE date < ?", (today,))
+            self._last_purge = time.monotonic()
+            return cur.rowcount
+
+    def update(self, watch, date, hits, complete=True):
+        """
+        이번 조회 결과를 반영하고, 알림을 보내야 할 hit만 반환.
+        hits: [(train, dep_time, status), ...] (예약가능 행)
+        complete: 이번 조회가 정상 완료됐는지. True일 때만 hits에 없는 기존 예약가능 열차를 매진으로 바꾼다.
+        """
+        if time.monotonic() - self._last_purge > self.purge_every:
+            self.purge_expired()
+        now = time.time()
+        new_hits = []
+        with self._lock:
+            db = self._db
+            # 다른 프로세스와 같은 hit를 동시에 알리지 않도록 쓰기 잠금을 먼저 잡는다
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                current = set()
+                for train, dep_time, status in hits:
+                    current.add((train, dep_time))
+                    row = db.execute(
+                        "SELECT state FROM hits WHERE watch=? AND date=? AND train=? AND dep_time=?",
+                        (watch, date, train, dep_time),
+                    ).fetchone()
+                    if row is None:
+                        db.execute(
+                            "INSERT INTO hits VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            (watch, date, train, dep_time, AVAILABLE, status, now, now, now),
+                        )
+                        new_hits.append((train, dep_time, status))
+                    elif row[0] != AVAILABLE:
+                        db.execute(
+                            "UPDATE hits SET state=?, status=?, last_change=?, last_seen=? "
+                            "WHERE watch=? AND date=? AND train=? AND dep_time=?",
+                            (AVAILABLE, status, now, now, watch, date, train, dep_time),
+                        )
+                        new_hits.append((train, dep_time, status))
+                    else:
+                        db.execute(
+                            "UPDATE hits SET status=?, last_seen=? WHERE watch=? AND date=? AND train=? AND dep_time=?",
+                            (status, now, watch, date, train, dep_time),
+                        )
+                if complete:
+                    rows = db.execute(
+                        "SELECT train, dep_time FROM hits WHERE watch=? AND date=? AND state=?",
+                        (watch, date, AVAILABLE),
+                    ).fetchall()
+                    for train, dep_time in rows:
+                        if (train, dep_time) not in current:
+                            db.execute(
+                                "UPDATE hits SET state=?, last_change=? WHERE watch=? AND date=? AND train=? AND dep_time=?",
+                                (SOLD_OUT, now, watch, date, train, dep_time),
+                            )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return new_hits
+
+    def history(self, watch=None, date=None):
+        sql = "SELECT watch, date, train, dep_time, state, status, first_seen, last_change, last_seen FROM hits"
+        cond, args = [], []
+        if watch is not None:
+            cond.append("watch=?")
+            args.append(watch)
+        if date is not None:
+            cond.append("date=?")
+            args.append(date)
+        if cond:
+            sql += " WHERE " + " AND ".join(cond)
+        with self._lock:
+            return self._db.execute(sql + " ORDER BY date, dep_time", args).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
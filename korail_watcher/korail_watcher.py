@@ -1,19 +1,42 @@
-import os, sys, time, re, random, logging, traceback, argparse
-from datetime import datetime, timedelta
+import os, time, re, random, logging, traceback, argparse, json, heapq, socket, threading, queue, weakref, atexit
+from datetime import datetime
 from dotenv import load_dotenv
-from plyer import notification
 
 from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
 
+from poll_scheduler import AdaptivePolicy, HostBudget, PollStats, parse_hot_windows, OK, TIMEOUT, ERROR, EMPTY, UNCHANGED
+from change_detect import ChangeDetector, Unchanged
+from hit_store import HitStore
+from timeseries import TimeSeriesStore
+from watch_filter import compile_filter, parse_windows
+import notifier
+
 # ====== 사용자 설정 ======
 ORIGIN = "창원중앙"          # 출발역
 DEST = "서울"            # 도착역
 DATE = "2025-09-10"      # YYYY-MM-DD
 TARGET_WINDOW = ("10:00", "22:00")  # 감시 시각대
+TARGET_WINDOWS = None    # 여러 시각대를 쓸 때 [(시작, 끝), ...]. None이면 TARGET_WINDOW 하나
 TRAIN_TYPES = {"KTX", "SRT"}  # 필터. 비우면 전체
+EXCLUDE_TYPES = set()    # 제외할 열차 종류(예: {"무궁화"})
 REFRESH_SEC = 20         # 재조회 간격(초). 과도한 요청은 피하세요.
 STOP_ON_FIRST_HIT = True # 첫 발견 시 종료 여부
+HOT_WINDOWS = ""         # 집중 조회 구간. "HH:MM-HH:MM"(매일) 또는 "-3h"(출발 3시간 전부터), 콤마 구분
+BURST_SEC = 5            # 집중 조회 구간 안에서의 간격(초)
+MAX_BACKOFF_SEC = 300    # 타임아웃/예외가 이어질 때 최대 대기(초)
+HOST_RATE = 0.5          # 호스트당 초당 요청 수 상한(모든 watch 공유). 0이면 제한 없음
+HOST_BURST = 3           # 호스트당 순간 허용 요청 수
+STATS_EVERY_SEC = 300    # 실제 폴링 속도 로그 주기(초)
+HIT_DB = "korail_hits.sqlite3"  # 알림 중복제거 기록(재시작/다중 프로세스 공유). ":memory:"면 저장 안 함
+TS_DB = None             # 조회 결과 시계열 기록 SQLite 경로(timeseries.py로 조회). None이면 기록 안 함
 HEADLESS = True          # 로그인이 필요하면 False로 띄워서 처리
+WATCHLIST = None         # 감시 목록 JSON 경로. 지정하면 여러 노선/날짜를 한 브라우저에서 감시
+PAGE_POOL_SIZE = 3       # 다중 감시 모드에서 동시에 쓰는 페이지 수(메모리는 이 값에 비례)
+STORAGE_STATE = None     # 쿠키/로그인 상태를 저장·복원할 JSON 경로
+USER_DATA_DIR = None     # 지정하면 영구 프로필(쿠키+캐시)로 실행. STORAGE_STATE보다 우선
+WARM_REUSE = True        # 결과 페이지가 떠 있으면 goto 없이 입력만 바꿔 재조회
+BATCH_EXTRACT = True     # 결과 행을 evaluate 한 번으로 추출(False면 행별 query_selector)
+CHANGE_DETECT = True     # 이전 조회와 결과(JSON 본문/결과 행)가 같으면 필터·중복제거·알림을 건너뜀
 
 # 문자열 패턴(페이지에 실제로 보이는 텍스트에 맞춰 조정)
 NOT_AVAILABLE_PAT = re.compile(r"불가|불가능|매진|마감|대기만|대기\s*만|없음", re.I)
@@ -36,28 +59,20 @@ SEL = {
 }
 URL = "https://www.korail.com/ticket/search/general#"  # 코레일 새 검색 페이지
 
+# ====== JSON 검색 API 모드 ======
+API_MODE = False         # True면 첫 조회 때 검색 XHR을 캡처해 두고 이후엔 그 요청만 재전송
+SEARCH_API_PAT = re.compile(r"search|schedule|train|tcktSrch", re.I)  # 캡처할 XHR URL 패턴
+# JSON 행(dict)에서 값을 찾을 키 후보(앞쪽 우선). 실제 응답에 맞춰 조정
+API_FIELDS = {
+    "train":  ["h_trn_clsf_nm", "trnClsfNm", "trainType", "train_type", "trainName"],
+    "time":   ["h_dpt_tm_qb", "h_dpt_tm", "dptTm", "depTime", "departureTime", "dep_time"],
+    "status": ["h_rsv_psb_nm", "h_gen_rsv_nm", "h_spe_rsv_nm", "rsvPsbNm", "seatStatus", "status"],
+}
+
 # ====== 알림 ======
+# 전송은 notifier.notify()가 백그라운드 워커로 처리하므로 폴링 루프를 막지 않는다.
 load_dotenv()
 
-def desktop_notify(title, msg):
-    try:
-        notification.notify(title=title, message=msg, timeout=10)
-    except Exception:
-        pass
-
-def telegram_notify(text):
-    token = os.getenv("TELEGRAM_BOT_TOKEN")
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
-    if not token or not chat_id:
-        return
-    import urllib.parse, urllib.request
-    data = urllib.parse.urlencode({"chat_id": chat_id, "text": text}).encode()
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
-    try:
-        urllib.request.urlopen(url, data=data, timeout=10).read()
-    except Exception:
-        pass
-
 def is_available(stat_txt: str) -> bool:
     s = (stat_txt or "").strip()
     if NOT_AVAILABLE_PAT.search(s):
@@ -71,38 +86,82 @@ def safe_text(row, sel: str) -> str:
     except Exception:
         return ""
 
-def in_window(t_str, win):
-    try:
-        t = datetime.strptime(t_str, "%H:%M").time()
-        a = datetime.strptime(win[0], "%H:%M").time()
-        b = datetime.strptime(win[1], "%H:%M").time()
-        return a <= t <= b if a <= b else (t >= a or t <= b)
-    except Exception:
-        return False
+# ====== 감시 대상(watch) ======
 
-def filter_train_type(txt):
-    if not TRAIN_TYPES:
-        return True
-    return any(kind in txt for kind in TRAIN_TYPES)
+def parse_train_types(txt):
+    if isinstance(txt, (list, tuple, set)):
+        return {str(t).strip() for t in txt if str(t).strip()}
+    return {t.strip() for t in str(txt or "").split(",") if t.strip()}
 
-def scrape_once(page):
-    TIMEOUT_MS = 60000
-    page.goto(URL, wait_until="domcontentloaded", timeout=TIMEOUT_MS)
-    # 입력
-    page.fill(SEL["origin_input"], "")
-    page.fill(SEL["origin_input"], ORIGIN)
-    # 자동완성 확정(가능한 경우)
-    try:
-        ac = page.locator(SEL["ac_list"]).first
-        if ac.is_visible():
-            page.locator(SEL["ac_option"]).first.click()
-        else:
-            page.keyboard.press("Enter")
-    except Exception:
-        pass
+def make_watch(origin=None, dest=None, date=None, window=None, train_types=None, refresh=None, name=None, hot=None,
+               exclude_types=None, exclude_windows=None):
+    """
+    감시 작업 하나를 dict로 만든다. 빠진 값은 모듈 설정값을 따른다.
+    조건은 "filter"(WatchFilter)로, 집중 조회 구간은 "hot"으로 한 번 파싱해 두고 재사용한다(잘못되면 ValueError).
+    """
+    windows = parse_windows(window) if window else list(TARGET_WINDOWS or [TARGET_WINDOW])
+    if not windows:
+        raise ValueError(f"시각대가 비어 있습니다: {window!r}")
+    w = {
+        "origin": origin or ORIGIN,
+        "dest": dest or DEST,
+        "date": date or DATE,
+        "window": windows[0],
+        "windows": windows,
+        "train_types": parse_train_types(train_types) if train_types is not None else set(TRAIN_TYPES),
+        "exclude_types": parse_train_types(exclude_types) if exclude_types is not None else set(EXCLUDE_TYPES),
+        "refresh": float(refresh) if refresh else float(REFRESH_SEC),
+        "hot": parse_hot_windows(hot),
+    }
+    w["filter"] = compile_filter(windows, w["train_types"], w["exclude_types"], exclude_windows)
+    w["name"] = name or f"{w['origin']}->{w['dest']} {w['date']}"
+    return w
+
+def current_watch():
+    return make_watch()
 
-    page.fill(SEL["dest_input"], "")
-    page.fill(SEL["dest_input"], DEST)
+def load_watchlist(path):
+    """
+    감시 목록(JSON)을 읽어 watch dict 리스트로 반환.
+    형식: [{"origin": "..", "dest": "..", "date": "YYYY-MM-DD", "window": "HH:MM,HH:MM[;HH:MM,HH:MM]",
+            "train_types": ["KTX"], "exclude_types": ["무궁화"], "exclude_windows": "12:00,13:00",
+            "refresh": 20, "name": "..", "hot": "-3h"}, ...]
+    또는 {"watches": [...]} 형태도 허용.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("watches") or []
+    watches = []
+    names = set()
+    for i, item in enumerate(data):
+        if not isinstance(item, dict):
+            raise ValueError(f"watchlist 항목 #{i}가 객체가 아닙니다: {item!r}")
+        watches.append(make_watch(
+            origin=item.get("origin"),
+            dest=item.get("dest"),
+            date=item.get("date"),
+            window=item.get("window"),
+            train_types=item.get("train_types"),
+            refresh=item.get("refresh"),
+            name=item.get("name"),
+            hot=item.get("hot"),
+            exclude_types=item.get("exclude_types"),
+            exclude_windows=item.get("exclude_windows"),
+        ))
+        # 스케줄러/중복제거 키로 쓰므로 이름은 유일해야 함
+        if watches[-1]["name"] in names:
+            watches[-1]["name"] += f" #{i}"
+        names.add(watches[-1]["name"])
+    return watches
+
+class NoResults(Exception):
+    pass
+
+def _fill_station(page, sel, value):
+    page.fill(sel, "")
+    page.fill(sel, value)
+    # 자동완성 확정(가능한 경우)
     try:
         ac = page.locator(SEL["ac_list"]).first
         if ac.is_visible():
@@ -112,19 +171,137 @@ def scrape_once(page):
     except Exception:
         pass
 
+def _fill_date(page, value):
     # 날짜 설정: type=date가 아니면 JS로 value 설정 후 change 이벤트 디스패치
     try:
-        page.fill(SEL["date_input"], DATE)
+        page.fill(SEL["date_input"], value)
     except Exception:
         try:
             page.eval_on_selector(
                 SEL["date_input"],
                 "(el, v)=>{el.value=v; el.dispatchEvent(new Event('input',{bubbles:true})); el.dispatchEvent(new Event('change',{bubbles:true}));}",
-                arg=DATE,
+                arg=value,
             )
         except Exception:
             pass
 
+# 페이지별 마지막 조회 조건. 결과 페이지가 살아 있으면 바뀐 입력만 고쳐서 다시 조회한다.
+_LAST_QUERY = weakref.WeakKeyDictionary()
+
+def _is_search_page(page) -> bool:
+    try:
+        if page.url.split("#", 1)[0] != URL.split("#", 1)[0]:
+            return False
+        return page.query_selector(SEL["origin_input"]) is not None
+    except Exception:
+        return False
+
+# ====== 결과 행 추출 ======
+# 행마다 query_selector를 여러 번 부르면 행당 CDP 왕복이 5회가 넘는다.
+# 한 번의 eval_on_selector_all로 모든 행의 [열차, 시각, 상태, 예약버튼, 매진배지]를 배열로 받아온다.
+_HAS_TEXT_PAT = re.compile(r"""^(.*?):has-text\((['"])(.*)\2\)$""")
+
+def _css_text_pairs(sel: str):
+    """Playwright 셀렉터 목록을 [css, 포함텍스트] 쌍으로 나눈다(:has-text는 DOM에 없으므로 JS에서 처리)."""
+    pairs = []
+    for part in sel.split(","):
+        part = part.strip()
+        m = _HAS_TEXT_PAT.match(part)
+        pairs.append([m.group(1) or "*", m.group(3)] if m else [part, ""])
+    return pairs
+
+ROWS_JS = """
+(rows, sel) => {
+  const find = (row, pairs) => {
+    for (const [css, txt] of pairs) {
+      for (const n of row.querySelectorAll(css)) {
+        if (!txt || (n.textContent || "").includes(txt)) return n;
+      }
+    }
+    return null;
+  };
+  const text = (row, pairs) => {
+    const n = find(row, pairs);
+    return n ? (n.innerText || n.textContent || "").trim() : "";
+  };
+  return rows.map(r => [
+    text(r, sel.train), text(r, sel.time), text(r, sel.status),
+    !!find(r, sel.reserve), !!find(r, sel.soldout),
+  ]);
+}
+"""
+
+def _rows_js_arg():
+    return {
+        "train": _css_text_pairs(SEL["col_train"]),
+        "time": _css_text_pairs(SEL["col_time"]),
+        "status": _css_text_pairs(SEL["col_status"]),
+        "reserve": _css_text_pairs(SEL["reserve_btn"]),
+        "soldout": _css_text_pairs(SEL["soldout_badge"]),
+    }
+
+def extract_rows_batched(scope):
+    """page/frame에서 결과 행을 한 번의 evaluate로 추출."""
+    data = scope.eval_on_selector_all(SEL["result_rows"], ROWS_JS, _rows_js_arg())
+    return [(str(t), str(d), str(s), bool(rv), bool(so)) for t, d, s, rv, so in data]
+
+def extract_rows_handles(scope):
+    """예전 방식: 행마다 query_selector로 추출(비교/벤치마크용)."""
+    out = []
+    for r in scope.query_selector_all(SEL["result_rows"]):
+        train_txt = safe_text(r, SEL["col_train"])
+        time_txt  = safe_text(r, SEL["col_time"])
+        stat_txt  = safe_text(r, SEL["col_status"])
+        try:
+            has_reserve = bool(r.query_selector(SEL["reserve_btn"]))
+            is_soldout  = bool(r.query_selector(SEL["soldout_badge"]))
+        except Exception:
+            has_reserve = is_soldout = False
+        out.append((train_txt, time_txt, stat_txt, has_reserve, is_soldout))
+    return out
+
+def extract_rows(scope):
+    return extract_rows_batched(scope) if BATCH_EXTRACT else extract_rows_handles(scope)
+
+def _result_scopes(page, timeout_ms):
+    yield page, timeout_ms
+    for f in page.frames:
+        if f is not page.main_frame:
+            yield f, 3000
+    for p in reversed(page.context.pages):
+        if p is not page:
+            yield p, 3000
+
+def find_result_rows(page, timeout_ms):
+    """결과 행을 현재 페이지 → 프레임 → 새 탭/팝업 순으로 찾아 추출한다."""
+    try:
+        for scope, wait_ms in _result_scopes(page, timeout_ms):
+            try:
+                scope.wait_for_selector(SEL["result_rows"], timeout=wait_ms)
+                rows = extract_rows(scope)
+                if rows:
+                    return rows
+            except Exception:
+                continue
+    except Exception:
+        pass
+    return []
+
+def scrape_once(page, watch=None):
+    w = watch or current_watch()
+    TIMEOUT_MS = 60000
+    last = _LAST_QUERY.pop(page, None) if WARM_REUSE else None
+    if last is None or not _is_search_page(page):
+        page.goto(URL, wait_until="domcontentloaded", timeout=TIMEOUT_MS)
+        last = {}
+    # 입력(재조회 시엔 바뀐 항목만)
+    if last.get("origin") != w["origin"]:
+        _fill_station(page, SEL["origin_input"], w["origin"])
+    if last.get("dest") != w["dest"]:
+        _fill_station(page, SEL["dest_input"], w["dest"])
+    if last.get("date") != w["date"]:
+        _fill_date(page, w["date"])
+
     page.click(SEL["search_btn"])
     # 네트워크 안정 상태 대기
     try:
@@ -132,41 +309,9 @@ def scrape_once(page):
     except Exception:
         pass
     # 결과 탐색: 현재 페이지 → 프레임 → 새 탭/팝업
-    rows = []
-    try:
-        page.wait_for_selector(SEL["result_rows"], timeout=TIMEOUT_MS)
-        rows = page.query_selector_all(SEL["result_rows"])
-    except Exception:
-        rows = []
-    if not rows:
-        try:
-            for f in page.frames:
-                if f is page.main_frame:
-                    continue
-                try:
-                    f.wait_for_selector(SEL["result_rows"], timeout=3000)
-                    rows = f.query_selector_all(SEL["result_rows"])
-                    if rows:
-                        break
-                except Exception:
-                    continue
-        except Exception:
-            rows = []
-    if not rows:
-        try:
-            for p in reversed(page.context.pages):
-                if p is page:
-                    continue
-                try:
-                    p.wait_for_selector(SEL["result_rows"], timeout=3000)
-                    cand = p.query_selector_all(SEL["result_rows"])
-                    if cand:
-                        rows = cand
-                        break
-                except Exception:
-                    continue
-        except Exception:
-            rows = []
+    rows = find_result_rows(page, TIMEOUT_MS)
+    if rows and WARM_REUSE:
+        _LAST_QUERY[page] = {"origin": w["origin"], "dest": w["dest"], "date": w["date"]}
     # 디버깅: 여전히 못 찾았으면 스냅샷 저장
     if not rows:
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -180,35 +325,519 @@ def scrape_once(page):
                 f.write(html)
         except Exception:
             pass
+        # 빈 결과를 "전부 매진"으로 오인하지 않도록 실패로 알린다
+        raise NoResults("결과 행을 찾지 못함")
+    if CHANGES is not None and not CHANGES.changed(("rows", w["name"]), rows):
+        raise Unchanged("결과 행 동일")
+    return rows_to_hits(rows, w)
+
+def rows_to_hits(rows, watch):
+    """extract_rows 결과를 watch 조건으로 걸러 hits 리스트로 변환."""
     hits = []
-    for r in rows:
+    for train_txt, time_txt, stat_txt, has_reserve, is_soldout in rows:
         # 카드형 대비: 기본은 테이블 열, 보조로 버튼/배지 확인
-        train_txt = safe_text(r, SEL["col_train"])
-        time_txt  = safe_text(r, SEL["col_time"])
-        stat_txt  = safe_text(r, SEL["col_status"])
+        if has_reserve:
+            stat_txt = (stat_txt + " 예약가능").strip()
+        if is_soldout:
+            stat_txt = (stat_txt + " 매진").strip()
+
+        hit = match_row(train_txt, time_txt, stat_txt, watch)
+        if hit:
+            hits.append(hit)
+    return hits
+
+def match_row(train_txt, time_txt, stat_txt, watch):
+    """행 하나를 watch 조건으로 걸러 (train, dep_time, status) 또는 None을 반환."""
+    # 시간 추출
+    m = TIME_PAT.search(time_txt)
+    dep_time = m.group(1) if m else None
+
+    if not dep_time:
+        return None
+    flt = watch["filter"]
+    if not flt.train_ok(train_txt):
+        return None
+    if not flt.time_ok(dep_time):
+        return None
+    if is_available(stat_txt):
+        return (train_txt, dep_time, stat_txt)
+    return None
+
+# ====== JSON 검색 API 직접 호출 모드 ======
+class SessionExpired(Exception):
+    pass
+
+def _is_search_response(resp) -> bool:
+    try:
+        if resp.request.resource_type not in {"xhr", "fetch"}:
+            return False
+        if not SEARCH_API_PAT.search(resp.url):
+            return False
+        return "json" in (resp.headers.get("content-type") or "").lower()
+    except Exception:
+        return False
+
+def _pick(item: dict, keys) -> str:
+    for k in keys:
+        v = item.get(k)
+        if v not in (None, ""):
+            return str(v)
+    return ""
+
+def _norm_time(txt: str) -> str:
+    m = TIME_PAT.search(txt or "")
+    if m:
+        return m.group(1)
+    digits = re.sub(r"\D", "", txt or "")
+    # "HHMM" / "HHMMSS" 형태 보정
+    if len(digits) in (4, 6):
+        return f"{digits[:2]}:{digits[2:4]}"
+    return ""
+
+def _iter_row_dicts(data):
+    """JSON 안에서 열차 행으로 보이는 dict 리스트를 찾는다(가장 긴 리스트 우선)."""
+    best = []
+    stack = [data]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            stack.extend(cur.values())
+        elif isinstance(cur, list):
+            dicts = [x for x in cur if isinstance(x, dict)]
+            if len(dicts) > len(best) and any(_pick(d, API_FIELDS["time"]) for d in dicts):
+                best = dicts
+            stack.extend(cur)
+    return best
+
+def hits_from_json(data, watch):
+    rows = _iter_row_dicts(data)
+    if not rows:
+        return None
+    hits = []
+    for item in rows:
+        train_txt = _pick(item, API_FIELDS["train"])
+        time_txt = _norm_time(_pick(item, API_FIELDS["time"]))
+        stat_txt = " ".join(str(item[k]) for k in API_FIELDS["status"] if item.get(k) not in (None, ""))
+        hit = match_row(train_txt, time_txt, stat_txt, watch)
+        if hit:
+            hits.append(hit)
+    return hits
+
+class SearchReplayer:
+    """
+    검색 페이지가 보내는 XHR/fetch 요청을 watch별로 한 번 캡처해 두고,
+    이후 폴링은 컨텍스트 쿠키로 그 요청만 재전송해 JSON을 파싱한다.
+    세션 만료로 보이면 캡처를 버리고 전체 페이지 조회로 돌아간다.
+    """
+
+    def __init__(self):
+        self._requests = {}
+
+    def has(self, watch) -> bool:
+        return watch["name"] in self._requests
+
+    def forget(self, watch):
+        self._requests.pop(watch["name"], None)
+        if CHANGES is not None:
+            CHANGES.forget(("api", watch["name"]))
+
+    def scrape_and_capture(self, page, watch):
+        captured = []
+
+        def _on_response(resp):
+            if _is_search_response(resp):
+                req = resp.request
+                captured.append({
+                    "url": req.url,
+                    "method": req.method,
+                    "headers": {k: v for k, v in req.headers.items() if not k.startswith(":")},
+                    "data": req.post_data,
+                })
+
+        page.on("response", _on_response)
         try:
-            has_reserve = bool(r.query_selector(SEL["reserve_btn"]))
-            is_soldout  = bool(r.query_selector(SEL["soldout_badge"]))
-            if has_reserve:
-                stat_txt = (stat_txt + " 예약가능").strip()
-            if is_soldout:
-                stat_txt = (stat_txt + " 매진").strip()
+            return scrape_once(page, watch)
+        finally:
+            try:
+                page.remove_listener("response", _on_response)
+            except Exception:
+                pass
+            # 결과가 이전과 같아(Unchanged) 예외로 끝나도 캡처는 남긴다
+            if captured:
+                self._requests[watch["name"]] = captured[-1]
+                logging.info(f"[{watch['name']}] 검색 API 캡처: {captured[-1]['method']} {captured[-1]['url']}")
+
+    def replay(self, page, watch):
+        req = self._requests[watch["name"]]
+        key = ("api", watch["name"])
+        headers = dict(req["headers"], **CHANGES.request_headers(key)) if CHANGES is not None else req["headers"]
+        resp = page.context.request.fetch(
+            req["url"],
+            method=req["method"],
+            headers=headers,
+            data=req["data"],
+            timeout=15000,
+        )
+        if CHANGES is not None and CHANGES.not_modified(key, resp.status):
+            raise Unchanged("304")
+        if resp.status != 200 or "json" not in (resp.headers.get("content-type") or "").lower():
+            raise SessionExpired(f"status={resp.status}")
+        body = resp.body()
+        if CHANGES is not None and CHANGES.same(key, body):
+            raise Unchanged("본문 동일")
+        try:
+            data = json.loads(body)
         except Exception:
+            raise SessionExpired("JSON 아님")
+        hits = hits_from_json(data, watch)
+        if hits is None:
+            raise SessionExpired("열차 목록 없음")
+        if CHANGES is not None:
+            CHANGES.update(key, body, headers=resp.headers)
+        return hits
+
+    def poll(self, page, watch):
+        if self.has(watch):
+            try:
+                return self.replay(page, watch)
+            except SessionExpired as e:
+                logging.info(f"[{watch['name']}] 세션 만료로 판단({e}) → 페이지 재조회")
+                self.forget(watch)
+        return self.scrape_and_capture(page, watch)
+
+def _block_heavy_resources(ctx):
+    # 리소스 차단(속도 향상)
+    def _route_handler(route):
+        try:
+            rtype = getattr(route.request, "resource_type", None)
+            if callable(rtype):
+                rtype = rtype()
+            if rtype in {"image", "font", "stylesheet"}:
+                return route.abort()
+            return route.continue_()
+        except Exception:
+            try:
+                return route.continue_()
+            except Exception:
+                return None
+
+    try:
+        ctx.route("**/*", _route_handler)
+    except Exception:
+        pass
+
+def _context_kwargs():
+    if STORAGE_STATE and os.path.exists(STORAGE_STATE):
+        return {"storage_state": STORAGE_STATE}
+    return {}
+
+def open_context(p, launch_args=None, new_context=True):
+    """
+    (browser, ctx)를 반환. USER_DATA_DIR이면 영구 컨텍스트라 browser는 None.
+    아니면 STORAGE_STATE가 있을 때 그 쿠키/로그인 상태로 컨텍스트를 만든다(new_context=False면 ctx는 None).
+    """
+    args = list(launch_args or [])
+    if USER_DATA_DIR:
+        ctx = p.chromium.launch_persistent_context(USER_DATA_DIR, headless=HEADLESS, args=args)
+        return None, ctx
+    browser = p.chromium.launch(headless=HEADLESS, args=args)
+    return browser, (browser.new_context(**_context_kwargs()) if new_context else None)
+
+_STATE_LOCK = threading.Lock()
+
+def save_storage_state(ctx):
+    """
+    쿠키/로그인 상태를 STORAGE_STATE에 저장. 다중 감시 모드의 페이지 워커들이 종료하면서 동시에 부르므로
+    임시 파일에 쓴 뒤 os.replace로 바꾼다(다음 open_context가 잘린 JSON을 읽지 않도록).
+    """
+    if not STORAGE_STATE:
+        return
+    tmp = f"{STORAGE_STATE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        state = ctx.storage_state()
+        os.makedirs(os.path.dirname(STORAGE_STATE) or ".", exist_ok=True)
+        with _STATE_LOCK:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp, STORAGE_STATE)
+    except Exception:
+        logging.warning("storage state 저장 실패:\n" + traceback.format_exc())
+        try:
+            os.remove(tmp)
+        except OSError:
             pass
 
-        # 시간 추출
-        m = TIME_PAT.search(time_txt)
-        dep_time = m.group(1) if m else None
-
-        if not dep_time:
-            continue
-        if not filter_train_type(train_txt):
-            continue
-        if not in_window(dep_time, TARGET_WINDOW):
-            continue
-        if is_available(stat_txt):
-            hits.append((train_txt, dep_time, stat_txt))
-    return hits
+def close_context(browser, ctx):
+    try:
+        if ctx is not None:
+            save_storage_state(ctx)
+            ctx.close()
+    finally:
+        if browser is not None:
+            browser.close()
+
+# ====== 폴링 정책/예산/통계(모든 watch·페이지 워커 공유) ======
+POLICY = None
+BUDGET = None
+STATS = None
+CHANGES = None
+
+def init_polling():
+    global POLICY, BUDGET, STATS, CHANGES
+    POLICY = AdaptivePolicy(HOT_WINDOWS, burst_sec=BURST_SEC, max_backoff=MAX_BACKOFF_SEC)
+    BUDGET = HostBudget(HOST_RATE, HOST_BURST)
+    STATS = PollStats()
+    CHANGES = ChangeDetector() if CHANGE_DETECT else None
+
+def _scrape_logged(page, watch, replayer=None):
+    """한 번 조회하고 (hits, outcome)을 반환. outcome은 ok/unchanged/timeout/error."""
+    if BUDGET is not None:
+        BUDGET.acquire(URL)
+    outcome, hits = OK, []
+    try:
+        if replayer is not None:
+            hits = replayer.poll(page, watch)
+        else:
+            hits = scrape_once(page, watch)
+    except PWTimeout:
+        logging.warning(f"[{watch['name']}] 페이지 타임아웃")
+        outcome = TIMEOUT
+    except NoResults:
+        logging.warning(f"[{watch['name']}] 결과 행 없음(스냅샷 저장)")
+        outcome = EMPTY
+    except Unchanged:
+        outcome = UNCHANGED
+    except Exception:
+        logging.error(f"[{watch['name']}] 예외 발생:\n" + traceback.format_exc())
+        outcome = ERROR
+    if STATS is not None:
+        STATS.record(outcome)
+    _record_poll(watch, hits, outcome)
+    return hits, outcome
+
+def _next_delay(watch, outcome):
+    if POLICY is None:
+        return max(1.0, watch["refresh"] + random.uniform(-3, 3))
+    return POLICY.next_delay(watch, outcome)
+
+class _StatsLogger:
+    def __init__(self, every=None):
+        self.every = STATS_EVERY_SEC if every is None else every
+        self._last = time.monotonic()
+
+    def tick(self):
+        if STATS is None or not self.every:
+            return
+        now = time.monotonic()
+        if now - self._last >= self.every:
+            self._last = now
+            logging.info(STATS.summary())
+
+TS = None
+_TS_LAST = {}       # watch 이름 → 마지막으로 기록한 예약가능 열차 집합
+_TS_LOCK = threading.Lock()
+
+def init_timeseries():
+    global TS
+    if TS_DB and TS is None:
+        TS = TimeSeriesStore(TS_DB)
+        atexit.register(TS.close)
+
+def _record_poll(watch, hits, outcome):
+    """
+    조회 한 번을 시계열로 남긴다.
+      korail:<watch>:avail            예약가능 열차 수(실패면 값 없이 결과만)
+      korail:<watch>:<HH:MM> <열차>   열차별 1(열림)/0(닫힘), 바뀐 때만
+    """
+    if TS is None:
+        return
+    name = watch["name"]
+    base = f"korail:{name}"
+    with _TS_LOCK:
+        last = _TS_LAST.get(name, set())
+        if outcome == UNCHANGED:
+            TS.record(f"{base}:avail", len(last), outcome)
+            return
+        if outcome != OK:
+            TS.record(f"{base}:avail", None, outcome)
+            return
+        cur = {(train, dep): status for train, dep, status in hits}
+        items = [(f"{base}:avail", len(cur), outcome)]
+        items += [(f"{base}:{dep} {train}", 1, status) for (train, dep), status in cur.items() if (train, dep) not in last]
+        items += [(f"{base}:{dep} {train}", 0, None) for train, dep in last if (train, dep) not in cur]
+        _TS_LAST[name] = set(cur)
+    TS.record_many(items)
+
+HITS = None
+
+def init_hit_store():
+    global HITS
+    HITS = HitStore(HIT_DB or ":memory:")
+
+def _new_hits(watch, hits, outcome):
+    # 중복 제거: 처음 보거나 매진 후 다시 열린 열차만 새 hit
+    if HITS is None:
+        init_hit_store()
+    return HITS.update(watch["name"], watch["date"], hits, complete=(outcome == OK))
+
+def _report_hits(watch, new_hits):
+    msg = "\n".join(f"{t} | {h} | {s}" for h, t, s in new_hits)
+    line = f"예약가능 발견 [{watch['name']}]\n{msg}"
+    logging.info(line.replace("\n", " | "))
+    notifier.notify("코레일 예약 가능", f"{watch['name']}\n{msg}", text=line)
+
+# ====== 감시 목록 모드: 브라우저 1개 + 페이지 풀 ======
+class WatchScheduler:
+    """
+    watch별 다음 조회 시각을 힙으로 관리한다.
+    여러 페이지 워커가 take()로 기한이 된 watch를 하나씩 가져가고, done()으로 다음 조회를 예약한다.
+    """
+
+    def __init__(self, watches):
+        self._cv = threading.Condition()
+        self._heap = []
+        self._seq = 0
+        self._active = {}
+        now = time.monotonic()
+        for i, w in enumerate(watches):
+            self._active[w["name"]] = w
+            # 시작 직후 요청이 한꺼번에 몰리지 않도록 조금씩 어긋나게 배치
+            self._push(w, now + i * 0.5)
+
+    def _push(self, watch, due):
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, watch))
+
+    def __len__(self):
+        with self._cv:
+            return len(self._active)
+
+    def take(self, timeout=1.0):
+        """기한이 된 watch를 반환. timeout 안에 없으면 None."""
+        deadline = time.monotonic() + timeout
+        with self._cv:
+            while self._active:
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    _, _, w = heapq.heappop(self._heap)
+                    if w["name"] not in self._active:
+                        continue  # 이미 제거된 watch
+                    return w
+                wait = deadline - now
+                if self._heap:
+                    wait = min(wait, self._heap[0][0] - now)
+                if deadline <= now:
+                    return None
+                self._cv.wait(max(0.01, wait))
+            return None
+
+    def done(self, watch, outcome=OK):
+        with self._cv:
+            if watch["name"] not in self._active:
+                return
+            sleep_sec = _next_delay(watch, outcome)
+            self._push(watch, time.monotonic() + sleep_sec)
+            self._cv.notify()
+
+    def remove(self, watch):
+        with self._cv:
+            self._active.pop(watch["name"], None)
+            self._cv.notify_all()
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _page_worker(cdp_url, sched, results, stop):
+    # sync API는 스레드 간 공유가 안 되므로 워커마다 자기 Playwright로 같은 브라우저(CDP)에 붙는다.
+    with sync_playwright() as p:
+        browser = p.chromium.connect_over_cdp(cdp_url)
+        # 영구 프로필이면 기본 컨텍스트를 함께 써서 로그인/캐시를 공유
+        own_ctx = not (USER_DATA_DIR and browser.contexts)
+        ctx = browser.new_context(**_context_kwargs()) if own_ctx else browser.contexts[0]
+        page = ctx.new_page()
+        _block_heavy_resources(page)
+        try:
+            page.set_default_timeout(30000)
+        except Exception:
+            pass
+        replayer = SearchReplayer() if API_MODE else None
+        try:
+            while not stop.is_set():
+                w = sched.take(timeout=1.0)
+                if w is None:
+                    if not len(sched):
+                        break
+                    continue
+                hits, outcome = _scrape_logged(page, w, replayer)
+                results.put((w, hits, outcome))
+                sched.done(w, outcome)
+        finally:
+            try:
+                if own_ctx:
+                    save_storage_state(ctx)
+                    ctx.close()
+                else:
+                    page.close()
+            except Exception:
+                pass
+
+def run_watchlist(watches, pages=None):
+    """
+    여러 watch를 브라우저 하나에서 감시한다.
+    페이지(컨텍스트)는 pages개로 고정되고, 스케줄러가 watch들을 이 페이지들에 나눠 돌린다.
+    """
+    if not watches:
+        logging.warning("감시 목록이 비어 있습니다.")
+        return
+    n_pages = max(1, min(int(pages or PAGE_POOL_SIZE), len(watches)))
+    logging.info(f"시작: 감시 {len(watches)}건 / 페이지 {n_pages}개")
+    for w in watches:
+        logging.info(f"  - {w['name']} {w['window'][0]}~{w['window'][1]} / 간격 {w['refresh']:.0f}s")
+
+    port = _free_port()
+    with sync_playwright() as p:
+        browser, ctx = open_context(p, [f"--remote-debugging-port={port}"], new_context=False)
+        cdp_url = f"http://127.0.0.1:{port}"
+        sched = WatchScheduler(watches)
+        results = queue.Queue()
+        stop = threading.Event()
+        workers = [
+            threading.Thread(target=_page_worker, args=(cdp_url, sched, results, stop), name=f"page-{i}", daemon=True)
+            for i in range(n_pages)
+        ]
+        for t in workers:
+            t.start()
+
+        stats_log = _StatsLogger()
+        try:
+            while any(t.is_alive() for t in workers):
+                stats_log.tick()
+                try:
+                    w, hits, outcome = results.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                if outcome == UNCHANGED:
+                    logging.debug(f"[{w['name']}] 이전 조회와 동일")
+                    continue
+                new_hits = _new_hits(w, hits, outcome)
+                if not hits:
+                    if outcome == OK:
+                        logging.info(f"[{w['name']}] 없음")
+                    continue
+                if not new_hits:
+                    logging.info(f"[{w['name']}] 변경 없음(기존 알림과 동일)")
+                    continue
+                _report_hits(w, new_hits)
+                if STOP_ON_FIRST_HIT:
+                    sched.remove(w)
+                    logging.info(f"[{w['name']}] 감시 종료 (남은 감시 {len(sched)}건)")
+        finally:
+            stop.set()
+            for t in workers:
+                t.join(timeout=10)
+            close_context(browser, ctx)
 
 def main():
     logging.basicConfig(
@@ -217,33 +846,20 @@ def main():
         datefmt="%H:%M:%S",
     )
 
+    init_polling()
+    init_hit_store()
+    init_timeseries()
+    if WATCHLIST:
+        return run_watchlist(load_watchlist(WATCHLIST), PAGE_POOL_SIZE)
+
     logging.info(
         f"시작: {ORIGIN}->{DEST} {DATE} {TARGET_WINDOW[0]}~{TARGET_WINDOW[1]} / 간격 {REFRESH_SEC}s"
     )
 
+    watch = current_watch()
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=HEADLESS)
-        ctx = browser.new_context()
-
-        # 리소스 차단(속도 향상)
-        def _route_handler(route):
-            try:
-                rtype = getattr(route.request, "resource_type", None)
-                if callable(rtype):
-                    rtype = rtype()
-                if rtype in {"image", "font", "stylesheet"}:
-                    return route.abort()
-                return route.continue_()
-            except Exception:
-                try:
-                    return route.continue_()
-                except Exception:
-                    return None
-
-        try:
-            ctx.route("**/*", _route_handler)
-        except Exception:
-            pass
+        browser, ctx = open_context(p)
+        _block_heavy_resources(ctx)
 
         page = ctx.new_page()
         try:
@@ -252,48 +868,30 @@ def main():
         except Exception:
             pass
 
-        seen = set()
+        replayer = SearchReplayer() if API_MODE else None
+        stats_log = _StatsLogger()
 
         try:
             while True:
-                try:
-                    hits = scrape_once(page)
-                except PWTimeout:
-                    logging.warning("페이지 타임아웃")
-                    hits = []
-                except Exception:
-                    logging.error("예외 발생:\n" + traceback.format_exc())
-                    hits = []
-
-                if hits:
-                    # 중복 제거
-                    new_hits = []
-                    for h, t, s in [(h, t, s) for h, t, s in hits]:
-                        key = (DATE, h, t)
-                        if key not in seen:
-                            seen.add(key)
-                            new_hits.append((h, t, s))
+                hits, outcome = _scrape_logged(page, watch, replayer)
+                new_hits = _new_hits(watch, hits, outcome) if outcome != UNCHANGED else []
 
+                if outcome == UNCHANGED:
+                    logging.debug("이전 조회와 동일")
+                elif hits:
                     if new_hits:
-                        msg = "\n".join(f"{t} | {h} | {s}" for h, t, s in new_hits)
-                        line = f"예약가능 발견\n{msg}"
-                        logging.info(line.replace("\n", " | "))
-                        desktop_notify("코레일 예약 가능", msg)
-                        telegram_notify(line)
+                        _report_hits(watch, new_hits)
                         if STOP_ON_FIRST_HIT:
                             break
                     else:
                         logging.info("변경 없음(기존 알림과 동일)")
-                else:
+                elif outcome == OK:
                     logging.info("없음")
 
-                sleep_sec = max(1.0, REFRESH_SEC + random.uniform(-3, 3))
-                time.sleep(sleep_sec)
+                stats_log.tick()
+                time.sleep(_next_delay(watch, outcome))
         finally:
-            try:
-                ctx.close()
-            finally:
-                browser.close()
+            close_context(browser, ctx)
 
 def parse_args(argv=None):
     parser = argparse.ArgumentParser(description="코레일 예약 감시기")
@@ -304,7 +902,7 @@ def parse_args(argv=None):
         "--window",
         type=str,
         default=f"{TARGET_WINDOW[0]},{TARGET_WINDOW[1]}",
-        help="HH:MM,HH:MM",
+        help="HH:MM,HH:MM (여러 개는 ;로 구분)",
     )
     parser.add_argument(
         "--train-types",
@@ -312,7 +910,12 @@ def parse_args(argv=None):
         default=",".join(sorted(TRAIN_TYPES)) if TRAIN_TYPES else "",
         help="콤마로 구분된 열차 유형. 비우면 전체",
     )
+    parser.add_argument("--exclude-types", type=str, default=",".join(sorted(EXCLUDE_TYPES)), help="제외할 열차 유형(콤마 구분)")
     parser.add_argument("--refresh", type=int, default=REFRESH_SEC)
+    parser.add_argument("--hot", type=str, default=HOT_WINDOWS, help="집중 조회 구간. 예: 06:55-07:10,-3h")
+    parser.add_argument("--burst", type=float, default=BURST_SEC, help="집중 조회 구간의 간격(초)")
+    parser.add_argument("--max-backoff", type=float, default=MAX_BACKOFF_SEC)
+    parser.add_argument("--host-rate", type=float, default=HOST_RATE, help="호스트당 초당 요청 수 상한(0=제한 없음)")
     try:
         bool_action = argparse.BooleanOptionalAction
     except Exception:
@@ -324,22 +927,52 @@ def parse_args(argv=None):
         parser.add_argument("--headless", type=str, default=str(HEADLESS))
         parser.add_argument("--stop-on-first", type=str, default=str(STOP_ON_FIRST_HIT))
     parser.add_argument("--url", type=str, default=URL)
+    if bool_action:
+        parser.add_argument("--api-mode", action=bool_action, default=API_MODE, help="검색 XHR 재전송으로 폴링")
+    else:
+        parser.add_argument("--api-mode", type=str, default=str(API_MODE))
+    parser.add_argument("--storage-state", type=str, default=STORAGE_STATE, help="쿠키/로그인 상태 JSON 경로(없으면 종료 시 생성)")
+    parser.add_argument("--user-data-dir", type=str, default=USER_DATA_DIR, help="영구 브라우저 프로필 디렉토리")
+    if bool_action:
+        parser.add_argument("--warm", action=bool_action, default=WARM_REUSE, help="결과 페이지에서 바로 재조회")
+    else:
+        parser.add_argument("--warm", type=str, default=str(WARM_REUSE))
+    if bool_action:
+        parser.add_argument("--change-detect", action=bool_action, default=CHANGE_DETECT,
+                            help="결과가 이전 조회와 같으면(304/해시 동일) 후속 처리 생략")
+    else:
+        parser.add_argument("--change-detect", type=str, default=str(CHANGE_DETECT))
+    parser.add_argument("--hit-db", type=str, default=HIT_DB, help="알림 중복제거 SQLite 경로(:memory:면 저장 안 함)")
+    parser.add_argument("--ts-db", type=str, default=TS_DB, help="조회 결과 시계열 SQLite 경로(지정하면 기록)")
+    parser.add_argument("--watchlist", type=str, default=WATCHLIST, help="감시 목록 JSON 파일. 지정하면 다중 감시 모드")
+    parser.add_argument("--pages", type=int, default=PAGE_POOL_SIZE, help="다중 감시 모드의 동시 페이지 수")
     return parser.parse_args(argv)
 
 def apply_cli_overrides(args):
     global ORIGIN, DEST, DATE, TARGET_WINDOW, TRAIN_TYPES, REFRESH_SEC, STOP_ON_FIRST_HIT, HEADLESS, URL
+    global TARGET_WINDOWS, EXCLUDE_TYPES
+    global WATCHLIST, PAGE_POOL_SIZE, API_MODE, STORAGE_STATE, USER_DATA_DIR, WARM_REUSE, CHANGE_DETECT
+    global HOT_WINDOWS, BURST_SEC, MAX_BACKOFF_SEC, HOST_RATE, HIT_DB, TS_DB
     ORIGIN = args.origin
     DEST = args.dest
     DATE = args.date
     try:
-        a, b = [s.strip() for s in args.window.split(",", 1)]
-        TARGET_WINDOW = (a, b)
+        TARGET_WINDOWS = parse_windows(args.window) or None
+        if TARGET_WINDOWS:
+            TARGET_WINDOW = TARGET_WINDOWS[0]
     except Exception:
         pass
     if isinstance(args.train_types, str):
-        types = [t.strip() for t in args.train_types.split(",") if t.strip()]
-        TRAIN_TYPES = set(types)
+        TRAIN_TYPES = parse_train_types(args.train_types)
+    if isinstance(getattr(args, "exclude_types", None), str):
+        EXCLUDE_TYPES = parse_train_types(args.exclude_types)
     REFRESH_SEC = int(args.refresh)
+    HOT_WINDOWS = getattr(args, "hot", HOT_WINDOWS) or ""
+    BURST_SEC = float(getattr(args, "burst", BURST_SEC))
+    MAX_BACKOFF_SEC = float(getattr(args, "max_backoff", MAX_BACKOFF_SEC))
+    HOST_RATE = float(getattr(args, "host_rate", HOST_RATE))
+    HIT_DB = getattr(args, "hit_db", HIT_DB) or ":memory:"
+    TS_DB = getattr(args, "ts_db", TS_DB) or None
     if hasattr(args, "headless") and isinstance(args.headless, bool):
         HEADLESS = args.headless
     elif hasattr(args, "headless"):
@@ -349,6 +982,22 @@ def apply_cli_overrides(args):
     elif hasattr(args, "stop_on_first"):
         STOP_ON_FIRST_HIT = str(args.stop_on_first).lower() in {"1", "true", "yes", "y"}
     URL = args.url
+    if hasattr(args, "api_mode") and isinstance(args.api_mode, bool):
+        API_MODE = args.api_mode
+    elif hasattr(args, "api_mode"):
+        API_MODE = str(args.api_mode).lower() in {"1", "true", "yes", "y"}
+    if hasattr(args, "warm") and isinstance(args.warm, bool):
+        WARM_REUSE = args.warm
+    elif hasattr(args, "warm"):
+        WARM_REUSE = str(args.warm).lower() in {"1", "true", "yes", "y"}
+    if hasattr(args, "change_detect") and isinstance(args.change_detect, bool):
+        CHANGE_DETECT = args.change_detect
+    elif hasattr(args, "change_detect"):
+        CHANGE_DETECT = str(args.change_detect).lower() in {"1", "true", "yes", "y"}
+    STORAGE_STATE = getattr(args, "storage_state", None) or None
+    USER_DATA_DIR = getattr(args, "user_data_dir", None) or None
+    WATCHLIST = getattr(args, "watchlist", None) or None
+    PAGE_POOL_SIZE = max(1, int(getattr(args, "pages", PAGE_POOL_SIZE) or 1))
 
 if __name__ == "__main__":
     args = parse_args()
@@ -1,9 +1,11 @@
-import re, os, time
+import re, time
 from datetime import datetime
 from bs4 import BeautifulSoup
-from plyer import notification
 from dotenv import load_dotenv
 
+from watch_filter import compile_filter
+import notifier
+
 # ===== 기본 설정 =====
 TARGET_WINDOW = ("07:00", "09:59")        # 감시 시각대
 AVAILABLE_PAT = re.compile(r"(예약\s*가능|잔여석|가능)", re.I)
@@ -15,6 +17,9 @@ MAX_LOOPS = 5                             # 테스트 반복 횟수 제한
 DATE = "2025-09-12"                 # 원하는 날짜 (페이지에 날짜 컬럼이 있을 때만 사용)
 TRAIN_TYPES = {"KTX", "SRT"}        # 비우면 전체 통과
 
+# 시각대/열차종류 조건은 한 번만 컴파일해서 모든 행에 재사용
+FILTER = compile_filter(TARGET_WINDOW, TRAIN_TYPES)
+
 # ===== 컬럼 인덱스 보강 =====
 SEL = {
     "rows": "table.result tbody tr",
@@ -41,93 +46,28 @@ TEST_HTML = """
 </table>
 """
 
-# ===== 헬퍼 =====
-def filter_train_type(txt: str) -> bool:
-    return True if not TRAIN_TYPES else any(kind in txt for kind in TRAIN_TYPES)
-
-def filter_date(txt: str) -> bool:
-    # 페이지 날짜 포맷에 맞게 정규식/파싱을 조정하세요.
-    # 예: '2025-09-12' 또는 '2025.09.12' 등
-    return True if not DATE else DATE in txt
-
-# ===== 파싱 로직 내 조건 추가 =====
-def parse_and_find(html):
-    soup = BeautifulSoup(html, "html.parser")
-    rows = soup.select(SEL["rows"])
-    hits = []
-    for r in rows:
-        cols = [c.get_text(strip=True) for c in r.find_all(["td","th"])]
-        need_idx = max(SEL["col_train"], SEL["col_time"], SEL["col_status"], SEL.get("col_date", 0))
-        if len(cols) <= need_idx:
-            continue
-
-        train_txt = cols[SEL["col_train"]]
-        time_txt  = cols[SEL["col_time"]]
-        stat_txt  = cols[SEL["col_status"]]
-        date_txt  = cols[SEL["col_date"]] if "col_date" in SEL else DATE  # 날짜 열이 없으면 외부 DATE 기준
-
-        if not filter_train_type(train_txt):
-            continue
-        if not filter_date(date_txt):
-            continue
-        if not in_window(time_txt, TARGET_WINDOW):
-            continue
-        if AVAILABLE_PAT.search(stat_txt):
-            hits.append((train_txt, time_txt, stat_txt))
-    return hits
-
 # ===== 알림 채널 =====
+# 데스크톱/텔레그램 전송은 notifier.notify() 한 번으로 처리한다.
 load_dotenv()
-def desktop_notify(title, msg):
-    try:
-        notification.notify(title=title, message=msg, timeout=6)
-    except Exception:
-        pass
-    print(f"[ALERT] {title}: {msg}")
-
-def telegram_notify(text):
-    token = os.getenv("TELEGRAM_BOT_TOKEN")
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
-    if not token or not chat_id:
-        return
-    import urllib.parse, urllib.request
-    data = urllib.parse.urlencode({"chat_id": chat_id, "text": text}).encode()
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
-    try:
-        urllib.request.urlopen(url, data=data, timeout=8).read()
-    except Exception:
-        pass
 
 # ===== 로직 =====
-def in_window(t_str, win):
-    try:
-        t = datetime.strptime(t_str, "%H:%M").time()
-        a = datetime.strptime(win[0], "%H:%M").time()
-        b = datetime.strptime(win[1], "%H:%M").time()
-        return a <= t <= b if a <= b else (t >= a or t <= b)
-    except Exception:
-        return False
-
-def filter_train_type(txt):
-    if not TRAIN_TYPES:
-        return True
-    return any(kind in txt for kind in TRAIN_TYPES)
-
-def parse_and_find(html):
+def parse_and_find(html, flt=None):
+    flt = flt or FILTER
     soup = BeautifulSoup(html, "html.parser")
     rows = soup.select(SEL["rows"])
+    need_idx = max(SEL["col_train"], SEL["col_time"], SEL["col_status"])
     hits = []
     for r in rows:
         cols = [c.get_text(strip=True) for c in r.find_all(["td","th"])]
-        if len(cols) <= max(SEL["col_train"], SEL["col_time"], SEL["col_status"]):
+        if len(cols) <= need_idx:
             continue
         train_txt = cols[SEL["col_train"]]
         time_txt  = cols[SEL["col_time"]]
         stat_txt  = cols[SEL["col_status"]]
 
-        if not filter_train_type(train_txt):
+        if not flt.train_ok(train_txt):
             continue
-        if not in_window(time_txt, TARGET_WINDOW):
+        if not flt.time_ok(time_txt):
             continue
         if AVAILABLE_PAT.search(stat_txt):
             hits.append((train_txt, time_txt, stat_txt))
@@ -142,8 +82,7 @@ def main():
             msg = "\n".join(f"{t} | {h} | {s}" for h,t,s in hits)
             line = f"[{ts}] 예약가능 발견\n{msg}"
             print(line)
-            desktop_notify("코레일 예약 가능(테스트)", msg)
-            telegram_notify(line)
+            notifier.notify("코레일 예약 가능(테스트)", msg, text=line)
             break
         else:
             print(f"[{ts}] 발견 없음 (loop {i+1}/{MAX_LOOPS})")
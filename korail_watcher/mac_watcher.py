@@ -1,27 +1,194 @@
-import os, sys
+import os, re, sys, json, time, argparse
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 
 from PyQt5 import QtWidgets, uic, QtCore
-from plyer import notification
+
+import notifier
+from change_detect import ChangeDetector
+from timeseries import TimeSeriesStore
+from alert_rules import AlertEngine, ThresholdRule, make_rule
 
 
 NAVER_CODE = "222980"  # 종목코드
 NAVER_URL = "https://finance.naver.com/item/main.nhn?code={code}"
 HEADERS = {"User-Agent": "Mozilla/5.0"}
-ALERT_THRESHOLD = 4000 # 이 값 이상이면 데스크톱 알림
+ALERT_THRESHOLD = 4000 # 이 값 이상이면 데스크톱 알림 (watchlist에서 종목별 above/below로 덮어씀)
+WATCHLIST = None       # 종목 목록 JSON. 없으면 NAVER_CODE 하나만
+POLL_SEC = 10          # 전체 종목을 한 번 도는 주기
+FETCH_WORKERS = 8      # 동시에 요청하는 종목 수(연결 풀 크기)
+# 가격 소스: "polling"이면 네이버 실시간 폴링 JSON(여러 종목을 요청 한 번에), 실패한 종목만 페이지에서
+PRICE_SOURCE = "polling"
+POLLING_URL = "https://polling.finance.naver.com/api/realtime"
+POLLING_BATCH = 50     # 폴링 요청 한 번에 넣는 종목 수
+PAGE_CHUNK = 16 * 1024
+TS_DB = None           # 가격 시계열 기록 SQLite 경로(timeseries.py로 조회). None이면 기록 안 함
+
+
+def make_symbol(code, name=None, above=None, below=None, band=0, rules=None):
+    """
+    감시 종목 하나를 dict로 만든다.
+    above: 이 값 이상이 되면 알림, below: 이 값 이하가 되면 알림(없으면 그 방향은 보지 않음)
+    band: above/below 히스테리시스 폭(임계에서 이만큼 물러나야 다시 알림)
+    rules: alert_rules 규칙 설정 목록(pct/ma 등, 형식은 alert_rules.py 참고)
+    """
+    code = str(code).strip()
+    return {
+        "code": code,
+        "name": name or code,
+        "above": int(above) if above is not None else None,
+        "below": int(below) if below is not None else None,
+        "band": band or 0,
+        "rules": list(rules or []),
+    }
+
+def build_rules(sym):
+    """symbol dict → 규칙 객체 목록(above/below + rules)."""
+    rules = [ThresholdRule(side, sym[side], sym.get("band", 0)) for side in ("above", "below") if sym[side] is not None]
+    rules += [make_rule(spec) for spec in sym.get("rules") or []]
+    return rules
 
+def load_symbols(path):
+    """
+    종목 목록(JSON)을 읽어 symbol dict 리스트로 반환.
+    형식: [{"code": "222980", "name": "..", "above": 4000, "below": 3500, "band": 50,
+            "rules": [{"type": "pct", "pct": 3, "window": 30}, {"type": "ma", "fast": 5, "slow": 20}]}, ...]
+    또는 {"symbols": [...]} 형태도 허용. 항목이 문자열이면 종목코드만.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("symbols") or []
+    symbols, seen = [], set()
+    for i, item in enumerate(data):
+        if isinstance(item, (str, int)):
+            item = {"code": item}
+        if not isinstance(item, dict) or not item.get("code"):
+            raise ValueError(f"watchlist 항목 #{i}에 code가 없습니다: {item!r}")
+        sym = make_symbol(item["code"], item.get("name"), item.get("above"), item.get("below"),
+                          item.get("band"), item.get("rules"))
+        if sym["code"] in seen:
+            continue
+        seen.add(sym["code"])
+        symbols.append(sym)
+    return symbols
 
-def fetch_price(code: str) -> str:
+def default_symbols(codes=None):
+    codes = codes or [NAVER_CODE]
+    return [make_symbol(c, above=ALERT_THRESHOLD) for c in codes]
+
+def make_session(pool_size=FETCH_WORKERS):
+    """모든 종목 요청이 같이 쓰는 keep-alive 세션."""
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update(HEADERS)
+    return s
+
+
+def fetch_polling_prices(codes, session=None, detector=None) -> dict:
+    """
+    실시간 폴링 JSON(수백 바이트/종목)으로 현재가 조회. 반환: {code: "4,000"}(응답에 없는 종목은 빠짐).
+    응답 형식: {"result": {"areas": [{"datas": [{"cd": "005930", "nv": 71000, ...}]}]}}
+    detector(ChangeDetector)가 있으면 조건부 요청을 보내고, 304거나 본문이 같으면 파싱 없이 이전 값을 쓴다.
+    """
+    http = session or requests
+    out = {}
+    for i in range(0, len(codes), POLLING_BATCH):
+        batch = codes[i:i + POLLING_BATCH]
+        key = ("polling", tuple(batch))
+        try:
+            headers = dict(HEADERS, **detector.request_headers(key)) if detector else HEADERS
+            res = http.get(POLLING_URL, params={"query": "SERVICE_ITEM:" + ",".join(batch)},
+                           headers=headers, timeout=10)
+            if detector and detector.not_modified(key, res.status_code):
+                out.update(detector.value(key))
+                continue
+            res.raise_for_status()
+            if detector and detector.same(key, res.content):
+                out.update(detector.value(key))
+                continue
+            # 본문은 EUC-KR로 오지만 필요한 값은 ASCII뿐
+            data = json.loads(res.content.decode("euc-kr", errors="replace"))
+            found = {}
+            for area in (data.get("result") or {}).get("areas") or []:
+                for item in area.get("datas") or []:
+                    code, nv = item.get("cd"), item.get("nv")
+                    if code and isinstance(nv, (int, float)) and nv > 0:
+                        found[code] = f"{int(nv):,}"
+            if detector:
+                detector.update(key, res.content, found, res.headers)
+            out.update(found)
+        except Exception:
+            continue
+    return out
+
+
+# 종목 페이지에서 현재가 노드: <p class="no_today"> ... <span class="blind">4,000</span>
+# 노드 안(</p> 전)에서만 찾는다. 넘어가면 페이지의 다른 blind 숫자를 현재가로 잡는다
+_NO_TODAY_PAT = re.compile(rb'<p class="no_today">(?:(?!</p>).)*?<span class="blind">\s*([\d,]+)\s*</span>', re.S)
+
+def _scan_page(res):
+    """
+    페이지를 조각 단위로 받으며 현재가 노드만 찾고, 찾으면 나머지 본문은 받지 않고 바로 멈춘다.
+    응답은 호출한 쪽에서 닫는다(덜 읽은 연결은 풀로 돌아가지 않아 다음 조회가 새로 연결하지만, 본문 대부분을 안 받는 편이 싸다).
+    반환: (가격 문자열 또는 None, 현재가 노드까지 받은 본문 bytes)
+    """
+    buf = bytearray()
+    start = 0
+    for chunk in res.iter_content(PAGE_CHUNK):
+        buf += chunk
+        m = _NO_TODAY_PAT.search(buf, start)
+        if m:
+            return m.group(1).decode("ascii"), bytes(buf)
+        # 아직 닫히지 않은 노드가 걸쳐 있을 수 있으니 마지막 no_today부터 다시 본다
+        k = buf.rfind(b"no_today")
+        start = max(start, k - 16) if k >= 0 else max(0, len(buf) - 64)
+    return None, bytes(buf)
+
+def fetch_price(code: str, session=None, detector=None) -> str:
     try:
-        res = requests.get(NAVER_URL.format(code=code), headers=HEADERS, timeout=10)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
-        node = soup.select_one("p.no_today span.blind")
-        return node.text.strip() if node else "-"
+        http = session or requests
+        key = ("page", code)
+        headers = dict(HEADERS, **detector.request_headers(key)) if detector else HEADERS
+        res = http.get(NAVER_URL.format(code=code), headers=headers, timeout=10, stream=True)
+        try:
+            if detector and detector.not_modified(key, res.status_code):
+                return detector.value(key)
+            res.raise_for_status()
+            price, body = _scan_page(res)
+        finally:
+            res.close()
+        if not price:
+            # 마크업이 바뀌어 정규식이 놓치면 예전처럼 전체 트리에서 찾는다
+            soup = BeautifulSoup(body.decode(res.encoding or "euc-kr", errors="replace"), "html.parser")
+            node = soup.select_one("p.no_today span.blind")
+            price = node.text.strip() if node else None
+        if not price:
+            return "-"
+        if detector:
+            detector.update(key, price, price, res.headers)
+        return price
     except Exception:
         return "-"
 
+def fetch_prices(codes, session=None, pool=None, source=None, detector=None) -> dict:
+    """
+    여러 종목을 조회. 반환: {code: 가격 문자열}(실패한 종목은 "-").
+    폴링 JSON으로 한 번에 받고, 거기 없는 종목만 페이지에서 동시에 받는다.
+    """
+    codes = list(codes)
+    out = fetch_polling_prices(codes, session, detector) if (source or PRICE_SOURCE) == "polling" else {}
+    rest = [c for c in codes if c not in out]
+    if pool is None or len(rest) <= 1:
+        out.update((c, fetch_price(c, session, detector)) for c in rest)
+    else:
+        out.update(zip(rest, pool.map(lambda c: fetch_price(c, session, detector), rest)))
+    return {c: out[c] for c in codes}
+
 def _to_int_price(text: str) -> int:
     try:
         digits = "".join(ch for ch in (text or "") if ch.isdigit())
@@ -30,35 +197,72 @@ def _to_int_price(text: str) -> int:
         return -1
 
 def desktop_notify(title: str, msg: str):
-    try:
-        notification.notify(title=title, message=msg, timeout=5)
-    except Exception:
-        pass
+    # 백그라운드 전송(UI 스레드를 막지 않음)
+    notifier.notify(title, msg, channels=("desktop",))
 
 
 class PriceWorker(QtCore.QThread):
-    priceFetched = QtCore.pyqtSignal(str)
+    """
+    감시 종목 전체를 스레드 하나에서 돈다.
+    매 주기 세션 하나 + 제한된 스레드 풀로 모든 종목을 동시에 받고, 결과는 시그널 한 번으로 보낸다.
+    알림 규칙은 값이 그대로인 틱도 한 틱으로 세야 하므로 여기서 매 틱 평가하고 발생한 알림만 함께 보낸다.
+    이전 틱과 값이 같은 종목은 빼고 보내며, 바뀐 종목도 알림도 없으면 시그널을 보내지 않는다.
+    """
+    pricesFetched = QtCore.pyqtSignal(dict, list)   # {code: 가격 문자열}(바뀐 종목만), [Alert, ...]
 
-    def __init__(self, code: str, parent=None):
+    def __init__(self, codes, interval=POLL_SEC, workers=FETCH_WORKERS, store=None, engine=None, parent=None):
         super().__init__(parent)
-        self._code = code
+        self._store = store     # TimeSeriesStore: 틱마다 모든 종목 가격을 기록(바뀌지 않은 값도)
+        self._engine = engine   # AlertEngine: 종목별 링 버퍼 + 규칙
+        self._codes = list(codes)
+        self._interval = float(interval)
+        self._workers = max(1, min(int(workers), len(self._codes)))
         self._running = True
+        self.changes = ChangeDetector()
 
     def run(self):
-        while self._running:
-            price = fetch_price(self._code)
-            self.priceFetched.emit(price)
-            self.msleep(10_000)
+        session = make_session(self._workers)
+        pool = ThreadPoolExecutor(self._workers, thread_name_prefix="price") if self._workers > 1 else None
+        try:
+            while self._running:
+                t0 = time.monotonic()
+                prices = fetch_prices(self._codes, session, pool, detector=self.changes)
+                if not self._running:
+                    break
+                values = {c: _to_int_price(p) for c, p in prices.items()}
+                values = {c: v for c, v in values.items() if v >= 0}
+                if self._store is not None:
+                    self._store.record_many([(f"price:{c}", v, None) for c, v in values.items()])
+                alerts = self._engine.update_many(values) if self._engine is not None else []
+                changed = {c: p for c, p in prices.items() if self.changes.changed(("price", c), p)}
+                if changed or alerts:
+                    self.pricesFetched.emit(changed, alerts)
+                # 요청에 걸린 시간을 빼고 남은 만큼만 쉰다(stop()에 빨리 반응하도록 잘게)
+                left = self._interval - (time.monotonic() - t0)
+                while self._running and left > 0:
+                    self.msleep(int(min(left, 0.2) * 1000))
+                    left = self._interval - (time.monotonic() - t0)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False)
+            session.close()
 
     def stop(self):
         self._running = False
 
 
 class PriceViewer(QtWidgets.QWidget):
-    def __init__(self, parent=None):
+    COLUMNS = ("종목", "현재가", "알림")
+
+    def __init__(self, symbols=None, interval=POLL_SEC, workers=FETCH_WORKERS, ts_db=None, parent=None):
         super().__init__(parent)
         ui_path = os.path.join(os.path.dirname(__file__), "simple_digit_viewer.ui")
         self.ui = uic.loadUi(ui_path, self)
+        self.symbols = symbols or default_symbols()
+        self._rows = {s["code"]: i for i, s in enumerate(self.symbols)}
+        self.table = None
+        if len(self.symbols) > 1:
+            self._build_table()
 
         # 반투명 + 항상 위
         try:
@@ -67,37 +271,107 @@ class PriceViewer(QtWidgets.QWidget):
         except Exception:
             pass
 
-        # 워커 스레드로 10초마다 비동기 갱신 (UI 비멈춤)
-        self.worker = PriceWorker(NAVER_CODE, self)
-        self.worker.priceFetched.connect(self.on_price_fetched)
+        # 종목별 알림 규칙(임계 히스테리시스/등락률/이동평균 교차)
+        self.engine = AlertEngine()
+        for sym in self.symbols:
+            self.engine.add(sym["code"], build_rules(sym))
+        self._by_code = {s["code"]: s for s in self.symbols}
+
+        self.store = TimeSeriesStore(ts_db) if ts_db else None
+
+        # 워커 스레드 하나가 interval마다 전체 종목을 비동기 갱신 (UI 비멈춤)
+        self.worker = PriceWorker([s["code"] for s in self.symbols], interval, workers,
+                                  self.store, self.engine, self)
+        self.worker.pricesFetched.connect(self.on_prices_fetched)
         self.worker.start()
 
-        self._notified_over = False
+    def _build_table(self):
+        # 종목이 여럿이면 .ui의 숫자 라벨 대신 표(종목/현재가/알림)를 코드로 만든다
+        self.label.hide()
+        self.table = QtWidgets.QTableWidget(len(self.symbols), len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        for row, sym in enumerate(self.symbols):
+            rules = " ".join(r.name for r in build_rules(sym))
+            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(sym["name"]))
+            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem("-"))
+            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(rules))
+            self.table.item(row, 1).setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        self.table.resizeColumnsToContents()
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.table)
+        self.resize(260, min(600, 30 + 26 * len(self.symbols)))
+
+    @QtCore.pyqtSlot(dict, list)
+    def on_prices_fetched(self, prices: dict, alerts: list):
+        # 틱마다 한 번: 표를 한꺼번에 갱신하고, 워커가 평가한 규칙 알림을 보낸다
+        if self.table is not None:
+            self.table.setUpdatesEnabled(False)
+        try:
+            for sym in self.symbols:
+                price = prices.get(sym["code"])
+                if price is not None:
+                    self._show_price(sym, price)
+            for alert in alerts:
+                self._notify(alert)
+        finally:
+            if self.table is not None:
+                self.table.setUpdatesEnabled(True)
 
-    @QtCore.pyqtSlot(str)
-    def on_price_fetched(self, price: str):
-        self.label.setText(price)
-        val = _to_int_price(price)
-        if val >= 0:
-            if val >= ALERT_THRESHOLD and not self._notified_over:
-                desktop_notify("noti", f" {val:,}")
-                self._notified_over = True
-            elif val < ALERT_THRESHOLD and self._notified_over:
-                # 임계 아래로 내려오면 다시 알림 가능 상태로 리셋
-                self._notified_over = False
+    def _show_price(self, sym, price: str):
+        if self.table is None:
+            self.label.setText(price)
+            return
+        item = self.table.item(self._rows[sym["code"]], 1)
+        if item.text() != price:
+            item.setText(price)
+
+    def _notify(self, alert):
+        sym = self._by_code.get(alert.symbol)
+        if sym is None:
+            return
+        label = sym["name"] if len(self.symbols) > 1 else "noti"
+        desktop_notify(label, f" {alert.value:,} ({alert.message})")
+        if self.table is not None:
+            self.table.item(self._rows[sym["code"]], 2).setText(alert.message)
 
     def closeEvent(self, event):
         try:
             if hasattr(self, "worker") and self.worker.isRunning():
                 self.worker.stop()
                 self.worker.wait(2000)
+            # 워커가 아직 요청 중이어도 close() 뒤의 record()는 무시된다
+            if self.store is not None:
+                self.store.close()
         finally:
             super().closeEvent(event)
 
 
-def main():
-    app = QtWidgets.QApplication(sys.argv)
-    w = PriceViewer()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="네이버 금융 현재가 감시(여러 종목)")
+    parser.add_argument("--codes", type=str, default=None, help="콤마 구분 종목코드(임계값은 ALERT_THRESHOLD)")
+    parser.add_argument("--watchlist", type=str, default=WATCHLIST, help="종목 목록 JSON(종목별 above/below)")
+    parser.add_argument("--interval", type=float, default=POLL_SEC, help="갱신 주기(초)")
+    parser.add_argument("--workers", type=int, default=FETCH_WORKERS, help="동시 요청 수")
+    parser.add_argument("--source", choices=("polling", "page"), default=PRICE_SOURCE,
+                        help="가격 소스: polling(실시간 JSON, 기본) / page(종목 페이지)")
+    parser.add_argument("--ts-db", type=str, default=TS_DB, help="가격 시계열 SQLite 경로(지정하면 기록)")
+    # Qt 인자(-style 등)는 QApplication에 넘긴다
+    return parser.parse_known_args(argv)
+
+
+def main(argv=None):
+    global PRICE_SOURCE
+    args, qt_args = parse_args(argv)
+    PRICE_SOURCE = args.source
+    if args.watchlist:
+        symbols = load_symbols(args.watchlist)
+    else:
+        symbols = default_symbols([c.strip() for c in (args.codes or "").split(",") if c.strip()])
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+    w = PriceViewer(symbols, args.interval, args.workers, args.ts_db)
     w.show()
     sys.exit(app.exec_())
 
@@ -0,0 +1,225 @@
+import os, time, queue, atexit, logging, threading, json
+import http.client
+from urllib.parse import urlsplit, urlencode
+
+try:
+    from plyer import notification
+except Exception:  # 데스크톱 알림은 선택 사항
+    notification = None
+
+# 백그라운드 알림 디스패처.
+#  - notify()는 큐에 넣고 바로 반환(폴링 루프를 막지 않음)
+#  - 워커 스레드 풀이 채널별로 전송, 실패 시 지수 백오프로 재시도
+#  - interval>0이면 그 시간 동안 들어온 알림을 채널별로 한 메시지로 합쳐 보냄
+#  - 텔레그램은 워커마다 keep-alive 연결을 재사용
+# korail_watcher / korail_watcher2 / mac_watcher 가 함께 쓴다.
+
+TELEGRAM_API_BASE = "https://api.telegram.org"
+TELEGRAM_MAX_LEN = 4096
+DESKTOP_MAX_LEN = 250
+
+
+class RetryLater(Exception):
+    def __init__(self, after):
+        super().__init__(f"retry after {after}s")
+        self.after = after
+
+
+class DesktopChannel:
+    name = "desktop"
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+
+    def render(self, items):
+        title = items[0][0] or "알림"
+        if len(items) > 1:
+            title = f"{title} 외 {len(items) - 1}건"
+        msg = "\n".join(m for _, m, _ in items)
+        return title, msg[:DESKTOP_MAX_LEN]
+
+    def send(self, title, msg):
+        if notification is None:
+            return
+        notification.notify(title=title, message=msg, timeout=self.timeout)
+
+
+class TelegramChannel:
+    name = "telegram"
+
+    def __init__(self, token, chat_id, base_url=None, timeout=10):
+        self.token = token
+        self.chat_id = chat_id
+        self.timeout = timeout
+        u = urlsplit(base_url or TELEGRAM_API_BASE)
+        self._https = u.scheme != "http"
+        self._host = u.hostname
+        self._port = u.port
+        self._prefix = u.path.rstrip("/")
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            conn = self._local.conn = cls(self._host, self._port, timeout=self.timeout)
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def render(self, items):
+        text = "\n\n".join(t for _, _, t in items)
+        return None, text[:TELEGRAM_MAX_LEN]
+
+    def send(self, title, text):
+        body = urlencode({"chat_id": self.chat_id, "text": text}).encode()
+        path = f"{self._prefix}/bot{self.token}/sendMessage"
+        conn = self._conn()
+        try:
+            conn.request("POST", path, body=body, headers={"Content-Type": "application/x-www-form-urlencoded"})
+            resp = conn.getresponse()
+            data = resp.read()
+        except Exception:
+            # 끊긴 keep-alive 연결은 버리고 다음 시도에서 새로 연결
+            self._reset()
+            raise
+        if resp.status == 429:
+            after = 5
+            try:
+                after = int(json.loads(data).get("parameters", {}).get("retry_after", after))
+            except Exception:
+                pass
+            raise RetryLater(after)
+        if resp.status >= 400:
+            raise RuntimeError(f"telegram status={resp.status} body={data[:200]!r}")
+
+
+class Notifier:
+    def __init__(self, channels, workers=2, interval=0.0, retries=3, backoff=1.0):
+        self.channels = {c.name: c for c in channels}
+        self.interval = float(interval or 0)
+        self.retries = retries
+        self.backoff = backoff
+        self._jobs = queue.Queue()
+        self._pending = {name: [] for name in self.channels}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"notify-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        if self.interval > 0:
+            self._threads.append(threading.Thread(target=self._flush_loop, name="notify-flush", daemon=True))
+        for t in self._threads:
+            t.start()
+
+    def notify(self, title, msg, text=None, channels=None):
+        """
+        알림을 큐에 넣고 바로 반환.
+        title/msg는 데스크톱용, text는 메신저용(없으면 "title\\nmsg").
+        """
+        item = (title, msg, text if text is not None else (f"{title}\n{msg}" if title else msg))
+        for name in (channels or self.channels):
+            if name not in self.channels:
+                continue
+            if self.interval > 0:
+                with self._lock:
+                    self._pending[name].append(item)
+            else:
+                self._jobs.put((name, [item]))
+
+    def _flush_pending(self):
+        with self._lock:
+            batches = [(name, items) for name, items in self._pending.items() if items]
+            self._pending = {name: [] for name in self.channels}
+        for job in batches:
+            self._jobs.put(job)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.interval):
+            self._flush_pending()
+
+    def _deliver(self, name, items):
+        ch = self.channels[name]
+        title, msg = ch.render(items)
+        for attempt in range(self.retries + 1):
+            try:
+                ch.send(title, msg)
+                return True
+            except RetryLater as e:
+                delay = e.after
+            except Exception as e:
+                delay = self.backoff * (2 ** attempt)
+                logging.debug(f"알림 전송 실패({name}, {attempt + 1}회): {e}")
+            if attempt < self.retries:
+                time.sleep(delay)
+        logging.warning(f"알림 전송 포기({name}): {len(items)}건")
+        return False
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            try:
+                if job is None:
+                    return
+                self._deliver(*job)
+            except Exception:
+                logging.exception("알림 워커 오류")
+            finally:
+                self._jobs.task_done()
+
+    def flush(self, timeout=None):
+        """대기 중인 알림을 모두 보내고 끝날 때까지(최대 timeout초) 기다린다."""
+        self._flush_pending()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._jobs.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def close(self, timeout=10):
+        if self._stop.is_set():
+            return
+        self.flush(timeout)
+        self._stop.set()
+        for t in self._threads:
+            if t.name != "notify-flush":
+                self._jobs.put(None)
+        for t in self._threads:
+            t.join(timeout=1)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def build_channels(desktop_timeout=10):
+    channels = [DesktopChannel(desktop_timeout)]
+    token = os.getenv("TELEGRAM_BOT_TOKEN")
+    chat_id = os.getenv("TELEGRAM_CHAT_ID")
+    if token and chat_id:
+        channels.append(TelegramChannel(token, chat_id, os.getenv("TELEGRAM_API_BASE")))
+    return channels
+
+
+def get_notifier():
+    """환경변수(TELEGRAM_*, NOTIFY_INTERVAL_SEC)로 구성한 공용 Notifier. 종료 시 자동으로 flush."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            interval = float(os.getenv("NOTIFY_INTERVAL_SEC", "0") or 0)
+            _default = Notifier(build_channels(), interval=interval)
+            atexit.register(_default.close)
+        return _default
+
+
+def notify(title, msg, text=None, channels=None):
+    get_notifier().notify(title, msg, text=text, channels=channels)
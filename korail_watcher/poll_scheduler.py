@@ -0,0 +1,213 @@
+import math, time, random, threading, collections
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from watch_filter import hm_to_min
+
+# 폴링 간격 정책 / 호스트별 요청 예산 / 실제 폴링 속도 집계.
+# korail_watcher의 단일·다중 감시 루프가 함께 쓴다.
+
+OK, TIMEOUT, ERROR, EMPTY = "ok", "timeout", "error", "empty"
+UNCHANGED = "unchanged"     # 성공했지만 이전 조회와 결과가 같음(304/해시 동일). 간격 정책에서는 OK와 같다
+
+
+def _hm(txt):
+    m = hm_to_min(txt)
+    if m is None:
+        raise ValueError(f"잘못된 시각: {txt!r} (HH:MM)")
+    return m
+
+
+def parse_hot_windows(spec):
+    """
+    "HH:MM-HH:MM" (매일 그 시각대) 또는 "-Nh"/"-Nm" (출발 N시간/분 전부터) 목록을 파싱.
+    문자열이면 콤마로 구분. 예: "06:55-07:10,-3h"
+    """
+    if not spec:
+        return []
+    items = spec.split(",") if isinstance(spec, str) else list(spec)
+    out = []
+    for it in items:
+        it = str(it).strip()
+        if not it:
+            continue
+        if it.startswith("-"):
+            unit = it[-1].lower()
+            try:
+                n = float(it[1:-1])
+            except ValueError:
+                n = None
+            if unit not in ("h", "m") or n is None or n <= 0:
+                raise ValueError(f"잘못된 집중 조회 구간: {it!r} (-Nh 또는 -Nm)")
+            out.append(("lead", timedelta(hours=n) if unit == "h" else timedelta(minutes=n)))
+        else:
+            a, sep, b = it.partition("-")
+            if not sep:
+                raise ValueError(f"잘못된 집중 조회 구간: {it!r} (HH:MM-HH:MM 또는 -Nh/-Nm)")
+            out.append(("clock", (_hm(a), _hm(b))))
+    return out
+
+
+def _departure_start(watch):
+    try:
+        d = datetime.strptime(watch["date"], "%Y-%m-%d")
+        m = _hm(watch["window"][0])
+        return d + timedelta(minutes=m)
+    except Exception:
+        return None
+
+
+def in_hot_window(watch, windows, now=None):
+    now = now or datetime.now()
+    cur = now.hour * 60 + now.minute
+    for kind, val in windows:
+        if kind == "clock":
+            a, b = val
+            if (a <= cur <= b) if a <= b else (cur >= a or cur <= b):
+                return True
+        elif kind == "lead":
+            dep = _departure_start(watch)
+            if dep is not None and dep - val <= now <= dep:
+                return True
+    return False
+
+
+class FixedPolicy:
+    """기존 동작: 결과와 무관하게 refresh ± jitter초."""
+
+    def __init__(self, jitter=3.0):
+        self.jitter = jitter
+
+    def next_delay(self, watch, outcome):
+        return max(1.0, watch["refresh"] + random.uniform(-self.jitter, self.jitter))
+
+
+class AdaptivePolicy(FixedPolicy):
+    """
+    실패(타임아웃/예외)가 이어지면 지수 백오프, 핫 윈도우 안에서는 burst 간격으로 조회.
+    watch에 "hot"(parse_hot_windows 결과, make_watch가 미리 파싱)이 있으면 그 윈도우를, 없으면 기본 hot_windows를 쓴다.
+    """
+
+    def __init__(self, hot_windows=None, burst_sec=5.0, backoff_factor=2.0, max_backoff=300.0, jitter=3.0):
+        super().__init__(jitter)
+        self.hot_windows = parse_hot_windows(hot_windows)
+        self.burst_sec = burst_sec
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self._fails = {}
+        self._lock = threading.Lock()
+
+    def _backoff_exp(self, watch, fails):
+        """지수 fails를 refresh * backoff_factor ** n 이 max_backoff에 닿는 n까지로 자른다."""
+        if self.backoff_factor <= 1 or watch["refresh"] <= 0 or self.max_backoff <= watch["refresh"]:
+            return min(fails, 1)
+        return min(fails, math.ceil(math.log(self.max_backoff / watch["refresh"], self.backoff_factor)))
+
+    def is_hot(self, watch, now=None):
+        windows = watch.get("hot") or self.hot_windows
+        return in_hot_window(watch, windows, now)
+
+    def next_delay(self, watch, outcome):
+        with self._lock:
+            fails = 0 if outcome in (OK, UNCHANGED) else self._fails.get(watch["name"], 0) + 1
+            self._fails[watch["name"]] = fails
+        if fails:
+            # 장애가 길어지면 fails가 계속 커지므로 max_backoff에 닿는 지수까지만 계산(float 거듭제곱 OverflowError 방지)
+            base = min(self.max_backoff, watch["refresh"] * (self.backoff_factor ** self._backoff_exp(watch, fails)))
+            # 여러 watch가 동시에 재시도하지 않도록 full jitter
+            return max(1.0, random.uniform(base / 2, base))
+        if self.is_hot(watch):
+            j = min(self.jitter, self.burst_sec / 2)
+            return max(1.0, self.burst_sec + random.uniform(-j, j))
+        return super().next_delay(watch, outcome)
+
+
+class TokenBucket:
+    """rate(개/초)로 채워지고 burst개까지 쌓이는 토큰 버킷. 스레드 안전."""
+
+    def __init__(self, rate, burst=1):
+        if not rate or float(rate) <= 0:
+            # 0 이하면 acquire()가 영원히 기다린다. 제한을 끄려면 버킷을 만들지 말 것
+            raise ValueError(f"TokenBucket rate는 0보다 커야 합니다: {rate!r}")
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def acquire(self, timeout=None):
+        """토큰 1개를 얻을 때까지 대기. timeout 안에 못 얻으면 False."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                wait = (1.0 - self._tokens) / self.rate
+            if deadline is not None:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                wait = min(wait, left)
+            time.sleep(wait)
+
+
+class HostBudget:
+    """호스트별 요청 예산. 모든 watch/페이지 워커가 공유한다."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        host = urlsplit(url).hostname or url
+        with self._lock:
+            b = self._buckets.get(host)
+            if b is None:
+                b = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return b
+
+    def acquire(self, url, timeout=None):
+        if not self.rate or self.rate <= 0:
+            return True
+        return self.bucket(url).acquire(timeout)
+
+
+class PollStats:
+    """최근 window초 동안의 실제 폴링 속도(회/분)와 결과별 횟수를 집계."""
+
+    def __init__(self, window=300.0):
+        self.window = window
+        self.started = time.monotonic()
+        self.counts = collections.Counter()
+        self._stamps = collections.deque()
+        self._lock = threading.Lock()
+
+    def record(self, outcome):
+        now = time.monotonic()
+        with self._lock:
+            self.counts[outcome] += 1
+            self._stamps.append(now)
+            while self._stamps and self._stamps[0] < now - self.window:
+                self._stamps.popleft()
+
+    def rate_per_min(self):
+        now = time.monotonic()
+        with self._lock:
+            span = min(self.window, max(1e-9, now - self.started))
+            n = sum(1 for t in self._stamps if t >= now - span)
+        return n * 60.0 / span
+
+    def summary(self):
+        with self._lock:
+            counts = dict(self.counts)
+        parts = " ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+        return f"폴링 {self.rate_per_min():.1f}회/분 ({parts})"
@@ -0,0 +1,4 @@
+import os, sys
+
+# 스크립트들이 같은 디렉토리의 모듈을 이름으로 import하므로 상위 디렉토리를 경로에 넣는다
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
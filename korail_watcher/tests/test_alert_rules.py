@@ -0,0 +1,58 @@
+import pytest
+
+from alert_rules import AlertEngine, PriceSeries, make_rule
+
+
+def _feed(engine, symbol, values):
+    return [[a.message for a in engine.update(symbol, v)] for v in values]
+
+
+def test_price_series_window_means():
+    s = PriceSeries(3, mean_windows=(2, 3))
+    for v in (1, 2, 3, 4):
+        s.push(v)
+    assert list(s.buf) == [2, 3, 4]
+    assert s.mean(2) == 3.5 and s.mean(3) == 3.0
+    assert s.ago(2) == 2 and s.ago(3) is None
+
+
+def test_threshold_hysteresis():
+    eng = AlertEngine()
+    eng.add("A", [make_rule({"type": "above", "level": 100, "band": 5})])
+    out = _feed(eng, "A", [99, 100, 101, 98, 100, 94, 100])
+    # 100 도달 시 한 번, 95 미만(94)으로 내려간 뒤에야 다시
+    assert out == [[], ["이상 100"], [], [], [], [], ["이상 100"]]
+
+
+def test_below_rule():
+    eng = AlertEngine()
+    eng.add("A", [make_rule({"type": "below", "level": 50})])
+    assert _feed(eng, "A", [51, 50, 49, 51, 50]) == [[], ["이하 50"], [], [], ["이하 50"]]
+
+
+def test_pct_change_rearms_at_half():
+    eng = AlertEngine()
+    eng.add("A", [make_rule({"type": "pct", "pct": 10, "window": 1, "direction": "up"})])
+    out = _feed(eng, "A", [100, 111, 123, 124, 130, 144])
+    assert out == [[], ["1틱 +11.00%"], [], [], [], ["1틱 +10.77%"]]
+
+
+def test_ma_cross():
+    eng = AlertEngine()
+    eng.add("A", [make_rule({"type": "ma", "fast": 2, "slow": 4})])
+    out = _feed(eng, "A", [10, 10, 10, 9, 8, 12, 14])
+    assert [m for ms in out for m in ms] == ["골든크로스 MA2/4"]
+    assert eng.rules("A")[0].name == "ma2/4"
+
+
+def test_update_many_skips_unknown_and_none():
+    eng = AlertEngine()
+    eng.add("A", [make_rule({"type": "above", "level": 1})])
+    alerts = eng.update_many({"A": 2, "B": 5, "C": None})
+    assert [(a.symbol, a.rule, a.value) for a in alerts] == [("A", "above1", 2)]
+
+
+@pytest.mark.parametrize("spec", [{"type": "x"}, {"type": "ma", "fast": 5, "slow": 5}, {"type": "pct", "pct": 1, "direction": "side"}])
+def test_bad_rules(spec):
+    with pytest.raises(ValueError):
+        make_rule(spec)
@@ -0,0 +1,38 @@
+from change_detect import ChangeDetector, digest
+
+
+def test_digest_normalizes_types():
+    assert digest("가격") == digest("가격".encode("utf-8"))
+    assert digest({"a": 1}) == digest(repr({"a": 1}))
+    assert len(digest(b"x")) == 16
+
+
+def test_same_and_update():
+    det = ChangeDetector()
+    assert not det.same("k", b"<html>1</html>")
+    det.update("k", b"<html>1</html>", value=[1])
+    assert det.same("k", b"<html>1</html>")
+    assert not det.same("k", b"<html>2</html>")
+    assert det.value("k") == [1]
+    assert det.value("other", "none") == "none"
+    assert det.counts["unchanged"] == 1 and det.counts["changed"] == 1
+
+
+def test_conditional_headers_and_304():
+    det = ChangeDetector()
+    assert det.request_headers("k") == {}
+    assert not det.not_modified("k", 304)       # 이전 값이 없으면 304도 쓸 수 없다
+    det.update("k", b"body", value="v", headers={"etag": '"abc"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"})
+    assert det.request_headers("k") == {"If-None-Match": '"abc"', "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT"}
+    assert det.not_modified("k", 304)
+    assert not det.not_modified("k", 200)
+
+
+def test_changed_and_forget():
+    det = ChangeDetector()
+    assert det.changed("price", "3,500")
+    assert not det.changed("price", "3,500")
+    assert det.changed("price", "3,600")
+    det.forget("price")
+    assert det.changed("price", "3,600")
+    assert det.summary() == "changed=3 unchanged=1"
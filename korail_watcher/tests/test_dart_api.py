@@ -0,0 +1,101 @@
+import os
+
+import DART_API
+from DART_API import (Dart4Table, SalesSectionExtractor, analyze_document, analyze_filing, extract_acode_values,
+                      extract_sales_section, iter_document_events, iter_tables, parse_number)
+
+DUMP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dart_dump")
+
+
+def _section(name):
+    with open(os.path.join(DUMP, name), "rb") as f:
+        return analyze_document(f, [SalesSectionExtractor("11011")])[0]
+
+
+def test_sales_section_comes_from_sales_headings():
+    main = _section("20250320000427.xml")
+    assert "판매방법" in main
+    assert "충당부채" not in main
+    # 감사보고서에는 매출 섹션 제목이 없다
+    assert _section("20250320000427_00760.xml") is None
+
+
+def test_section_requires_matching_title():
+    doc = ("<DOCUMENT><SECTION-1><TITLE>5. 충당부채</TITLE><P>제품 판매 관련 매출 보증 충당부채를 설정하고 있습니다. "
+           "제품 매출 비중에 따라 판매보증 충당부채가 변동합니다.</P></SECTION-1>"
+           "<SECTION-1><TITLE>II. 사업의 내용</TITLE><SECTION-2><TITLE>2. 주요 제품 및 서비스</TITLE>"
+           "<SECTION-3><TITLE>가. 현황</TITLE><P>커피 제품 매출이 전체 매출의 80%를 차지하는 주요 제품입니다.</P>"
+           "</SECTION-3></SECTION-2></SECTION-1></DOCUMENT>")
+    section = analyze_document(doc, [SalesSectionExtractor()])[0]
+    assert "커피 제품" in section
+    assert "충당부채" not in section
+
+
+LEGACY_DOC = """<?xml version="1.0" encoding="utf-8"?><DOCUMENT><BODY><content><![CDATA[
+<h1>II. 사업의 내용</h1>
+<h2>1. 충당부채</h2><p>제품 판매 관련 매출 보증 충당부채를 설정하고 있으며 제품 매출 비중에 따라 변동합니다.</p>
+<h2>2. 주요 제품 및 서비스</h2><p>당사의 주요 제품은 커피이며 커피 제품 매출이 전체 매출의 80%를 차지합니다.</p>
+<h3>가. 판매경로</h3><p>할인점 판매 비중이 가장 큰 주요 판매 경로입니다.</p>
+<h2>3. 원재료</h2><p>원두 매입 가격이 상승했습니다.</p>
+]]></content></BODY></DOCUMENT>"""
+
+
+def test_legacy_content_headings_open_sections():
+    titles = [(kind, rest[0]) for kind, *rest in iter_document_events(LEGACY_DOC) if kind in ("title", "section_start", "section_end")]
+    assert titles.count(("title", "2. 주요 제품 및 서비스")) == 1
+    assert sum(k == "section_start" for k, _ in titles) == sum(k == "section_end" for k, _ in titles)
+    section = extract_sales_section(LEGACY_DOC)
+    assert "커피 제품" in section
+    assert "충당부채" not in section and "원두" not in section
+
+
+def test_filing_section_from_main_report(monkeypatch):
+    monkeypatch.setattr(DART_API, "PARALLEL_MIN_BYTES", 1 << 40)
+    with open(os.path.join(DUMP, "raw_document.zip"), "rb") as f:
+        record = analyze_filing(f, procs=1)
+    assert record["section_member"] == "20250320000427.xml"
+    assert "충당부채" not in record["section"]
+
+
+SPAN_TABLE = """<TABLE ACLASS="NORMAL"><THEAD>
+<TR><TH ROWSPAN="2">구분</TH><TH COLSPAN="2">매출액</TH></TR>
+<TR><TH>당기</TH><TH>전기</TH></TR></THEAD><TBODY>
+<TR><TD ROWSPAN="2">커피</TD><TE>1,200</TE><TE>(300)</TE></TR>
+<TR><TE>△50</TE><TE>-</TE></TR>
+<TR><TD>합계</TD><TE COLSPAN="2">1,150</TE></TR></TBODY></TABLE>"""
+
+
+def test_dart4_table_expands_spans():
+    (title, table), = iter_tables(f"<DOCUMENT><TITLE>매출</TITLE>{SPAN_TABLE}</DOCUMENT>")
+    assert title == "매출"
+    assert isinstance(table, Dart4Table) and table.head_rows == 2
+    grid = table.grid()
+    assert [[c.text for c in row] for row in grid] == [
+        ["구분", "매출액", "매출액"],
+        ["구분", "당기", "전기"],
+        ["커피", "1,200", "(300)"],
+        ["커피", "△50", "-"],
+        ["합계", "1,150", "1,150"],
+    ]
+    assert grid[2][0] is grid[3][0]
+    assert table.columns() == ["구분", "매출액 / 당기", "매출액 / 전기"]
+    assert [c.value for c in grid[2][1:]] == [1200, -300]
+    assert grid[3][1].value == -50 and grid[3][2].value is None
+
+
+def test_parse_number():
+    assert parse_number("1,234.5") == 1234.5
+    assert parse_number("( 1,234 )") == -1234
+    assert parse_number("매출") is None
+
+
+def test_acode_values_with_unit_and_context():
+    doc = """<DOCUMENT><P>(단위 : 백만원)</P><TABLE><TBODY><TR><TD>매출액</TD>
+    <TE ACODE="ifrs-full_Revenue" ACONTEXT="CFY2024dFY_ConsolidatedMember">1,000</TE>
+    <TE ACODE="ifrs-full_Revenue" ACONTEXT="PFY2023dFY_ConsolidatedMember">900</TE>
+    <TE ACODE="ifrs-full_ProfitLoss" ACONTEXT="CFY2024dFY">10</TE></TR></TBODY></TABLE></DOCUMENT>"""
+    items = extract_acode_values(doc, ["ifrs-full_Revenue"])
+    assert [(i["label"], i["period"], i["year"], i["consolidated"], i["value"]) for i in items] == [
+        ("매출액", "CFY", 2024, True, 1_000 * 10**6),
+        ("매출액", "PFY", 2023, True, 900 * 10**6),
+    ]
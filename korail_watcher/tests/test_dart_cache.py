@@ -0,0 +1,93 @@
+import os, json
+
+import pytest
+
+from dart_cache import DartCache, OfflineMiss
+from dart_fetch import DartClient
+
+LIST_URL = "https://opendart.fss.or.kr/api/list.json"
+DOC_URL = "https://opendart.fss.or.kr/api/document.xml"
+XML_ERROR = b'<?xml version="1.0" encoding="UTF-8"?><result><status>020</status><message>limit</message></result>'
+
+
+class FakeResponse:
+    def __init__(self, content, content_type="application/json", status_code=200):
+        self.content = content
+        self.status_code = status_code
+        self.headers = {"Content-Type": content_type}
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, size):
+        for i in range(0, len(self.content), size):
+            yield self.content[i:i + size]
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, *bodies):
+        self.bodies = list(bodies)
+        self.calls = 0
+
+    def get(self, url, params=None, **kwargs):
+        self.calls += 1
+        return self.bodies.pop(0)
+
+
+def test_list_json_ttl_and_refresh(tmp_path):
+    ok = FakeResponse(b'{"status": "000", "list": []}')
+    session = FakeSession(ok, ok, ok)
+    cache = DartCache(session, root=str(tmp_path), ttl={"list.json": 3600})
+    params = {"crtfc_key": "k", "corp_code": "00126380"}
+    cache.get(LIST_URL, params=params)
+    assert cache.get(LIST_URL, params=dict(params, crtfc_key="other")).from_cache
+    assert session.calls == 1
+    cache.get(LIST_URL, params=params, refresh=True)
+    assert session.calls == 2
+
+    expired = DartCache(session, root=str(tmp_path), ttl={"list.json": 0})
+    expired.get(LIST_URL, params=params)
+    assert session.calls == 3
+
+
+def test_offline_serves_stale_entries_and_raises_on_miss(tmp_path):
+    session = FakeSession(FakeResponse(b'{"status": "000", "list": []}'))
+    DartCache(session, root=str(tmp_path)).get(LIST_URL, params={"corp_code": "1"})
+    offline = DartCache(root=str(tmp_path), ttl={"list.json": 0}, offline=True)
+    assert offline.get(LIST_URL, params={"corp_code": "1"}).json()["status"] == "000"
+    with pytest.raises(OfflineMiss):
+        offline.get(LIST_URL, params={"corp_code": "2"})
+
+
+def test_list_json_error_status_is_not_cached(tmp_path):
+    session = FakeSession(FakeResponse(b'{"status": "020"}'), FakeResponse(b'{"status": "000"}'))
+    cache = DartCache(session, root=str(tmp_path))
+    cache.get(LIST_URL, params={"corp_code": "1"})
+    assert cache.get(LIST_URL, params={"corp_code": "1"}).json()["status"] == "000"
+    assert session.calls == 2
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_document_xml_error_body_is_not_cached(tmp_path, stream):
+    zip_body = b"PK\x03\x04" + b"\0" * 32
+    session = FakeSession(FakeResponse(XML_ERROR, "application/xml"), FakeResponse(zip_body, "application/zip"))
+    cache = DartCache(session, root=str(tmp_path))
+    params = {"crtfc_key": "k", "rcept_no": "20250320000427"}
+    fetch = (lambda: cache.open_stream(DOC_URL, params=params).read()) if stream \
+        else (lambda: cache.get(DOC_URL, params=params).content)
+
+    assert fetch() == XML_ERROR
+    assert not os.path.exists(cache.path(DOC_URL, params))
+    assert fetch() == zip_body
+    assert fetch() == zip_body
+    assert session.calls == 2
+    assert cache.hits == 1
+
+
+def test_xml_rate_limit_body_is_retried():
+    assert DartClient._rate_limited(FakeResponse(XML_ERROR, "application/xml;charset=UTF-8"))
+    assert not DartClient._rate_limited(FakeResponse(XML_ERROR.replace(b"020", b"013"), "application/xml"))
+    assert DartClient._rate_limited(FakeResponse(b'{"status": "020"}'))
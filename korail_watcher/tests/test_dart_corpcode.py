@@ -0,0 +1,100 @@
+import io, os, zipfile
+
+import pytest
+
+import dart_corpcode
+from dart_corpcode import Corp, CorpIndex, load_corp_index
+
+CORPS = [
+    Corp("00126380", "삼성전자", "005930", "20240101"),
+    Corp("00126381", "삼성전기", "009150", "20240101"),
+    Corp("00999999", "삼성전자", "", "20230101"),
+    Corp("00164779", "(주)에스케이하이닉스", "000660", "20240101"),
+]
+
+
+def _zip(corps):
+    rows = "".join(
+        f"<list><corp_code>{c.corp_code}</corp_code><corp_name>{c.corp_name}</corp_name>"
+        f"<stock_code>{c.stock_code}</stock_code><modify_date>{c.modify_date}</modify_date></list>"
+        for c in corps
+    )
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        z.writestr("CORPCODE.xml", f"<result>{rows}</result>")
+    return buf.getvalue()
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append(headers or {})
+        return self.responses.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_index(monkeypatch):
+    monkeypatch.setattr(dart_corpcode, "_INDEX", {})
+
+
+def test_lookup_by_code_stock_and_name():
+    index = CorpIndex(CORPS)
+    assert index.get("00126381").corp_name == "삼성전기"
+    assert index.get("000660").corp_code == "00164779"
+    # 같은 이름이면 상장사 우선, (주)/공백은 무시
+    assert index.get("삼성전자").corp_code == "00126380"
+    assert index.corp_code("에스케이 하이닉스") == "00164779"
+    assert index.get("없는회사") is None
+
+
+def test_prefix_and_fuzzy():
+    index = CorpIndex(CORPS)
+    assert {c.corp_code for c in index.prefix("삼성")} == {"00126380", "00126381", "00999999"}
+    assert index.prefix("삼성", limit=1)[0].corp_name == "삼성전기"
+    assert [c.corp_code for c in index.fuzzy("삼성전쟈")][0] == "00126380"
+    assert index.fuzzy("완전히다른이름") == []
+
+
+def test_ttl_refresh_uses_conditional_request(tmp_path):
+    path = str(tmp_path / "corp.json.gz")
+    session = FakeSession(
+        FakeResponse(200, _zip(CORPS[:2]), {"Content-Type": "application/zip", "ETag": '"v1"'}),
+        FakeResponse(304, headers={}),
+    )
+    index = load_corp_index("k", path=path, session=session)
+    assert len(index) == 2
+    # TTL 안에서는 메모리 인덱스 재사용(상대/절대 경로 구분 없이)
+    assert load_corp_index("k", path=os.path.relpath(path), session=session) is index
+    assert len(session.requests) == 1
+
+    # TTL이 지나면 ETag로 조건부 요청, 304면 캐시 그대로
+    index = load_corp_index("k", path=path, ttl=0, session=session)
+    assert session.requests[1] == {"If-None-Match": '"v1"'}
+    assert index.get("삼성전기").corp_code == "00126381"
+
+
+def test_failed_refresh_keeps_stale_cache(tmp_path):
+    path = str(tmp_path / "corp.json.gz")
+    load_corp_index("k", path=path, session=FakeSession(FakeResponse(200, _zip(CORPS), {})))
+    error = FakeResponse(200, b'{"status": "020"}', {"Content-Type": "application/json"})
+    broken = FakeSession(error, error)
+    assert len(load_corp_index("k", path=path, refresh=True, session=broken)) == len(CORPS)
+    with pytest.raises(RuntimeError):
+        load_corp_index("k", path=str(tmp_path / "none.json.gz"), session=broken)
@@ -0,0 +1,80 @@
+import dart_filings
+from dart_filings import FilingIndex, classify_report, fiscal_year_for, get_filing_index
+
+CORP = "00126380"
+
+
+def _item(rcept_no, report_nm, rcept_dt):
+    return {"rcept_no": rcept_no, "corp_code": CORP, "corp_name": "삼성전자", "report_nm": report_nm, "rcept_dt": rcept_dt}
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    """params의 bgn_de/page_no를 기록하고 pages[page_no-1]을 돌려준다."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(dict(params))
+        page = params["page_no"]
+        items = self.pages[page - 1] if self.pages else []
+        if not items:
+            return FakeResponse({"status": "013"})
+        return FakeResponse({"status": "000", "list": items, "total_page": len(self.pages)})
+
+
+def test_classify_report():
+    assert classify_report("사업보고서 (2024.12)") == ("11011", 2024)
+    assert classify_report("[기재정정]사업보고서 (2023.12)") == ("11011", 2023)
+    assert classify_report("반기보고서 (2024.06)") == ("11012", 2024)
+    assert classify_report("분기보고서 (2024.03)") == ("11013", 2024)
+    assert classify_report("분기보고서 (2024.09)") == ("11014", 2024)
+    assert classify_report("주요사항보고서(자기주식취득결정)") == (None, None)
+    assert fiscal_year_for("2025", "11011") == 2024
+    assert fiscal_year_for("2025", "11012") == 2025
+
+
+def test_crawl_follows_pages_and_keeps_latest_correction():
+    session = FakeSession([
+        [_item("20250311000001", "사업보고서 (2024.12)", "20250311")],
+        [_item("20250401000002", "[기재정정]사업보고서 (2024.12)", "20250401"),
+         _item("20240814000003", "반기보고서 (2024.06)", "20240814")],
+    ])
+    index = FilingIndex(":memory:")
+    assert index.crawl("k", CORP, session=session) == 3
+    assert [c["page_no"] for c in session.calls] == [1, 2]
+    assert index.lookup(CORP, "11011", 2024) == "20250401000002"
+    assert index.lookup(CORP, "11012", 2024) == "20240814000003"
+    assert index.lookup(CORP, "11011", 2023) is None
+
+
+def test_recrawl_starts_from_high_water():
+    session = FakeSession([[_item("20250311000001", "사업보고서 (2024.12)", "20250311")]])
+    index = FilingIndex(":memory:", recrawl_sec=3600)
+    index.crawl("k", CORP, session=session)
+    # 재수집 간격 안에서는 요청하지 않는다
+    assert index.crawl("k", CORP, session=session) == 0
+    assert len(session.calls) == 1
+
+    session.pages = [[_item("20250311000001", "사업보고서 (2024.12)", "20250311"),
+                      _item("20250515000009", "분기보고서 (2025.03)", "20250515")]]
+    assert index.crawl("k", CORP, session=session, force=True) == 1
+    assert session.calls[-1]["bgn_de"] == "20250311"
+    assert index.lookup(CORP, "11013", 2025) == "20250515000009"
+
+
+def test_shared_index_per_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(dart_filings, "_INDEX", {})
+    a = get_filing_index(str(tmp_path / "a.sqlite3"))
+    assert get_filing_index(str(tmp_path / "a.sqlite3")) is a
+    assert get_filing_index(str(tmp_path / "b.sqlite3")) is not a
+    assert get_filing_index(":memory:") is get_filing_index(":memory:")
@@ -0,0 +1,78 @@
+import math
+
+import pytest
+
+import dart_frames
+from DART_API import analyze_document
+from dart_frames import FrameCollector, UnitTracker, parse_unit, rank_candidates
+
+DOC = """<DOCUMENT>
+<SECTION-1><TITLE>매출실적</TITLE>
+<P>(단위 : 백만원)</P>
+<TABLE><THEAD><TR><TH>구분</TH><TH>당기</TH><TH>전기</TH></TR></THEAD><TBODY>
+<TR><TD>매출액</TD><TE>1,200</TE><TE>1,000</TE></TR>
+<TR><TD>매출원가</TD><TE>800</TE><TE>-</TE></TR></TBODY></TABLE>
+<TABLE><TBODY><TR><TD>(단위 : 천원)</TD></TR></TBODY></TABLE>
+<TABLE><THEAD><TR><TH>구분</TH><TH>금액</TH></TR></THEAD><TBODY>
+<TR><TD>상품매출</TD><TE>50,000</TE></TR></TBODY></TABLE>
+</SECTION-1>
+<SECTION-1><TITLE>주식</TITLE>
+<TABLE><THEAD><TR><TH>구분</TH><TH>주식수</TH></TR></THEAD><TBODY>
+<TR><TD>매출 관련 보통주</TD><TE>99,999,999</TE></TR></TBODY></TABLE>
+</SECTION-1></DOCUMENT>"""
+
+
+@pytest.fixture(params=["numpy", "lists"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(dart_frames, "np", None)
+    return request.param
+
+
+def _rows(values):
+    return [[float(v) for v in row] for row in values]
+
+
+def test_parse_unit():
+    assert parse_unit("(단위 : 백만 원)") == ("백만원", 10**6)
+    assert parse_unit("(단위: 주)") == ("주", None)
+    assert parse_unit("매출액") is None
+
+
+def test_unit_tracker_drops_unit_at_section_boundary():
+    tracker = UnitTracker()
+    tracker.on_event("paragraph", "(단위 : 억원)")
+    tracker.on_event("section_end", 1)
+    assert tracker.pending is None
+
+
+def test_frames_normalize_units(backend):
+    frames = analyze_document(DOC, [FrameCollector()])[0]
+    sales, goods, shares = frames
+    assert sales.title == "매출실적" and (sales.unit, sales.factor) == ("백만원", 10**6)
+    assert sales.labels == ["매출액", "매출원가"] and sales.columns == ["당기", "전기"]
+    rows = _rows(sales.values)
+    assert rows[0] == [1.2e9, 1.0e9]
+    assert rows[1][0] == 8e8 and math.isnan(rows[1][1])
+    # 단위만 적힌 작은 표가 다음 표의 단위가 된다
+    assert (goods.unit, _rows(goods.values)) == ("천원", [[5e7]])
+    # 다음 섹션에는 단위가 이어지지 않는다
+    assert shares.unit is None and shares.factor is None
+
+
+def test_rank_candidates(backend):
+    frames = analyze_document(DOC, [FrameCollector()])[0]
+    ranked = rank_candidates(frames, ["매출"], exclude=["매출원가"])
+    assert [v for v, _ in ranked] == [1_200_000_000, 1_000_000_000, 50_000_000]
+    assert ranked[0][1] == "매출실적 > 매출액 | 당기 (백만원)"
+
+
+def test_rank_candidates_from_revenue_column_header(backend):
+    doc = """<DOCUMENT><P>(단위 : 천원)</P><TABLE><THEAD><TR><TH>품목</TH><TH>매출액</TH><TH>매출원가</TH></TR></THEAD>
+    <TBODY><TR><TD>커피</TD><TE>12,345,678</TE><TE>9,000,000</TE></TR>
+    <TR><TD>차</TD><TE>20,000</TE><TE>10,000</TE></TR></TBODY></TABLE></DOCUMENT>"""
+    frames = analyze_document(doc, [FrameCollector()])[0]
+    ranked = rank_candidates(frames, ["매출"], exclude=["매출원가"])
+    assert ranked == [(12_345_678_000, "커피 | 매출액 (천원)"), (20_000_000, "차 | 매출액 (천원)")]
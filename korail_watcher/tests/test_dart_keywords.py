@@ -0,0 +1,35 @@
+import dart_keywords
+from dart_keywords import KeywordSet, get_profile
+
+
+def test_longest_match_covers_shorter_ids():
+    ks = KeywordSet({"rev": ["매출액", "매출"], "cost": ["매출원가"]})
+    assert ks.find("당기 매출액 합계") == {"rev"}
+    # "매출원가"가 가장 긴 매치지만 그 안의 "매출"도 함께 걸린다
+    assert ks.find("매출원가") == {"rev", "cost"}
+    assert ks.find("영업이익") == frozenset()
+    assert [(pos, w) for pos, w, _ in ks.finditer("x매출액")] == [(1, "매출액")]
+
+
+def test_plain_list_and_empty_set():
+    ks = KeywordSet(["제품", "서비스"])
+    assert ks.search("주요 서비스").group() == "서비스"
+    assert not KeywordSet([])
+    assert KeywordSet([]).search("anything") is None
+
+
+def test_profiles_by_report_code():
+    annual, half = get_profile("11011"), get_profile("11012")
+    assert get_profile("11011") is annual
+    assert get_profile("unknown") is get_profile(None)
+    assert half.has("누적 매출액", "revenue")
+    assert {"revenue", "revenue_exclude", "section"} <= annual.groups("매출원가 및 매출액")
+    assert annual.keyword_set("revenue_exclude").find("매출채권") == {"매출채권"}
+
+
+def test_overrides_extend_profile(monkeypatch):
+    monkeypatch.setattr(dart_keywords, "_OVERRIDES", {"11011": {"revenue": ["영업수익"]}})
+    monkeypatch.setattr(dart_keywords, "_PROFILE_CACHE", {})
+    prof = get_profile("11011")
+    assert prof.has("영업수익", "revenue")
+    assert not prof.has("매출액", "revenue")
@@ -0,0 +1,31 @@
+import glob
+import os
+
+import pytest
+
+import fixture_replay
+
+PAGES = sorted(glob.glob(os.path.join(fixture_replay.FIXTURE_DIR, "korail_page_*.html")))
+
+
+def test_fixtures_have_expected_hits():
+    assert PAGES
+    for page in PAGES:
+        expected = fixture_replay._load_expected(page)
+        assert expected.get("watch")
+        assert set(fixture_replay.PARSERS) <= set(expected)
+
+
+def test_replay_korail_watcher2():
+    pytest.importorskip("bs4")
+    pytest.importorskip("dotenv")
+    report = fixture_replay.replay(PAGES, ("korail_watcher2",), repeat=1)
+    r = report["korail_watcher2"]
+    assert r["failed"] == 0
+    assert [pg["status"] for pg in r["pages"]] == ["ok"] * len(PAGES)
+
+
+def test_replay_korail_watcher():
+    pytest.importorskip("playwright")
+    report = fixture_replay.replay(PAGES, ("korail_watcher",), repeat=1)
+    assert report["korail_watcher"]["failed"] == 0
@@ -0,0 +1,42 @@
+from hit_store import HitStore, AVAILABLE, SOLD_OUT
+
+DAY = "2099-01-01"
+
+
+def test_dedup_survives_restart(tmp_path):
+    path = str(tmp_path / "hits.sqlite3")
+    store = HitStore(path)
+    assert store.update("w", DAY, [("KTX 101", "07:00", "예약가능")]) == [("KTX 101", "07:00", "예약가능")]
+    assert store.update("w", DAY, [("KTX 101", "07:00", "예약가능")]) == []
+    store.close()
+
+    store = HitStore(path)
+    assert store.update("w", DAY, [("KTX 101", "07:00", "잔여석 2")]) == []
+    assert store.history("w")[0][5] == "잔여석 2"
+    store.close()
+
+
+def test_sold_out_then_available_again():
+    store = HitStore()
+    store.update("w", DAY, [("KTX 101", "07:00", "예약가능")])
+    assert store.update("w", DAY, []) == []
+    assert store.history("w")[0][4] == SOLD_OUT
+    assert store.update("w", DAY, [("KTX 101", "07:00", "예약가능")]) == [("KTX 101", "07:00", "예약가능")]
+    assert store.history("w")[0][4] == AVAILABLE
+
+
+def test_incomplete_poll_keeps_state():
+    store = HitStore()
+    store.update("w", DAY, [("KTX 101", "07:00", "예약가능")])
+    store.update("w", DAY, [], complete=False)
+    assert store.history("w")[0][4] == AVAILABLE
+    assert store.update("w", DAY, [("KTX 101", "07:00", "예약가능")]) == []
+
+
+def test_watches_are_independent_and_purge():
+    store = HitStore()
+    store.update("a", DAY, [("KTX 101", "07:00", "예약가능")])
+    assert store.update("b", DAY, [("KTX 101", "07:00", "예약가능")]) != []
+    store.update("a", "2000-01-01", [("KTX 101", "07:00", "예약가능")])
+    assert store.purge_expired(today="2050-01-01") == 1
+    assert [r[1] for r in store.history()] == [DAY, DAY]
@@ -0,0 +1,29 @@
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("playwright")
+
+import korail_watcher
+
+
+class FakeContext:
+    def __init__(self, n):
+        self.state = {"cookies": [{"name": f"c{i}", "value": "x" * 1000} for i in range(n)], "origins": []}
+
+    def storage_state(self):
+        return self.state
+
+
+def test_concurrent_storage_state_saves_leave_valid_json(tmp_path, monkeypatch):
+    path = tmp_path / "state" / "storage.json"
+    monkeypatch.setattr(korail_watcher, "STORAGE_STATE", str(path))
+    threads = [threading.Thread(target=korail_watcher.save_storage_state, args=(FakeContext(n),)) for n in range(1, 9)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(json.loads(path.read_text(encoding="utf-8"))["cookies"]) in range(1, 9)
+    assert [p.name for p in path.parent.iterdir()] == ["storage.json"]
@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+pytest.importorskip("bs4")
+pytest.importorskip("requests")
+
+import mac_watcher
+
+
+class _Res:
+    def __init__(self, body, size=7):
+        self.body, self.size = body, size
+        self.read = 0
+
+    def iter_content(self, size):
+        for i in range(0, len(self.body), self.size):
+            self.read = min(len(self.body), i + self.size)
+            yield self.body[i:i + self.size]
+
+
+def test_scan_page_finds_price_across_chunks():
+    body = b'<html><p class="no_today"><em class="no_up"><span class="blind">4,000</span></em></p><div>tail</div>'
+    res = _Res(body)
+    price, got = mac_watcher._scan_page(res)
+    assert price == "4,000"
+    assert body.startswith(got) and len(got) < len(body)
+    # 현재가를 찾으면 나머지 본문은 받지 않는다
+    assert res.read < len(body)
+
+
+def test_scan_page_stays_inside_no_today_node():
+    body = b'<p class="no_today"><em>-</em></p><table><span class="blind">123</span></table>'
+    assert mac_watcher._scan_page(_Res(body)) == (None, body)
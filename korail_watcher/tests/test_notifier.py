@@ -0,0 +1,73 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from notifier import Notifier, TelegramChannel
+
+
+class _Stub(BaseHTTPRequestHandler):
+    # 응답 상태를 replies 순서대로 돌려주고, 다 쓰면 200
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        srv = self.server
+        srv.requests.append((self.path, parse_qs(body.decode())))
+        status = srv.replies.pop(0) if srv.replies else 200
+        data = json.dumps({"ok": status == 200, "parameters": {"retry_after": 0}}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def telegram():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    srv.requests, srv.replies = [], []
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _channel(srv):
+    return TelegramChannel("TOKEN", "42", base_url=f"http://127.0.0.1:{srv.server_port}/api")
+
+
+def test_batches_pending_into_one_message(telegram):
+    n = Notifier([_channel(telegram)], workers=1, interval=60)
+    for i in range(3):
+        n.notify("코레일", f"열차 {i}", text=f"line {i}")
+    assert telegram.requests == []      # interval 동안은 모아 두기만 한다
+    assert n.flush(timeout=5)
+    n.close()
+    assert len(telegram.requests) == 1
+    path, form = telegram.requests[0]
+    assert path == "/api/botTOKEN/sendMessage"
+    assert form["chat_id"] == ["42"]
+    assert form["text"] == ["line 0\n\nline 1\n\nline 2"]
+
+
+def test_retries_after_429_and_server_error(telegram):
+    telegram.replies = [429, 500]
+    n = Notifier([_channel(telegram)], workers=1, retries=3, backoff=0.01)
+    n.notify(None, "잔여석 1")
+    assert n.flush(timeout=5)
+    n.close()
+    assert [f["text"] for _, f in telegram.requests] == [["잔여석 1"]] * 3
+
+
+def test_gives_up_after_retries(telegram):
+    telegram.replies = [500] * 5
+    ch = _channel(telegram)
+    n = Notifier([ch], workers=1, retries=2, backoff=0.01)
+    assert n._deliver("telegram", [(None, "x", "x")]) is False
+    n.close()
+    assert len(telegram.requests) == 3
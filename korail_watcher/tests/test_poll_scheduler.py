@@ -0,0 +1,94 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from poll_scheduler import (AdaptivePolicy, HostBudget, TokenBucket, in_hot_window, parse_hot_windows,
+                            OK, TIMEOUT, UNCHANGED)
+
+
+def _watch(**kw):
+    w = {"name": "w", "refresh": 20.0, "date": "2099-01-01", "window": ("10:00", "12:00"), "hot": []}
+    w.update(kw)
+    return w
+
+
+def test_parse_hot_windows():
+    assert parse_hot_windows("06:55-07:10, -3h,-30m") == [
+        ("clock", (415, 430)), ("lead", timedelta(hours=3)), ("lead", timedelta(minutes=30)),
+    ]
+    assert parse_hot_windows(["-1.5h"]) == [("lead", timedelta(hours=1.5))]
+    assert parse_hot_windows(None) == []
+
+
+@pytest.mark.parametrize("spec", ["-30", "-3d", "-h", "--3h", "06:55", "25:00-26:00"])
+def test_parse_hot_windows_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        parse_hot_windows(spec)
+
+
+def test_in_hot_window():
+    clock = parse_hot_windows("23:00-01:00")
+    assert in_hot_window(_watch(), clock, datetime(2099, 1, 1, 0, 30))
+    assert not in_hot_window(_watch(), clock, datetime(2099, 1, 1, 12, 0))
+    lead = parse_hot_windows("-1h")
+    assert in_hot_window(_watch(), lead, datetime(2099, 1, 1, 9, 30))
+    assert not in_hot_window(_watch(), lead, datetime(2099, 1, 1, 8, 30))
+
+
+def test_adaptive_backoff_and_burst():
+    policy = AdaptivePolicy(burst_sec=5.0, backoff_factor=2.0, max_backoff=60.0, jitter=0.0)
+    w = _watch()
+    assert policy.next_delay(w, OK) == 20.0
+    policy.max_backoff = 1000.0
+    assert 20.0 <= policy.next_delay(w, TIMEOUT) <= 40.0
+    assert 40.0 <= policy.next_delay(w, TIMEOUT) <= 80.0
+    policy.max_backoff = 60.0
+    assert 30.0 <= policy.next_delay(w, TIMEOUT) <= 60.0      # max_backoff 상한
+    assert policy.next_delay(w, UNCHANGED) == 20.0            # 성공하면 초기화
+
+    hot = _watch(hot=parse_hot_windows("00:00-23:59"))
+    assert policy.is_hot(hot)
+    assert policy.next_delay(hot, OK) == 5.0
+
+
+def test_backoff_survives_long_outage():
+    policy = AdaptivePolicy(backoff_factor=2.0, max_backoff=300.0, jitter=0.0)
+    w = _watch()
+    policy._fails[w["name"]] = 5000
+    assert 150.0 <= policy.next_delay(w, TIMEOUT) <= 300.0
+    # max_backoff가 refresh보다 작아도 상한을 지킨다
+    assert 5.0 <= AdaptivePolicy(max_backoff=10.0).next_delay(w, TIMEOUT) <= 10.0
+
+
+def test_token_bucket():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+    bucket = TokenBucket(rate=1000.0, burst=2)
+    assert bucket.acquire(0) and bucket.acquire(0)
+    slow = TokenBucket(rate=0.01, burst=1)
+    assert slow.acquire(0)
+    t0 = time.monotonic()
+    assert not slow.acquire(timeout=0.05)
+    assert time.monotonic() - t0 < 1.0
+
+
+def test_host_budget_is_per_host():
+    budget = HostBudget(rate=0.01, burst=1)
+    assert budget.bucket("https://a.example/x") is budget.bucket("https://a.example/y")
+    assert budget.acquire("https://a.example/x", timeout=0)
+    assert not budget.acquire("https://a.example/y", timeout=0)
+    assert budget.acquire("https://b.example/", timeout=0)
+    assert HostBudget(0).acquire("https://a.example/", timeout=0)
+
+
+def test_watchlist_hot_is_parsed_at_load(tmp_path):
+    pytest.importorskip("dotenv")
+    pytest.importorskip("playwright")
+    import korail_watcher
+    path = tmp_path / "watchlist.json"
+    path.write_text('[{"date": "2099-01-01", "window": "10:00,12:00", "hot": "-3h"}]', encoding="utf-8")
+    assert korail_watcher.load_watchlist(str(path))[0]["hot"] == [("lead", timedelta(hours=3))]
+    path.write_text('[{"date": "2099-01-01", "window": "10:00,12:00", "hot": "-30"}]', encoding="utf-8")
+    with pytest.raises(ValueError):
+        korail_watcher.load_watchlist(str(path))
@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+import timeseries
+from timeseries import TimeSeriesStore
+
+T0 = 1_700_000_000
+
+
+def test_range_and_downsample(tmp_path):
+    store = TimeSeriesStore(str(tmp_path / "ts.sqlite3"), flush_sec=0, batch=3)
+    for i in range(6):
+        store.record("price:A", 100 + i, ts=T0 + i * 10)
+    assert [v for _, v, _ in store.range("price:A", T0 + 20, T0 + 40)] == [102, 103]
+    buckets = store.downsample("price:A", 30)
+    assert [(n, lo, hi, last) for _, n, lo, hi, _, last in buckets] == [(1, 100, 100, 100), (3, 101, 103, 103), (2, 104, 105, 105)]
+    store.close()
+
+
+def test_points_survive_reopen(tmp_path):
+    path = str(tmp_path / "ts.sqlite3")
+    store = TimeSeriesStore(path, flush_sec=0)
+    store.record_many([("korail:w:avail", 2, "ok"), ("korail:w:07:00 KTX", 1, "예약가능")], ts=T0)
+    store.close()
+    store = TimeSeriesStore(path, flush_sec=0)
+    assert store.series("korail:") == ["korail:w:07:00 KTX", "korail:w:avail"]
+    assert store.range("korail:w:avail") == [(T0, 2, "ok")]
+    store.close()
+
+
+def test_null_only_bucket(tmp_path, capsys):
+    path = str(tmp_path / "ts.sqlite3")
+    store = TimeSeriesStore(path, flush_sec=0)
+    store.record("korail:x:avail", None, "timeout")
+    assert store.downsample("korail:x:avail", 60)[0][1:] == (1, None, None, None, None)
+    store.close()
+    timeseries.main([path, "korail:x:avail", "--bucket", "60"])
+    out = capsys.readouterr().out
+    assert "min=- max=- avg=- last=-" in out
+
+
+def test_record_after_close_is_ignored(tmp_path):
+    store = TimeSeriesStore(str(tmp_path / "ts.sqlite3"), flush_sec=0)
+    store.close()
+    store.record("price:A", 1)
+    store.record_many([("price:A", 2, None)])
+    store.close()
+
+
+def test_flusher_survives_errors(tmp_path, monkeypatch):
+    store = TimeSeriesStore(str(tmp_path / "ts.sqlite3"), flush_sec=0.01)
+    calls = []
+    done = threading.Event()
+    real = store.flush
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        n = real()
+        if n:
+            done.set()
+        return n
+
+    monkeypatch.setattr(store, "flush", flaky)
+    store.record("price:A", 1)
+    assert done.wait(2)
+    monkeypatch.undo()
+    store.close()
+
+
+def test_failed_flush_does_not_cache_rolled_back_series(tmp_path):
+    store = TimeSeriesStore(str(tmp_path / "ts.sqlite3"), flush_sec=0)
+    # 새 시리즈 ID를 만든 뒤 점 INSERT에서 실패(값을 SQLite에 넣을 수 없음) → ROLLBACK
+    store.record("price:new", object(), ts=T0)
+    with pytest.raises(Exception):
+        store.flush()
+    store.record("price:other", 1, ts=T0)
+    store.record("price:new", 2, ts=T0 + 1)
+    store.flush()
+    assert store.range("price:new") == [(T0 + 1, 2, None)]
+    assert store.range("price:other") == [(T0, 1, None)]
+    store.close()
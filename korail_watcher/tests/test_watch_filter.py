@@ -0,0 +1,56 @@
+import pytest
+
+from watch_filter import compile_filter, hm_to_min, parse_windows
+
+
+def test_hm_to_min():
+    assert hm_to_min("07:05") == 425
+    assert hm_to_min(" 7:05 ") == 425
+    assert hm_to_min("23:59") == 1439
+    for bad in ("24:00", "12:60", "7시", "", None):
+        assert hm_to_min(bad) is None
+
+
+def test_parse_windows_forms():
+    assert parse_windows(("10:00", "22:00")) == [("10:00", "22:00")]
+    assert parse_windows([["07:00", "09:00"], ["18:00", "22:00"]]) == [("07:00", "09:00"), ("18:00", "22:00")]
+    assert parse_windows("07:00,09:00; 18:00-22:00") == [("07:00", "09:00"), ("18:00", "22:00")]
+    assert parse_windows(None) == []
+
+
+def test_parse_windows_list_of_window_strings():
+    assert parse_windows(["06:00-09:00", "18:00-21:00"]) == [("06:00", "09:00"), ("18:00", "21:00")]
+    assert parse_windows(("06:00,09:00",)) == [("06:00", "09:00")]
+    flt = compile_filter(["06:00-09:00", "18:00-21:00"])
+    assert flt.time_ok("07:00") and flt.time_ok("20:00")
+    assert not flt.time_ok("12:00")
+
+
+@pytest.mark.parametrize("spec", ["10:00", [["10:00"]], ["10:00"]])
+def test_parse_windows_rejects_single_time(spec):
+    with pytest.raises(ValueError, match="잘못된 시각대"):
+        parse_windows(spec)
+
+
+def test_time_windows_and_overnight():
+    flt = compile_filter([("07:00", "09:00"), ("23:00", "01:00")])
+    assert flt.time_ok("07:00") and flt.time_ok("09:00")
+    assert not flt.time_ok("09:01")
+    assert flt.time_ok("23:30") and flt.time_ok("00:30")
+    assert not flt.time_ok("garbage")
+
+
+def test_exclusions_take_priority():
+    flt = compile_filter(("06:00", "22:00"), {"KTX", "SRT"}, exclude_types={"KTX-산천"}, exclude_windows=("12:00", "13:00"))
+    assert flt.match("KTX 101", "10:00")
+    assert flt("SRT 301", "10:00")
+    assert not flt.match("KTX-산천 201", "10:00")
+    assert not flt.match("ITX-새마을", "10:00")
+    assert not flt.match("KTX 103", "12:30")
+
+
+def test_empty_filter_passes_everything():
+    flt = compile_filter()
+    assert flt.match("무궁화호", "00:00")
+    with pytest.raises(ValueError):
+        compile_filter(("25:00", "26:00"))
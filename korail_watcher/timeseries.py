@@ -0,0 +1,225 @@
+import sys, time, sqlite3, logging, argparse, threading
+
+# 폴링 결과를 시각과 함께 쌓아 두는 추가 전용 시계열 저장소(SQLite).
+#  - 시리즈 이름("price:005930", "korail:<watch>:avail" …)은 정수 ID로 바꿔 points에는 (ID, ms, 값)만 저장
+#  - record()는 메모리 버퍼에 넣기만 하고, 백그라운드 스레드가 flush_sec마다(또는 batch개가 차면) 한 트랜잭션으로 쓴다
+#  - range()로 구간 조회, downsample()로 bucket초 단위 집계(개수/최소/최대/평균/마지막)
+# 취소표가 언제 풀리는지, 폴링 간격을 얼마로 둘지 데이터로 보려는 용도.
+
+TS_FLUSH_SEC = 2.0
+TS_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id   INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS points (
+    series INTEGER NOT NULL,
+    ts     INTEGER NOT NULL,    -- epoch ms
+    value  REAL,
+    text   TEXT
+);
+CREATE INDEX IF NOT EXISTS points_series_ts ON points(series, ts);
+"""
+
+
+class TimeSeriesStore:
+    def __init__(self, path=":memory:", flush_sec=TS_FLUSH_SEC, batch=TS_BATCH):
+        self.path = path
+        self.flush_sec = flush_sec
+        self.batch = batch
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+        self._ids = dict((name, sid) for sid, name in self._db.execute("SELECT id, name FROM series"))
+        self._buf = []
+        self._buf_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flusher = None
+        self._closed = False
+        if flush_sec:
+            self._flusher = threading.Thread(target=self._flush_loop, name="ts-flush", daemon=True)
+            self._flusher.start()
+
+    def record(self, series, value=None, text=None, ts=None):
+        """점 하나를 버퍼에 추가(디스크 쓰기는 나중에 묶어서). close() 뒤에는 무시."""
+        ms = int((time.time() if ts is None else ts) * 1000)
+        with self._buf_lock:
+            if self._closed:
+                return
+            self._buf.append((series, ms, value, text))
+            full = len(self._buf) >= self.batch
+        if full:
+            if self._flusher is not None:
+                self._wake.set()
+            else:
+                self.flush()
+
+    def record_many(self, items, ts=None):
+        """items: [(series, value, text), ...]를 같은 시각으로 기록."""
+        ms = int((time.time() if ts is None else ts) * 1000)
+        with self._buf_lock:
+            if self._closed:
+                return
+            self._buf.extend((s, ms, v, t) for s, v, t in items)
+            full = len(self._buf) >= self.batch
+        if full:
+            if self._flusher is not None:
+                self._wake.set()
+            else:
+                self.flush()
+
+    def _series_id(self, name, new_ids):
+        # _db_lock 안의 트랜잭션에서만 호출. 새로 만든 ID는 new_ids에 모았다가 COMMIT 뒤에 _ids로 옮긴다
+        # (ROLLBACK되면 series 행이 사라지므로 캐시에 남기면 안 된다)
+        sid = self._ids.get(name) or new_ids.get(name)
+        if sid is None:
+            self._db.execute("INSERT OR IGNORE INTO series(name) VALUES (?)", (name,))
+            sid = self._db.execute("SELECT id FROM series WHERE name=?", (name,)).fetchone()[0]
+            new_ids[name] = sid
+        return sid
+
+    def flush(self):
+        """버퍼를 한 트랜잭션으로 기록. 기록한 점 수 반환."""
+        with self._buf_lock:
+            buf, self._buf = self._buf, []
+        if not buf:
+            return 0
+        with self._db_lock:
+            db = self._db
+            new_ids = {}
+            db.execute("BEGIN")
+            try:
+                rows = [(self._series_id(s, new_ids), ms, v, t) for s, ms, v, t in buf]
+                db.executemany("INSERT INTO points VALUES (?, ?, ?, ?)", rows)
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            self._ids.update(new_ids)
+        return len(buf)
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_sec)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # 한 번 실패해도 flusher는 계속 돈다(그 묶음은 버림)
+                logging.exception("시계열 기록 실패")
+
+    def series(self, prefix=None):
+        self.flush()
+        sql, args = "SELECT name FROM series", []
+        if prefix:
+            sql += " WHERE name >= ? AND name < ?"
+            args = [prefix, prefix + "\uffff"]
+        with self._db_lock:
+            return [r[0] for r in self._db.execute(sql + " ORDER BY name", args)]
+
+    def _range_sql(self, series, start, end):
+        cond = ["p.series = s.id", "s.name = ?"]
+        args = [series]
+        if start is not None:
+            cond.append("p.ts >= ?")
+            args.append(int(start * 1000))
+        if end is not None:
+            cond.append("p.ts < ?")
+            args.append(int(end * 1000))
+        return " AND ".join(cond), args
+
+    def range(self, series, start=None, end=None):
+        """[start, end) 구간의 점들. 반환: [(ts초, 값, 텍스트), ...] 시각 순."""
+        self.flush()
+        where, args = self._range_sql(series, start, end)
+        with self._db_lock:
+            rows = self._db.execute(
+                f"SELECT p.ts, p.value, p.text FROM points p, series s WHERE {where} ORDER BY p.ts", args
+            ).fetchall()
+        return [(ts / 1000.0, v, t) for ts, v, t in rows]
+
+    def downsample(self, series, bucket_sec, start=None, end=None):
+        """
+        bucket_sec초 단위로 묶은 집계.
+        반환: [(구간 시작 ts초, 개수, 최소, 최대, 평균, 마지막 값), ...]
+        """
+        self.flush()
+        bucket = max(1, int(bucket_sec * 1000))
+        where, args = self._range_sql(series, start, end)
+        # 구간별 집계 후, 구간의 마지막 시각(lt)으로 마지막 값을 (series, ts) 인덱스에서 찾는다
+        sql = (
+            f"SELECT g.b, g.n, g.lo, g.hi, g.avg, "
+            f"(SELECT value FROM points WHERE series = g.sid AND ts = g.lt ORDER BY rowid DESC LIMIT 1) "
+            f"FROM (SELECT p.series AS sid, (p.ts / {bucket}) * {bucket} AS b, COUNT(*) AS n, MIN(p.value) AS lo, "
+            f"MAX(p.value) AS hi, AVG(p.value) AS avg, MAX(p.ts) AS lt "
+            f"FROM points p, series s WHERE {where} GROUP BY b) g ORDER BY g.b"
+        )
+        with self._db_lock:
+            rows = self._db.execute(sql, args).fetchall()
+        return [(b / 1000.0, n, lo, hi, avg, last) for b, n, lo, hi, avg, last in rows]
+
+    def purge_before(self, ts):
+        """ts초 이전의 점을 삭제. 삭제 건수 반환."""
+        self.flush()
+        with self._db_lock:
+            return self._db.execute("DELETE FROM points WHERE ts < ?", (int(ts * 1000),)).rowcount
+
+    def close(self):
+        with self._buf_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._stop.set()
+        self._wake.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+
+
+def _parse_since(txt):
+    """"90m" / "6h" / "2d" → 현재 시각 기준 epoch초."""
+    if not txt:
+        return None
+    unit = {"s": 1, "m": 60, "h": 3600, "d": 86400}.get(txt[-1].lower())
+    n = float(txt[:-1]) if unit else float(txt)
+    return time.time() - n * (unit or 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="시계열 저장소 조회")
+    parser.add_argument("db", help="SQLite 경로")
+    parser.add_argument("series", nargs="?", help="시리즈 이름. 없으면 목록 출력")
+    parser.add_argument("--since", type=str, default=None, help="조회 시작(예: 90m, 6h, 2d)")
+    parser.add_argument("--bucket", type=float, default=0, help="다운샘플 간격(초). 0이면 원본 점")
+    args = parser.parse_args(argv)
+
+    store = TimeSeriesStore(args.db, flush_sec=0)
+    try:
+        if not args.series:
+            for name in store.series():
+                print(name)
+            return
+        start = _parse_since(args.since)
+        fmt = lambda t: time.strftime("%m-%d %H:%M:%S", time.localtime(t))
+        if args.bucket:
+            for b, n, lo, hi, avg, last in store.downsample(args.series, args.bucket, start):
+                # 실패한 조회만 있는 구간은 값이 모두 NULL
+                num = lambda x, spec="": "-" if x is None else format(x, spec)
+                print(f"{fmt(b)}  n={n:<4} min={num(lo)} max={num(hi)} avg={num(avg, '.2f')} last={num(last)}")
+        else:
+            for ts, v, t in store.range(args.series, start):
+                print(f"{fmt(ts)}  {v}" + (f"  {t}" if t else ""))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import re
+
+# 감시 조건(시각대/열차 종류)을 한 번만 컴파일해 두고 행마다 재사용하는 필터.
+# 시각대는 정수 분(0~1439)으로, 열차 종류는 정규식 하나로 보관한다.
+# korail_watcher / korail_watcher2 가 함께 쓴다.
+
+_HM_PAT = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*$")
+_WINDOW_SEP = re.compile(r"[,;-]")
+
+
+def hm_to_min(t_str):
+    """"HH:MM" → 분. 형식/범위가 틀리면 None."""
+    if not t_str:
+        return None
+    s = t_str if isinstance(t_str, str) else str(t_str)
+    # 대부분 "HH:MM" 그대로 들어오므로 정규식 없이 먼저 처리
+    if len(s) == 5 and s[2] == ":" and s[:2].isdigit() and s[3:].isdigit():
+        h, m = int(s[:2]), int(s[3:])
+    else:
+        mt = _HM_PAT.match(s)
+        if not mt:
+            return None
+        h, m = int(mt.group(1)), int(mt.group(2))
+    if h > 23 or m > 59:
+        return None
+    return h * 60 + m
+
+
+def parse_windows(spec):
+    """
+    시각대 목록을 [(시작, 끝), ...] 문자열 튜플 리스트로 정규화.
+    허용: ("10:00", "22:00") / [["07:00","09:00"], ["18:00","22:00"]] / "07:00,09:00;18:00,22:00"
+          / ["07:00-09:00", "18:00-22:00"] (watchlist JSON의 문자열 목록)
+    """
+    if not spec:
+        return []
+    if isinstance(spec, str):
+        out = []
+        for part in spec.split(";"):
+            if not part.strip():
+                continue
+            pair = [x.strip() for x in part.replace("-", ",", 1).split(",", 1)]
+            if len(pair) != 2:
+                raise ValueError(f"잘못된 시각대: {part.strip()!r} (\"HH:MM,HH:MM\" 형식이어야 합니다)")
+            out.append(tuple(pair))
+        return out
+    spec = list(spec)
+    # 구분자 없는 문자열 두 개는 (시작, 끝) 한 쌍
+    if len(spec) == 2 and all(isinstance(x, str) and not _WINDOW_SEP.search(x) for x in spec):
+        return [(spec[0].strip(), spec[1].strip())]
+    out = []
+    for item in spec:
+        if isinstance(item, str):
+            out.extend(parse_windows(item))     # "HH:MM-HH:MM" 하나(아니면 ValueError)
+            continue
+        if len(item) != 2:
+            raise ValueError(f"잘못된 시각대: {item!r} ((시작, 끝) 쌍이어야 합니다)")
+        out.append((str(item[0]).strip(), str(item[1]).strip()))
+    return out
+
+
+def _compile_windows(windows):
+    out = []
+    for a, b in parse_windows(windows):
+        am, bm = hm_to_min(a), hm_to_min(b)
+        if am is None or bm is None:
+            raise ValueError(f"잘못된 시각대: {a}~{b}")
+        out.append((am, bm))
+    return tuple(out)
+
+
+def _compile_words(words):
+    words = sorted({str(w).strip() for w in (words or ()) if str(w).strip()}, key=len, reverse=True)
+    if not words:
+        return None
+    return re.compile("|".join(re.escape(w) for w in words))
+
+
+def _in_any(m, windows):
+    for a, b in windows:
+        if (a <= m <= b) if a <= b else (m >= a or m <= b):
+            return True
+    return False
+
+
+class WatchFilter:
+    """
+    windows: 허용 시각대 목록(비우면 하루 전체)
+    train_types: 포함돼야 하는 열차 종류(비우면 전체)
+    exclude_types / exclude_windows: 제외 규칙. 허용 조건보다 우선한다.
+    """
+
+    __slots__ = ("windows", "exclude_windows", "_types", "_exclude_types")
+
+    def __init__(self, windows=None, train_types=None, exclude_types=None, exclude_windows=None):
+        self.windows = _compile_windows(windows)
+        self.exclude_windows = _compile_windows(exclude_windows)
+        self._types = _compile_words(train_types)
+        self._exclude_types = _compile_words(exclude_types)
+
+    def time_ok(self, t_str) -> bool:
+        m = hm_to_min(t_str)
+        if m is None:
+            return False
+        if self.exclude_windows and _in_any(m, self.exclude_windows):
+            return False
+        return not self.windows or _in_any(m, self.windows)
+
+    def train_ok(self, txt) -> bool:
+        txt = txt or ""
+        if self._exclude_types is not None and self._exclude_types.search(txt):
+            return False
+        return self._types is None or self._types.search(txt) is not None
+
+    def match(self, train_txt, t_str) -> bool:
+        return self.train_ok(train_txt) and self.time_ok(t_str)
+
+    __call__ = match
+
+
+def compile_filter(windows=None, train_types=None, exclude_types=None, exclude_windows=None):
+    return WatchFilter(windows, train_types, exclude_types, exclude_windows)